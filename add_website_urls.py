@@ -4,8 +4,13 @@ Script to add website URLs to medical_schools_data.csv
 URLs sourced from Shemmassian Consulting
 """
 
-import csv
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from dataset_snapshot import DEFAULT_CSV_PATH
+from enrichment import enrich_csv
+from school_resolver import SchoolResolver
 
 # MD School URLs
 md_school_urls = {
@@ -221,78 +226,49 @@ do_school_urls = {
 # Combine all URLs
 all_urls = {**md_school_urls, **do_school_urls}
 
-def normalize_name(name):
-    """Normalize school name for matching"""
-    # Remove extra whitespace
-    name = ' '.join(name.split())
-    return name.strip()
-
-def find_url(school_name, urls_dict):
-    """Find URL for a school, trying various matching strategies"""
-    normalized = normalize_name(school_name)
-
-    # Direct match
-    if normalized in urls_dict:
-        return urls_dict[normalized]
+# Index URL names once; CSV names resolve by exact name, match key, alias
+# or (unique) name containment
+URL_INDEX = SchoolResolver.from_names(all_urls)
 
-    # Try matching by key
-    for key, url in urls_dict.items():
-        if normalize_name(key) == normalized:
-            return url
+def find_url(school_name):
+    """Find the URL for a school name, or None"""
+    match = URL_INDEX.resolve(school_name)
+    return None if match is None else all_urls[match.school_id]
 
-    # Try partial matching (school name contains key or vice versa)
-    for key, url in urls_dict.items():
-        key_normalized = normalize_name(key)
-        if key_normalized in normalized or normalized in key_normalized:
-            return url
+def website_url_columns(table):
+    """Website URL column for an enrichment Table ('' where no URL is known)"""
+    return {'Website URL': [find_url(school_name) or '' for school_name in table['Medical School Name']]}
 
-    # Try matching without common suffixes
-    name_parts = normalized.lower()
-    for key, url in urls_dict.items():
-        key_lower = normalize_name(key).lower()
-        # Check if core names match
-        if (name_parts.replace('school of medicine', '').strip() ==
-            key_lower.replace('school of medicine', '').strip()):
-            return url
-
-    return None
-
-def main():
-    input_file = 'public/medical_schools_data.csv'
-    output_file = 'public/medical_schools_data.csv'
+def update_csv_with_urls(input_file, output_file):
+    """
+    Add the Website URL column to a CSV.
 
-    # Read existing data
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
+    Args:
+        input_file: Path to input CSV
+        output_file: Path to output CSV
 
-    # Add Website URL column if not present
-    if 'Website URL' not in fieldnames:
-        fieldnames = list(fieldnames) + ['Website URL']
+    Returns:
+        Tuple of (matched count, list of unmatched school names)
+    """
+    table, _ = enrich_csv(input_file, output_file, [('website_urls', website_url_columns)])
 
-    # Update each row with website URL
     matched = 0
     unmatched = []
-
-    for row in rows:
-        school_name = row.get('Medical School Name', '')
+    for school_name, url in zip(table['Medical School Name'], table['Website URL']):
         if not school_name:
             continue
-
-        url = find_url(school_name, all_urls)
-        if url:
-            row['Website URL'] = url
+        if find_url(school_name):
             matched += 1
         else:
-            row['Website URL'] = ''
             unmatched.append(school_name)
 
-    # Write updated data
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    return matched, unmatched
+
+def main():
+    input_file = DEFAULT_CSV_PATH
+    output_file = DEFAULT_CSV_PATH
+
+    matched, unmatched = update_csv_with_urls(input_file, output_file)
 
     print(f"Updated {output_file}")
     print(f"Matched: {matched} schools")
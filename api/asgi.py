@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Async (ASGI) serving mode for the Medical Schools API.
+
+Serves the same routes as example_api.py (/api/schools, /api/classify,
+/api/states, /api/stats, ...) behind an ASGI server instead of the
+single-process Flask development server. The event loop only handles
+connections; each request runs on a thread pool:
+
+- Classification routes are CPU-heavy and get their own small, bounded pool.
+  When that pool and its queue are full, new classification requests are
+  rejected with a 503 instead of piling up.
+- All other routes run on a separate pool, so cheap lookups stay fast while
+  heavy batch classifications are running.
+
+Usage:
+    pip install flask flask-cors uvicorn
+    python3 asgi.py --port 8000 --workers 4
+
+    Or with any ASGI server:
+    uvicorn asgi:application --app-dir api --port 8000
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from example_api import app, init_app
+
+# Routes that run the classification loop
+HEAVY_ROUTE_PREFIXES = ('/api/classify',)
+
+# Largest request body accepted (batch rosters are the biggest payloads)
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class WSGIBridge:
+    """
+    ASGI application that runs a WSGI app on bounded thread pools.
+
+    Args:
+        wsgi_app: The WSGI application to serve
+        heavy_workers: Threads for classification routes
+        heavy_queue: Classification requests allowed to wait for a thread
+        light_workers: Threads for every other route
+        startup: Function run (on a thread) at lifespan startup, before
+            the server accepts requests
+    """
+
+    def __init__(self, wsgi_app, heavy_workers=None, heavy_queue=64, light_workers=32, startup=None):
+        if heavy_workers is None:
+            heavy_workers = os.cpu_count() or 2
+
+        self.wsgi_app = wsgi_app
+        self.startup = startup
+        self.heavy_limit = heavy_workers + heavy_queue
+        self._heavy_active = 0
+        self._heavy = ThreadPoolExecutor(heavy_workers, thread_name_prefix='api-heavy')
+        self._light = ThreadPoolExecutor(light_workers, thread_name_prefix='api-light')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.startup is not None:
+                    try:
+                        await asyncio.to_thread(self.startup)
+                    except Exception as e:
+                        await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                        return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # The server has stopped accepting requests; let running ones finish
+                await asyncio.to_thread(self._heavy.shutdown, wait=True)
+                await asyncio.to_thread(self._light.shutdown, wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        heavy = scope['path'].startswith(HEAVY_ROUTE_PREFIXES)
+        if heavy:
+            if self._heavy_active >= self.heavy_limit:
+                await _send_error(send, 503, b'{"error":"Server is busy, please retry"}')
+                return
+            self._heavy_active += 1
+
+        try:
+            body = await _read_body(receive)
+            if body is None:
+                await _send_error(send, 413, b'{"error":"Request body too large"}')
+                return
+
+            executor = self._heavy if heavy else self._light
+            loop = asyncio.get_running_loop()
+            environ = _build_environ(scope, body)
+            status, headers, iterator, closer = await loop.run_in_executor(executor, self._start, environ)
+
+            try:
+                await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+                while True:
+                    chunk = await loop.run_in_executor(executor, _next_chunk, iterator)
+                    if not chunk:
+                        break
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                await send({'type': 'http.response.body', 'body': b''})
+            finally:
+                if closer is not None:
+                    await loop.run_in_executor(executor, closer)
+        finally:
+            if heavy:
+                self._heavy_active -= 1
+
+    def _start(self, environ):
+        """Call the WSGI app and capture its status and headers."""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        result = self.wsgi_app(environ, start_response)
+        iterator = iter(result)
+
+        # Pull the first chunk so lazy apps have called start_response
+        first = next(iterator, b'')
+        if first:
+            iterator = _prepend(first, iterator)
+        return response['status'], response['headers'], iterator, getattr(result, 'close', None)
+
+
+def _prepend(first, iterator):
+    yield first
+    yield from iterator
+
+
+def _next_chunk(iterator):
+    """
+    Return the next non-empty body chunk (empty when the body is done).
+
+    Chunks are forwarded as the app yields them; streaming routes already size
+    their chunks, so each one reaches the client as soon as it is produced.
+    """
+    for part in iterator:
+        if part:
+            return part
+    return b''
+
+
+async def _read_body(receive):
+    """Read the full request body, or return None if it exceeds MAX_BODY_BYTES."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_BYTES:
+            return None
+        if not message.get('more_body', False):
+            break
+    return bytes(body)
+
+
+async def _send_error(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
+
+
+# Loads the dataset and starts the job workers in each server process
+application = WSGIBridge(app, startup=init_app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Medical Schools API over ASGI')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes')
+    parser.add_argument('--keep-alive', type=int, default=30, help='Keep-alive timeout in seconds')
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help='Seconds to wait for in-flight requests on shutdown')
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is required for the async serving mode: pip install uvicorn")
+        sys.exit(1)
+
+    uvicorn.run(
+        'asgi:application',
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        backlog=4096,
+        lifespan='on'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Response cache for the /api/classify endpoint.
+
+Classification requests come from a small, finite input space once GPA is
+quantized to 0.01, and a few thousand applicant profiles account for most
+traffic. This module keeps fully serialized responses for those profiles in a
+bounded LRU cache, tracks how often each profile is requested with a
+count-min sketch, and can re-warm the most popular profiles in the background
+after the dataset is reloaded.
+"""
+
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+
+def quantize_profile(gpa, mcat, state='', degree=''):
+    """
+    Normalize classification inputs into a hashable cache key.
+
+    Args:
+        gpa: Applicant's GPA (rounded to 0.01)
+        mcat: Applicant's MCAT score
+        state: Applicant's state code (optional)
+        degree: Degree type filter (optional)
+
+    Returns:
+        Tuple of (gpa, mcat, state, degree)
+
+    Raises:
+        ValueError if GPA or MCAT isn't a finite number
+    """
+    gpa = float(gpa)
+    if not math.isfinite(gpa):
+        raise ValueError(f'GPA must be a finite number, not {gpa!r}')
+    try:
+        mcat = int(mcat)
+    except OverflowError:  # int(float('inf'))
+        raise ValueError(f'MCAT must be a finite number, not {mcat!r}') from None
+    return (round(gpa, 2), mcat, (state or '').upper(), (degree or '').upper())
+
+
+class CountMinSketch:
+    """
+    Approximate request counter with fixed memory.
+
+    Estimates never undercount; collisions can only inflate them.
+    """
+
+    def __init__(self, width=4096, depth=4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _cells(self, key):
+        for row in range(self.depth):
+            yield row, hash((row, key)) % self.width
+
+    def add(self, key, count=1):
+        """Increment a key and return its new estimated count."""
+        estimate = None
+        for row, col in self._cells(key):
+            self._rows[row][col] += count
+            value = self._rows[row][col]
+            if estimate is None or value < estimate:
+                estimate = value
+        return estimate
+
+    def estimate(self, key):
+        """Return the estimated count for a key."""
+        return min(self._rows[row][col] for row, col in self._cells(key))
+
+    def decay(self):
+        """Halve every counter so old popularity fades out."""
+        for row in self._rows:
+            for col in range(self.width):
+                row[col] >>= 1
+
+
+class ClassifyCache:
+    """
+    Bounded LRU cache of serialized classification responses.
+
+    Entries are tagged with the dataset version they were computed from, and a
+    lookup only hits when that version is still current. Memory is bounded by
+    the total size of the cached bodies.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, top_k=2048, decay_every=100000):
+        self.max_bytes = max_bytes
+        self.top_k = top_k
+        self.decay_every = decay_every
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # profile -> (version, body)
+        self._size = 0
+        self._version = None
+
+        # Popularity tracking: the sketch counts everything, the candidate
+        # table remembers which profiles are worth warming
+        self._sketch = CountMinSketch()
+        self._candidates = {}
+        self._requests_since_decay = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self, profile):
+        """Return the cached body for a profile, recording the request."""
+        with self._lock:
+            self._record(profile)
+            entry = self._entries.get(profile)
+            if entry is not None and entry[0] == self._version:
+                self._entries.move_to_end(profile)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def peek(self, profile):
+        """Return the cached body for a profile without counting it as a request."""
+        with self._lock:
+            entry = self._entries.get(profile)
+            if entry is not None and entry[0] == self._version:
+                return entry[1]
+            return None
+
+    def put(self, profile, body, version):
+        """Store a response body computed from the given dataset version."""
+        with self._lock:
+            if version != self._version or len(body) > self.max_bytes:
+                return
+            old = self._entries.pop(profile, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[profile] = (version, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def reset(self, version):
+        """Drop all entries and start caching for a new dataset version."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._version = version
+
+    def stats(self):
+        """Return cache counters and current size."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _record(self, profile):
+        """Count a request for a profile. Caller must hold the lock."""
+        estimate = self._sketch.add(profile)
+        self._candidates[profile] = estimate
+        if len(self._candidates) > 2 * self.top_k:
+            keep = sorted(self._candidates.items(), key=lambda item: item[1], reverse=True)[:self.top_k]
+            self._candidates = dict(keep)
+
+        self._requests_since_decay += 1
+        if self._requests_since_decay >= self.decay_every:
+            self._requests_since_decay = 0
+            self._sketch.decay()
+            self._candidates = {key: count >> 1 for key, count in self._candidates.items() if count > 1}
+
+    def popular(self, limit=None):
+        """Return the most requested profiles, most popular first."""
+        with self._lock:
+            ranked = sorted(self._candidates.items(), key=lambda item: item[1], reverse=True)
+        return [profile for profile, _ in ranked[:limit or self.top_k]]
+
+    def warm(self, compute, limit=None):
+        """
+        Precompute responses for the most popular profiles in the background.
+
+        Args:
+            compute: Function taking a profile tuple and returning the response body
+            limit: Maximum number of profiles to warm (defaults to top_k)
+
+        Returns:
+            The started daemon thread
+        """
+        version = self._version
+        profiles = self.popular(limit)
+
+        def run():
+            for profile in profiles:
+                if self._version != version:
+                    return  # Dataset was reloaded again; a newer warmup takes over
+                with self._lock:
+                    entry = self._entries.get(profile)
+                    if entry is not None and entry[0] == version:
+                        continue
+                try:
+                    body = compute(profile)
+                except Exception as e:
+                    print(f"Cache warmup failed for {profile}: {e}")
+                    continue
+                self.put(profile, body, version)
+
+        thread = threading.Thread(target=run, name='classify-cache-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def save_popular(self, path):
+        """Write the popular profiles and their counts to a JSON file."""
+        with self._lock:
+            ranked = sorted(self._candidates.items(), key=lambda item: item[1], reverse=True)[:self.top_k]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump([{'profile': list(profile), 'count': count} for profile, count in ranked], f)
+        os.replace(tmp_path, path)
+
+    def load_popular(self, path):
+        """Seed popularity counts from a file written by save_popular()."""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read popular profiles from {path}: {e}")
+            return 0
+
+        loaded = 0
+        with self._lock:
+            for entry in entries[:self.top_k]:
+                try:
+                    profile = quantize_profile(*entry['profile'])
+                    count = int(entry['count'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._candidates[profile] = self._sketch.add(profile, count)
+                loaded += 1
+        return loaded
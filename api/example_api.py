@@ -12,25 +12,62 @@ Usage:
     - http://localhost:5000/api/schools?state=CA (filter by state)
     - http://localhost:5000/api/schools?degree=MD (filter by degree type)
     - http://localhost:5000/api/schools?public=true (filter by public status)
+
+    The built-in server above is for development only. For production,
+    serve the same routes through the async entry point in asgi.py.
+
+    Importing this module doesn't load any data; init_app() does (asgi.py
+    runs it at startup). Call it before serving `app` any other way.
+
+    Set MEDSCHOOLS_STORAGE=sqlite to answer /api/schools filters from the
+    indexed SQLite database (scripts/school_db.py) instead of scanning.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, send_file
 from flask_cors import CORS
+import atexit
 import csv
+import math
 import os
+import sys
+import threading
+import time
+
+# Shared helpers that live with the data scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from classify_cache import ClassifyCache, quantize_profile
+from dataset_snapshot import file_sha256, open_for_csv
+from jobs import FINISHED_STATES, JobQueue, QueueFull
+from metrics import RequestMetrics, format_metric
+from profiling import (
+    MemorySnapshots, RequestProfile, is_admin, is_profiling, load_profile_report, mark
+)
+from school_fragments import classification_suffix, encode, encode_object
+from school_aliases import load_alias_pairs
+from school_db import ensure_database
+from school_store import SchoolStore, store_path_for
+from search_index import SchoolSearchIndex
+from single_flight import SingleFlight, TimeoutError
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend access
 
-# Load data from CSV
-def load_medical_schools():
-    """Load medical schools data from CSV file."""
-    schools = []
+# Maximum number of applicant profiles accepted by /api/classify/batch
+app.config.setdefault('CLASSIFY_BATCH_MAX_PROFILES', 1000)
+
+# Limits for background jobs submitted to /api/jobs
+app.config.setdefault('JOB_MAX_PROFILES', 10000)
+app.config.setdefault('JOB_MAX_GRID_POINTS', 20000)
+app.config.setdefault('JOB_MAX_RESULT_TTL', 7 * 24 * 3600)
 
+def _find_dataset_csv():
+    """Locate medical_schools_data.csv."""
     # Try different path locations
     api_dir = os.path.dirname(__file__)
     possible_paths = [
         os.path.join(api_dir, '..', 'data', 'medical_schools_data.csv'),  # From api folder
+        os.path.join(api_dir, '..', 'public', 'medical_schools_data.csv'),  # Frontend copy
         os.path.join(api_dir, 'medical_schools_data.csv'),  # Same directory
         'data/medical_schools_data.csv',  # From project root
         'medical_schools_data.csv'  # Current directory
@@ -44,30 +81,302 @@ def load_medical_schools():
 
     if not csv_path:
         raise FileNotFoundError("Could not find medical_schools_data.csv in expected locations")
+    return csv_path
+
+
+# Load data from CSV
+def load_medical_schools(csv_path=None):
+    """
+    Load medical schools data from CSV file.
+
+    Reads the prebuilt binary snapshot instead when there is an up-to-date one
+    (python3 scripts/dataset_snapshot.py build).
+    """
+    schools = []
+    if csv_path is None:
+        csv_path = _find_dataset_csv()
+
+    snapshot = open_for_csv(csv_path)
+    if snapshot is not None:
+        for row in snapshot.iter_rows():
+            schools.append(_school_from_row(row, len(schools) + 1))
+        return schools
 
     with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            # Convert to more API-friendly format
-            school = {
-                'id': len(schools) + 1,
-                'name': row['Medical School Name'],
-                'state': row['State'],
-                'degreeType': row['Degree Type'],
-                'avgGPA': row['Average GPA'],
-                'avgMCAT': row['Average MCAT'],
-                'minMCATNotes': row['Minimum MCAT Notes'],
-                'isPublic': row['Public School Status'] == 'Public',
-                'applicationSystem': row['Application System'],
-                'hasMDPhD': row['MD/PhD Program'] == 'Yes',
-                'websiteURL': row['Website URL']
-            }
-            schools.append(school)
+            schools.append(_school_from_row(row, len(schools) + 1))
 
     return schools
 
-# Cache the data in memory
-MEDICAL_SCHOOLS = load_medical_schools()
+
+def _school_from_row(row, school_id):
+    """Convert a CSV row to a more API-friendly format."""
+    return {
+        'id': school_id,
+        'name': row['Medical School Name'],
+        'state': row['State'],
+        'degreeType': row['Degree Type'],
+        'avgGPA': row['Average GPA'],
+        'avgMCAT': row['Average MCAT'],
+        'minMCATNotes': row['Minimum MCAT Notes'],
+        'isPublic': row['Public School Status'] == 'Public',
+        'applicationSystem': row['Application System'],
+        'hasMDPhD': row.get('MD/PhD Program') == 'Yes',  # Not in every export
+        'websiteURL': row['Website URL']
+    }
+
+
+def load_school_store():
+    """
+    Map the shared school store for the current dataset, building it if needed.
+
+    The store file is keyed by the source data's hash, so every worker serving
+    the same data maps the same file and only the first one builds it.
+    """
+    csv_path = _find_dataset_csv()
+    snapshot = open_for_csv(csv_path)
+    source_version = snapshot.version if snapshot is not None else file_sha256(csv_path)[:12]
+
+    path = store_path_for(source_version)
+    store = SchoolStore.open(path)
+    if store is None:
+        store = SchoolStore.build(load_medical_schools(csv_path), path)
+    return store
+
+
+def load_school_database():
+    """
+    Open the SQLite database for the dataset, importing the CSV if needed.
+
+    Only used when MEDSCHOOLS_STORAGE=sqlite; /api/schools filters then run
+    as indexed queries instead of a scan over the store's columns.
+
+    Returns:
+        SchoolDatabase, or None when the store is used for filtering
+    """
+    if os.environ.get('MEDSCHOOLS_STORAGE', 'store') != 'sqlite':
+        return None
+    return ensure_database(_find_dataset_csv())
+
+
+# Read-only school data (pre-encoded JSON plus the columns the routes filter
+# and classify on), memory-mapped so all workers share one copy. Loaded by
+# init_app(), not at import.
+MEDICAL_SCHOOLS = None
+SCHOOL_DATABASE = None
+DATASET_VERSION = None
+DATASET_LOADED_AT = None
+
+# Typeahead index over school names and the repo's alias tables
+SCHOOL_ALIAS_PAIRS = []
+SEARCH_INDEX = None
+SEARCH_MAX_RESULTS = 50
+
+# Serialized /api/classify responses for popular applicant profiles
+CLASSIFY_CACHE = ClassifyCache()
+POPULAR_PROFILES_PATH = os.path.join(os.path.dirname(__file__), '..', 'output', 'popular_profiles.json')
+
+# Identical concurrent cache misses share a single computation
+CLASSIFY_FLIGHTS = SingleFlight()
+CLASSIFY_WAIT_TIMEOUT = 10  # Seconds a coalesced request waits before giving up
+
+# Background jobs, shared with the other worker processes through SQLite
+# (opened by init_app()). MEDSCHOOLS_JOB_WORKERS=0 leaves running them to
+# other processes.
+JOB_QUEUE = None
+JOB_CHUNK_PROFILES = 32  # Profiles classified per pass (and per progress report)
+
+
+def reload_dataset(schools=None):
+    """
+    Swap in a fresh copy of the school data and rebuild everything derived from it.
+
+    Args:
+        schools: Already-loaded school list, kept in this process only
+            (defaults to mapping the store for the CSV)
+    """
+    global MEDICAL_SCHOOLS, SCHOOL_DATABASE, DATASET_VERSION, DATASET_LOADED_AT, SEARCH_INDEX
+
+    if schools is None:
+        store = load_school_store()
+        database = load_school_database()
+    else:
+        # The database only ever holds the CSV's rows
+        store = SchoolStore.build(schools)
+        database = None
+    search_index = SchoolSearchIndex(store, SCHOOL_ALIAS_PAIRS)
+    MEDICAL_SCHOOLS, SCHOOL_DATABASE, DATASET_VERSION, SEARCH_INDEX = \
+        store, database, store.version, search_index
+    DATASET_LOADED_AT = time.time()
+
+    # Cached responses belong to the old data; re-warm the popular profiles
+    CLASSIFY_CACHE.reset(DATASET_VERSION)
+    CLASSIFY_CACHE.warm(_build_classification)
+
+
+def _json_response(body, status=200):
+    """Wrap pre-encoded JSON bytes in a response."""
+    return Response(body, status=status, mimetype='application/json')
+
+
+# Streamed responses are sent in chunks of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _wants_stream():
+    """Return True if the client asked for NDJSON (Accept header or stream=1)."""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+    return best == 'application/x-ndjson'
+
+
+def _ndjson_chunks(lines):
+    """
+    Join encoded JSON records into newline-delimited chunks.
+
+    The first record is sent on its own so clients can start rendering right
+    away; after that, records are grouped into chunks of about
+    STREAM_CHUNK_BYTES so a slow client only ever holds up one chunk.
+    """
+    buf = bytearray()
+    first = True
+    for line in lines:
+        buf += line
+        buf += b'\n'
+        if first or len(buf) >= STREAM_CHUNK_BYTES:
+            yield bytes(buf)
+            buf.clear()
+            first = False
+    if buf:
+        yield bytes(buf)
+
+
+def _ndjson_response(lines):
+    """Stream encoded JSON records as an NDJSON response."""
+    return Response(_ndjson_chunks(lines), mimetype='application/x-ndjson')
+
+
+# Per-route request metrics, exposed at /metrics
+REQUEST_METRICS = RequestMetrics()
+
+
+@app.before_request
+def _start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    g.metrics_cpu_started = time.thread_time()
+    REQUEST_METRICS.request_started()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    rule = request.url_rule
+    route = rule.rule if rule else 'unmatched'
+    method, started = request.method, g.metrics_started
+    cpu = time.thread_time() - g.metrics_cpu_started
+    g.metrics_recorded = True
+
+    if not response.is_streamed:
+        REQUEST_METRICS.request_finished(
+            route, method, response.status_code, time.perf_counter() - started,
+            response.content_length, cpu
+        )
+        return response
+
+    # A streamed body is generated while it is sent, after this hook returns;
+    # count it as it goes and record the request once the server closes it.
+    # Chunks may be pulled on different threads (asgi.py), so CPU time is
+    # taken per chunk.
+    body = iter(response.response)
+    sent = [0, cpu]
+
+    def counted():
+        while True:
+            cpu_started = time.thread_time()
+            chunk = next(body, None)
+            sent[1] += time.thread_time() - cpu_started
+            if chunk is None:
+                return
+            sent[0] += len(chunk)
+            yield chunk
+
+    def record():
+        REQUEST_METRICS.request_finished(
+            route, method, response.status_code, time.perf_counter() - started, sent[0], sent[1]
+        )
+
+    response.response = counted()
+    response.call_on_close(record)
+    return response
+
+
+# On-demand profiling: send the admin token in an X-Profile header (or a
+# _profile query parameter) to run one request under cProfile
+@app.before_request
+def _start_request_profile():
+    token = request.headers.get('X-Profile') or request.args.get('_profile')
+    if token and is_admin(token):
+        g.profile = RequestProfile(f'{request.method} {request.full_path}')
+        g.profile.start()
+
+
+@app.after_request
+def _finish_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    response.headers['X-Profile-Id'] = profile.id
+    if not response.is_streamed:
+        profile.stop()
+        profile.save()
+        response.headers['Server-Timing'] = profile.server_timing()
+        return response
+
+    # A streamed body is generated after this hook returns, possibly on other
+    # threads (asgi.py): profile each chunk as it is pulled, and save the
+    # profile once the server closes the body. The headers are already sent
+    # by then, so the stage timings are only in the saved profile.
+    profile.pause()
+    body = iter(response.response)
+
+    def profiled():
+        while True:
+            profile.resume()
+            try:
+                chunk = next(body, None)
+                profile.mark('stream')
+            finally:
+                profile.pause()
+            if chunk is None:
+                return
+            yield chunk
+
+    def save():
+        profile.stop()
+        profile.save()
+
+    response.response = profiled()
+    response.call_on_close(save)
+    return response
+
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    # after_request is skipped when a view raises, so record the failure here
+    if 'metrics_started' in g and not g.get('metrics_recorded'):
+        rule = request.url_rule
+        REQUEST_METRICS.request_finished(
+            rule.rule if rule else 'unmatched',
+            request.method,
+            500,
+            time.perf_counter() - g.metrics_started,
+            cpu_seconds=time.thread_time() - g.metrics_cpu_started
+        )
+
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.stop()
 
 
 @app.route('/')
@@ -79,8 +388,13 @@ def home():
         'endpoints': {
             '/api/schools': 'Get all schools (supports filtering)',
             '/api/schools/<id>': 'Get specific school by ID',
+            '/api/search': 'Search school names and common aliases as you type (q, limit)',
             '/api/states': 'Get list of all states',
-            '/api/stats': 'Get summary statistics'
+            '/api/stats': 'Get summary statistics',
+            '/api/classify': 'Classify schools for an applicant (gpa, mcat, state, degree)',
+            '/api/classify/batch': 'POST a list of applicant profiles, returns NDJSON',
+            '/api/jobs': 'POST a background classify or grid job, then poll /api/jobs/<id>',
+            '/metrics': 'Service metrics in Prometheus text format'
         },
         'query_parameters': {
             'state': 'Filter by state (e.g., ?state=CA)',
@@ -91,7 +405,8 @@ def home():
             'min_mcat': 'Filter by minimum MCAT (e.g., ?min_mcat=510)',
             'max_mcat': 'Filter by maximum MCAT (e.g., ?max_mcat=520)',
             'app_system': 'Filter by application system (e.g., ?app_system=TMDSAS)',
-            'mdphd': 'Filter by MD/PhD program availability (e.g., ?mdphd=true)'
+            'mdphd': 'Filter by MD/PhD program availability (e.g., ?mdphd=true)',
+            'stream': 'Stream /api/schools or /api/classify as NDJSON (e.g., ?stream=1)'
         }
     })
 
@@ -111,85 +426,182 @@ def get_schools():
         max_gpa: Maximum GPA threshold
         min_mcat: Minimum MCAT threshold
         max_mcat: Maximum MCAT threshold
+        stream: Set to 1 for NDJSON output (same as Accept: application/x-ndjson)
     """
-    schools = MEDICAL_SCHOOLS.copy()
+    store, database = MEDICAL_SCHOOLS, SCHOOL_DATABASE
+    filters = _school_filter_args(request.args)
+    mark('parse_args')
+
+    matches = range(len(store))
+    if filters and database is not None:
+        matches = [store.position(school_id) for school_id in database.select_ids(filters)]
+    elif filters:
+        predicates = _school_predicates(filters, store)
+        matches = (i for i in matches if all(f(i) for f in predicates))
+    if _wants_stream():
+        # One school per line, filtered as it is sent
+        return _ndjson_response(store.fragment(i) for i in matches)
+
+    positions = list(matches) if filters else matches
+    mark('filter')
+
+    body = encode_object([
+        ('count', encode(len(positions))),
+        ('data', store.encode_array(positions))
+    ])
+    mark('serialize')
+    return _json_response(body)
+
+
+def _school_filter_args(args):
+    """
+    Read the /api/schools filters from query parameters.
+
+    Args:
+        args: Request query parameters
+
+    Returns:
+        Dictionary of the filters that are set, keyed like school_db filters
+    """
+    filters = {}
 
-    # Apply filters
-    state = request.args.get('state', '').upper()
+    state = args.get('state', '').upper()
     if state:
-        schools = [s for s in schools if s['state'] == state]
+        filters['state'] = state
 
-    degree = request.args.get('degree', '').upper()
+    degree = args.get('degree', '').upper()
     if degree:
-        schools = [s for s in schools if s['degreeType'] == degree]
+        filters['degree_type'] = degree
 
-    public_filter = request.args.get('public', '').lower()
-    if public_filter == 'true':
-        schools = [s for s in schools if s['isPublic']]
-    elif public_filter == 'false':
-        schools = [s for s in schools if not s['isPublic']]
+    public_filter = args.get('public', '').lower()
+    if public_filter in ('true', 'false'):
+        filters['public'] = public_filter == 'true'
 
-    app_system = request.args.get('app_system', '').upper()
+    app_system = args.get('app_system', '').upper()
     if app_system:
-        schools = [s for s in schools if s['applicationSystem'] == app_system]
+        filters['app_system'] = app_system
 
-    mdphd_filter = request.args.get('mdphd', '').lower()
-    if mdphd_filter == 'true':
-        schools = [s for s in schools if s['hasMDPhD']]
-    elif mdphd_filter == 'false':
-        schools = [s for s in schools if not s['hasMDPhD']]
+    mdphd_filter = args.get('mdphd', '').lower()
+    if mdphd_filter in ('true', 'false'):
+        filters['mdphd'] = mdphd_filter == 'true'
 
-    # GPA filtering
+    # GPA filtering (stored GPAs are parsed like _parse_gpa)
     try:
-        min_gpa = request.args.get('min_gpa')
+        min_gpa = args.get('min_gpa')
         if min_gpa:
-            min_gpa = float(min_gpa)
-            schools = [s for s in schools if _parse_gpa(s['avgGPA']) >= min_gpa]
+            filters['min_gpa'] = float(min_gpa)
 
-        max_gpa = request.args.get('max_gpa')
+        max_gpa = args.get('max_gpa')
         if max_gpa:
-            max_gpa = float(max_gpa)
-            schools = [s for s in schools if _parse_gpa(s['avgGPA']) <= max_gpa]
+            filters['max_gpa'] = float(max_gpa)
     except ValueError:
         pass
 
     # MCAT filtering
     try:
-        min_mcat = request.args.get('min_mcat')
+        min_mcat = args.get('min_mcat')
         if min_mcat:
-            min_mcat = int(min_mcat)
-            schools = [s for s in schools if _parse_mcat(s['avgMCAT']) >= min_mcat]
+            filters['min_mcat'] = int(min_mcat)
 
-        max_mcat = request.args.get('max_mcat')
+        max_mcat = args.get('max_mcat')
         if max_mcat:
-            max_mcat = int(max_mcat)
-            schools = [s for s in schools if _parse_mcat(s['avgMCAT']) <= max_mcat]
+            filters['max_mcat'] = int(max_mcat)
     except ValueError:
         pass
 
-    return jsonify({
-        'count': len(schools),
-        'data': schools
-    })
+    return filters
+
+
+def _school_predicates(filters, store):
+    """
+    Turn /api/schools filters into predicates over the store's columns.
+
+    Args:
+        filters: Dictionary from _school_filter_args()
+        store: SchoolStore the predicates read their columns from
+
+    Returns:
+        List of predicates on a school's position that it must all pass
+    """
+    predicates = []
+
+    for key, field in (('state', 'state'), ('degree_type', 'degreeType'), ('app_system', 'applicationSystem')):
+        if key in filters:
+            predicates.append(_equals_filter(store, field, filters[key]))
+
+    for key, field in (('public', 'isPublic'), ('mdphd', 'hasMDPhD')):
+        if key in filters:
+            flags, wanted = store.array(field), filters[key]
+            predicates.append(lambda i, flags=flags, wanted=wanted: bool(flags[i]) == wanted)
+
+    gpas = store.array('gpa')
+    if 'min_gpa' in filters:
+        min_gpa = filters['min_gpa']
+        predicates.append(lambda i: gpas[i] >= min_gpa)
+    if 'max_gpa' in filters:
+        max_gpa = filters['max_gpa']
+        predicates.append(lambda i: gpas[i] <= max_gpa)
+
+    mcats = store.array('mcat')
+    if 'min_mcat' in filters:
+        min_mcat = filters['min_mcat']
+        predicates.append(lambda i: mcats[i] >= min_mcat)
+    if 'max_mcat' in filters:
+        max_mcat = filters['max_mcat']
+        predicates.append(lambda i: mcats[i] <= max_mcat)
+
+    return predicates
+
+
+def _equals_filter(store, field, value):
+    """Predicate matching schools whose category column equals value."""
+    codes, code = store.array(field), store.code(field, value)
+    return lambda i: codes[i] == code
 
 
 @app.route('/api/schools/<int:school_id>', methods=['GET'])
 def get_school(school_id):
     """Get a specific school by ID."""
-    school = next((s for s in MEDICAL_SCHOOLS if s['id'] == school_id), None)
+    school = MEDICAL_SCHOOLS.school(school_id)
 
     if school:
-        return jsonify(school)
+        return _json_response(school)
     else:
         return jsonify({'error': 'School not found'}), 404
 
 
+@app.route('/api/search', methods=['GET'])
+def search_schools():
+    """
+    Typeahead search over school names and known aliases.
+
+    Query Parameters:
+        q: Search text (the last word may be partially typed, typos are tolerated)
+        limit: Maximum number of results (default 10, at most 50)
+    """
+    query = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), SEARCH_MAX_RESULTS)
+    except ValueError:
+        limit = 10
+
+    results = SEARCH_INDEX.search(query, limit=limit)
+    return jsonify({
+        'query': query,
+        'count': len(results),
+        'data': results
+    })
+
+
 @app.route('/api/states', methods=['GET'])
 def get_states():
     """Get list of all states with school counts."""
+    store = MEDICAL_SCHOOLS
+    state_names, degree_names = store.values('state'), store.values('degreeType')
+
     states = {}
-    for school in MEDICAL_SCHOOLS:
-        state = school['state']
+    for state_code, degree_code in zip(store.array('state'), store.array('degreeType')):
+        state = state_names[state_code]
         if state not in states:
             states[state] = {
                 'state': state,
@@ -198,7 +610,7 @@ def get_states():
                 'do_count': 0
             }
         states[state]['count'] += 1
-        if school['degreeType'] == 'MD':
+        if degree_names[degree_code] == 'MD':
             states[state]['md_count'] += 1
         else:
             states[state]['do_count'] += 1
@@ -212,19 +624,21 @@ def get_states():
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get summary statistics."""
-    total_schools = len(MEDICAL_SCHOOLS)
-    md_schools = sum(1 for s in MEDICAL_SCHOOLS if s['degreeType'] == 'MD')
-    do_schools = sum(1 for s in MEDICAL_SCHOOLS if s['degreeType'] == 'DO')
-    public_schools = sum(1 for s in MEDICAL_SCHOOLS if s['isPublic'])
+    store = MEDICAL_SCHOOLS
+    degrees = store.array('degreeType')
+    md_code, do_code = store.code('degreeType', 'MD'), store.code('degreeType', 'DO')
+
+    total_schools = len(store)
+    md_schools = sum(1 for code in degrees if code == md_code)
+    do_schools = sum(1 for code in degrees if code == do_code)
+    public_schools = sum(store.array('isPublic'))
     private_schools = total_schools - public_schools
 
-    # Calculate GPA stats
-    gpas = [_parse_gpa(s['avgGPA']) for s in MEDICAL_SCHOOLS]
-    gpas = [g for g in gpas if g > 0]  # Filter out invalid values
+    # Calculate GPA stats (stored GPAs are parsed like _parse_gpa)
+    gpas = [g for g in store.array('gpa') if g > 0]  # Filter out invalid values
 
     # Calculate MCAT stats
-    mcats = [_parse_mcat(s['avgMCAT']) for s in MEDICAL_SCHOOLS]
-    mcats = [m for m in mcats if m > 0]  # Filter out invalid values
+    mcats = [m for m in store.array('mcat') if m > 0]  # Filter out invalid values
 
     return jsonify({
         'total_schools': total_schools,
@@ -249,6 +663,111 @@ def get_stats():
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Service metrics in Prometheus text format."""
+    cache = CLASSIFY_CACHE.stats()
+    cache_label = {'cache': 'classify'}
+
+    lines = [REQUEST_METRICS.render().rstrip('\n')]
+    lines += format_metric('medschools_api_cache_hits_total', 'counter',
+                           'Cache lookups that returned a stored response.', [(cache_label, cache['hits'])])
+    lines += format_metric('medschools_api_cache_misses_total', 'counter',
+                           'Cache lookups that had to compute a response.', [(cache_label, cache['misses'])])
+    lines += format_metric('medschools_api_cache_evictions_total', 'counter',
+                           'Entries evicted to stay within the size limit.', [(cache_label, cache['evictions'])])
+    lines += format_metric('medschools_api_cache_entries', 'gauge',
+                           'Entries currently cached.', [(cache_label, cache['entries'])])
+    lines += format_metric('medschools_api_cache_bytes', 'gauge',
+                           'Bytes currently cached.', [(cache_label, cache['bytes'])])
+    lines += format_metric('medschools_api_coalesced_requests_total', 'counter',
+                           'Requests that waited on an identical in-flight computation.',
+                           [(cache_label, CLASSIFY_FLIGHTS.coalesced)])
+    lines += format_metric('medschools_api_jobs', 'gauge',
+                           'Background jobs by state.',
+                           [({'state': state}, count) for state, count in JOB_QUEUE.counts().items()])
+    lines += format_metric('medschools_api_dataset_info', 'gauge',
+                           'Currently loaded dataset version.', [({'version': DATASET_VERSION}, 1)])
+    lines += format_metric('medschools_api_dataset_rows', 'gauge',
+                           'Schools in the loaded dataset.', [(None, len(MEDICAL_SCHOOLS))])
+    lines += format_metric('medschools_api_dataset_loaded_timestamp_seconds', 'gauge',
+                           'Unix time the dataset was last loaded.', [(None, DATASET_LOADED_AT)])
+    lines += format_metric('process_cpu_seconds_total', 'counter',
+                           'User and system CPU time spent by this server process.',
+                           [(None, time.process_time())])
+
+    return Response('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Admin endpoints require the admin token in an X-Admin-Token header and are
+# hidden (404) when no token is configured
+MEMORY_SNAPSHOTS = MemorySnapshots()
+PROFILE_SORT_KEYS = {'cumulative', 'tottime', 'calls', 'ncalls'}
+
+
+def _is_admin_request():
+    return is_admin(request.headers.get('X-Admin-Token', ''))
+
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile_report(profile_id):
+    """
+    Get the cProfile report for a profiled request.
+
+    Query Parameters:
+        sort: cumulative (default), tottime, calls or ncalls
+        limit: Number of functions to list (default 40)
+    """
+    if not _is_admin_request():
+        return jsonify({'error': 'Not found'}), 404
+
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in PROFILE_SORT_KEYS:
+        sort = 'cumulative'
+    try:
+        limit = int(request.args.get('limit', 40))
+    except ValueError:
+        limit = 40
+
+    report = load_profile_report(profile_id, limit=limit, sort=sort)
+    if report is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(report, mimetype='text/plain')
+
+
+@app.route('/api/admin/memory/snapshot', methods=['POST'])
+def take_memory_snapshot():
+    """
+    Take a tracemalloc snapshot and diff it against the previous one.
+
+    The first call starts tracing. Query Parameters:
+        limit: Number of allocation sites to return (default 25)
+        group_by: lineno (default), filename or traceback
+    """
+    if not _is_admin_request():
+        return jsonify({'error': 'Not found'}), 404
+
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        group_by = 'lineno'
+    try:
+        limit = int(request.args.get('limit', 25))
+    except ValueError:
+        limit = 25
+
+    return jsonify(MEMORY_SNAPSHOTS.snapshot(limit=limit, group_by=group_by))
+
+
+@app.route('/api/admin/memory', methods=['DELETE'])
+def stop_memory_tracing():
+    """Stop tracemalloc and discard the stored snapshot."""
+    if not _is_admin_request():
+        return jsonify({'error': 'Not found'}), 404
+
+    MEMORY_SNAPSHOTS.stop()
+    return jsonify({'tracing': False})
+
+
 def _parse_gpa(gpa_str):
     """Parse GPA string to float, handling special cases."""
     if not gpa_str or gpa_str == 'NR':
@@ -291,125 +810,573 @@ def classify_schools():
     Classify schools as Reach, Target, or Undershoot for an applicant.
 
     Query Parameters:
-        gpa: User's GPA (required)
+        gpa: User's GPA (required, rounded to 0.01)
         mcat: User's MCAT score (required)
         state: User's state (optional)
         degree: Filter by degree type (optional)
+        stream: Set to 1 for NDJSON output (same as Accept: application/x-ndjson).
+            Schools are sent one per line in reach, target, undershoot order,
+            followed by a final line with userStats, summary and recommendations.
     """
     try:
-        user_gpa = float(request.args.get('gpa'))
-        user_mcat = int(request.args.get('mcat'))
+        profile = quantize_profile(
+            request.args.get('gpa'),
+            request.args.get('mcat'),
+            request.args.get('state', ''),
+            request.args.get('degree', '')
+        )
     except (TypeError, ValueError):
         return jsonify({'error': 'GPA and MCAT parameters are required'}), 400
+    mark('parse_args')
 
-    user_state = request.args.get('state', '').upper()
-    degree_filter = request.args.get('degree', '').upper()
-
-    # Classification thresholds
-    GPA_UNDERSHOOT_DIFF = 0.2
-    GPA_TARGET_RANGE = 0.1
-    MCAT_UNDERSHOOT_DIFF = 3
-    MCAT_TARGET_RANGE = 2
-
-    def classify_by_gpa(user_gpa, school_gpa):
-        diff = user_gpa - school_gpa
-        if diff >= GPA_UNDERSHOOT_DIFF:
-            return 'Undershoot'
-        elif abs(diff) <= GPA_TARGET_RANGE:
-            return 'Target'
-        else:
-            return 'Reach' if diff < 0 else 'Target'
-
-    def classify_by_mcat(user_mcat, school_mcat):
-        diff = user_mcat - school_mcat
-        if diff >= MCAT_UNDERSHOOT_DIFF:
-            return 'Undershoot'
-        elif abs(diff) <= MCAT_TARGET_RANGE:
-            return 'Target'
+    if _wants_stream():
+        return _ndjson_response(_stream_classification(profile, MEDICAL_SCHOOLS))
+
+    if is_profiling():
+        # Profile the real work, not a cache hit
+        return _json_response(_build_classification(profile))
+
+    body = CLASSIFY_CACHE.get(profile)
+    if body is None:
+        try:
+            body = CLASSIFY_FLIGHTS.do(
+                (DATASET_VERSION, profile),
+                lambda: _compute_classification(profile),
+                timeout=CLASSIFY_WAIT_TIMEOUT
+            )
+        except TimeoutError:
+            return jsonify({'error': 'Classification is taking too long, please retry'}), 503
+
+    return _json_response(body)
+
+
+def _compute_classification(profile):
+    """Build a classification response and store it in the cache."""
+    version = DATASET_VERSION
+    body = _build_classification(profile)
+    CLASSIFY_CACHE.put(profile, body, version)
+    return body
+
+
+@app.route('/api/classify/batch', methods=['POST'])
+def classify_batch():
+    """
+    Classify schools for a whole roster of applicants in one request.
+
+    Request Body (JSON):
+        profiles: List of {gpa, mcat, state, degree} objects (required)
+        state: Default applicant state for profiles that don't set one
+        degree: Default degree type filter for profiles that don't set one
+
+    Returns NDJSON with one line per profile, in input order. Each line is
+    {"index": i, "result": <same body as /api/classify>} or
+    {"index": i, "error": "..."} for an invalid profile.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('profiles'), list):
+        return jsonify({'error': 'Request body must be a JSON object with a "profiles" list'}), 400
+
+    max_profiles = app.config['CLASSIFY_BATCH_MAX_PROFILES']
+    if len(payload['profiles']) > max_profiles:
+        return jsonify({'error': f'Too many profiles (maximum is {max_profiles} per request)'}), 413
+
+    keys = _batch_profiles(payload)
+
+    def generate():
+        yield from _batch_lines(keys, _classify_batch(keys))
+
+    return _ndjson_response(generate())
+
+
+def _batch_profiles(payload):
+    """
+    Quantize the profiles of a batch request body.
+
+    Args:
+        payload: Dict with a "profiles" list and optional default state/degree
+
+    Returns:
+        List of profile tuples, with None for each invalid entry
+    """
+    default_state = payload.get('state') or ''
+    default_degree = payload.get('degree') or ''
+
+    keys = []
+    for entry in payload['profiles']:
+        try:
+            keys.append(quantize_profile(
+                entry['gpa'],
+                entry['mcat'],
+                entry.get('state') or default_state,
+                entry.get('degree') or default_degree
+            ))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            keys.append(None)
+    return keys
+
+
+def _batch_lines(profiles, bodies, start=0):
+    """Yield the NDJSON lines of a batch response, numbering profiles from start."""
+    for index, profile in enumerate(profiles, start):
+        prefix = b'{"index":' + encode(index)
+        if profile is None:
+            yield prefix + b',"error":"GPA and MCAT are required"}'
         else:
-            return 'Reach' if diff < 0 else 'Target'
-
-    def classify_overall(gpa_class, mcat_class):
-        if gpa_class == mcat_class:
-            return gpa_class
-        if (gpa_class == 'Reach' and mcat_class == 'Undershoot') or \
-           (gpa_class == 'Undershoot' and mcat_class == 'Reach'):
-            return 'Target'
-        if gpa_class == 'Target':
-            return mcat_class
-        if mcat_class == 'Target':
-            return gpa_class
-        return 'Target'
+            yield prefix + b',"result":' + bodies[profile] + b'}'
+
+
+def _classify_batch(profiles, use_cache=True):
+    """
+    Return response bodies for a list of profiles, computing cache misses together.
 
-    classified_schools = []
+    Args:
+        profiles: List of profile tuples (None entries are skipped)
+        use_cache: Count the profiles as requests and cache what is computed.
+            Background jobs only read the cache, so a large roster can't
+            evict the entries interactive requests rely on.
 
-    for school in MEDICAL_SCHOOLS:
-        # Apply degree filter if specified
-        if degree_filter and school['degreeType'] != degree_filter:
+    Returns:
+        Dictionary mapping each distinct profile to its response body
+    """
+    version, store = DATASET_VERSION, MEDICAL_SCHOOLS
+    bodies = {}
+    missing = []
+    for profile in profiles:
+        if profile is None or profile in bodies:
             continue
+        body = CLASSIFY_CACHE.get(profile) if use_cache else CLASSIFY_CACHE.peek(profile)
+        bodies[profile] = body
+        if body is None:
+            missing.append(profile)
 
-        # Parse school stats
-        school_gpa = _parse_gpa(school['avgGPA'])
-        school_mcat = _parse_mcat(school['avgMCAT'])
-
-        if school_gpa == 0 or school_mcat == 0:
-            continue  # Skip schools with invalid data
-
-        # Classify
-        gpa_class = classify_by_gpa(user_gpa, school_gpa)
-        mcat_class = classify_by_mcat(user_mcat, school_mcat)
-        overall = classify_overall(gpa_class, mcat_class)
-
-        # Check in-state advantage
-        in_state_advantage = (user_state and school['state'] == user_state and school['isPublic'])
-
-        classified_schools.append({
-            **school,
-            'classification': overall,
-            'gpaClassification': gpa_class,
-            'mcatClassification': mcat_class,
-            'gpaDiff': round(user_gpa - school_gpa, 2),
-            'mcatDiff': user_mcat - school_mcat,
-            'inStateAdvantage': in_state_advantage
-        })
-
-    # Sort by classification and then by competitiveness
-    reach = [s for s in classified_schools if s['classification'] == 'Reach']
-    target = [s for s in classified_schools if s['classification'] == 'Target']
-    undershoot = [s for s in classified_schools if s['classification'] == 'Undershoot']
-
-    # Sort each category by school stats (most competitive first)
-    reach.sort(key=lambda x: (_parse_gpa(x['avgGPA']), _parse_mcat(x['avgMCAT'])), reverse=True)
-    target.sort(key=lambda x: (_parse_gpa(x['avgGPA']), _parse_mcat(x['avgMCAT'])), reverse=True)
-    undershoot.sort(key=lambda x: (_parse_gpa(x['avgGPA']), _parse_mcat(x['avgMCAT'])), reverse=True)
+    if missing:
+        for profile, buckets in zip(missing, _classify_profiles(missing, store)):
+            body = _encode_classification(profile, buckets, store)
+            if use_cache:
+                CLASSIFY_CACHE.put(profile, body, version)
+            bodies[profile] = body
 
-    return jsonify({
-        'userStats': {
+    return bodies
+
+
+def _build_classification(profile):
+    """
+    Classify every school for an applicant profile.
+
+    Args:
+        profile: Tuple of (gpa, mcat, state, degree) from quantize_profile()
+
+    Returns:
+        Serialized /api/classify response body
+    """
+    store = MEDICAL_SCHOOLS
+    buckets = _classify_profiles([profile], store)[0]
+    mark('filter_classify')
+    body = _encode_classification(profile, buckets, store)
+    mark('serialize')
+    return body
+
+
+# Classification thresholds
+GPA_UNDERSHOOT_DIFF = 0.2
+GPA_TARGET_RANGE = 0.1
+MCAT_UNDERSHOOT_DIFF = 3
+MCAT_TARGET_RANGE = 2
+
+
+def _classify_by_gpa(user_gpa, school_gpa):
+    diff = user_gpa - school_gpa
+    if diff >= GPA_UNDERSHOOT_DIFF:
+        return 'Undershoot'
+    elif abs(diff) <= GPA_TARGET_RANGE:
+        return 'Target'
+    else:
+        return 'Reach' if diff < 0 else 'Target'
+
+
+def _classify_by_mcat(user_mcat, school_mcat):
+    diff = user_mcat - school_mcat
+    if diff >= MCAT_UNDERSHOOT_DIFF:
+        return 'Undershoot'
+    elif abs(diff) <= MCAT_TARGET_RANGE:
+        return 'Target'
+    else:
+        return 'Reach' if diff < 0 else 'Target'
+
+
+def _classify_overall(gpa_class, mcat_class):
+    if gpa_class == mcat_class:
+        return gpa_class
+    if (gpa_class == 'Reach' and mcat_class == 'Undershoot') or \
+       (gpa_class == 'Undershoot' and mcat_class == 'Reach'):
+        return 'Target'
+    if gpa_class == 'Target':
+        return mcat_class
+    if mcat_class == 'Target':
+        return gpa_class
+    return 'Target'
+
+
+def _classify_profiles(profiles, store):
+    """
+    Classify schools for several profiles in a single pass over the school data.
+
+    Args:
+        profiles: List of profile tuples from quantize_profile()
+        store: SchoolStore to classify
+
+    Returns:
+        One dict per profile mapping 'Reach', 'Target' and 'Undershoot' to
+        lists of (position, suffix) pairs, most competitive first
+    """
+    results = [{'Reach': [], 'Target': [], 'Undershoot': []} for _ in profiles]
+    prepared = [_prepare_profile(profile, store) for profile in profiles]
+
+    # Many schools share the same averages, so each profile classifies every
+    # distinct GPA and MCAT value only once
+    gpa_classes = [{} for _ in profiles]
+    mcat_classes = [{} for _ in profiles]
+
+    for position, school_gpa, school_mcat, state_code, degree_code, is_public in store.ranked():
+        for i, (user_gpa, user_mcat, user_state, user_state_code, degree_filter, degree_filter_code) in \
+                enumerate(prepared):
+            # Apply degree filter if specified
+            if degree_filter and degree_code != degree_filter_code:
+                continue
+
+            gpa_class = gpa_classes[i].get(school_gpa)
+            if gpa_class is None:
+                gpa_class = gpa_classes[i][school_gpa] = _classify_by_gpa(user_gpa, school_gpa)
+            mcat_class = mcat_classes[i].get(school_mcat)
+            if mcat_class is None:
+                mcat_class = mcat_classes[i][school_mcat] = _classify_by_mcat(user_mcat, school_mcat)
+            overall = _classify_overall(gpa_class, mcat_class)
+
+            # Check in-state advantage
+            in_state_advantage = (user_state and state_code == user_state_code and is_public == 1)
+
+            # Only the per-request fields are encoded here; the school itself is pre-encoded
+            suffix = classification_suffix(
+                overall, gpa_class, mcat_class,
+                round(user_gpa - school_gpa, 2),
+                user_mcat - school_mcat,
+                in_state_advantage
+            )
+            results[i][overall].append((position, suffix))
+
+    return results
+
+
+def _prepare_profile(profile, store):
+    """Add the store's codes for the profile's state and degree filter."""
+    user_gpa, user_mcat, user_state, degree_filter = profile
+    return (
+        user_gpa, user_mcat,
+        user_state, store.code('state', user_state),
+        degree_filter, store.code('degreeType', degree_filter)
+    )
+
+
+def _stream_classification(profile, store):
+    """
+    Classify schools for one profile, yielding each school as it is classified.
+
+    Makes one pass over the school data per classification bucket, so the
+    output is in the same order as /api/classify without holding any bucket
+    in memory. The per-value GPA and MCAT classes are shared between passes.
+
+    Yields:
+        Encoded classified school objects, then the userStats/summary/
+        recommendations object
+    """
+    user_gpa, user_mcat, user_state, user_state_code, degree_filter, degree_filter_code = \
+        _prepare_profile(profile, store)
+    gpa_classes = {}
+    mcat_classes = {}
+    counts = {}
+
+    for bucket in ('Reach', 'Target', 'Undershoot'):
+        count = 0
+        for position, school_gpa, school_mcat, state_code, degree_code, is_public in store.ranked():
+            if degree_filter and degree_code != degree_filter_code:
+                continue
+
+            gpa_class = gpa_classes.get(school_gpa)
+            if gpa_class is None:
+                gpa_class = gpa_classes[school_gpa] = _classify_by_gpa(user_gpa, school_gpa)
+            mcat_class = mcat_classes.get(school_mcat)
+            if mcat_class is None:
+                mcat_class = mcat_classes[school_mcat] = _classify_by_mcat(user_mcat, school_mcat)
+            overall = _classify_overall(gpa_class, mcat_class)
+            if overall != bucket:
+                continue
+
+            in_state_advantage = (user_state and state_code == user_state_code and is_public == 1)
+            yield store.classified(position, classification_suffix(
+                overall, gpa_class, mcat_class,
+                round(user_gpa - school_gpa, 2),
+                user_mcat - school_mcat,
+                in_state_advantage
+            ))
+            count += 1
+        counts[bucket] = count
+
+    yield encode_object(_classification_overview(profile, counts['Reach'], counts['Target'], counts['Undershoot']))
+
+
+def _classification_overview(profile, reach_count, target_count, undershoot_count):
+    """Encode the userStats, summary and recommendations fields of a classification."""
+    user_gpa, user_mcat, user_state, _ = profile
+    return [
+        ('userStats', encode({
             'gpa': user_gpa,
             'mcat': user_mcat,
             'state': user_state or None
-        },
-        'summary': {
-            'totalSchools': len(classified_schools),
-            'reachCount': len(reach),
-            'targetCount': len(target),
-            'undershootCount': len(undershoot)
-        },
-        'recommendations': {
+        })),
+        ('summary', encode({
+            'totalSchools': reach_count + target_count + undershoot_count,
+            'reachCount': reach_count,
+            'targetCount': target_count,
+            'undershootCount': undershoot_count
+        })),
+        ('recommendations', encode({
             'reach': '3-5 schools',
             'target': '7-10 schools',
             'undershoot': '5-7 schools',
             'totalRecommended': '15-22 schools'
-        },
-        'schools': {
-            'reach': reach,
-            'target': target,
-            'undershoot': undershoot
-        }
-    })
+        }))
+    ]
+
+
+def _encode_classification(profile, buckets, store):
+    """Serialize classified schools into the /api/classify response body."""
+    reach, target, undershoot = buckets['Reach'], buckets['Target'], buckets['Undershoot']
+
+    return encode_object(_classification_overview(profile, len(reach), len(target), len(undershoot)) + [
+        ('schools', encode_object([
+            ('reach', store.classified_array(reach)),
+            ('target', store.classified_array(target)),
+            ('undershoot', store.classified_array(undershoot))
+        ]))
+    ])
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submit a background job.
+
+    Request Body (JSON):
+        type: "classify" or "grid" (required)
+        params: Job parameters (required)
+            classify: Same body as /api/classify/batch (profiles, state,
+                degree). The result is the same NDJSON.
+            grid: Classify every GPA/MCAT combination in a range - gpaMin,
+                gpaMax, gpaStep (default 2.5 to 4.0 by 0.05), mcatMin, mcatMax,
+                mcatStep (default 490 to 528 by 1), state, degree. The result
+                is NDJSON with one line per combination: gpa, mcat, summary and
+                the reach/target/undershoot school IDs.
+        resultTTL: Seconds to keep the result once the job finishes (optional)
+
+    Returns 202 with the job status; poll the URL in the Location header.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or payload.get('type') not in JOB_PARAMS:
+        return jsonify({'error': f'Job type must be one of: {", ".join(sorted(JOB_PARAMS))}'}), 400
+    if not isinstance(payload.get('params'), dict):
+        return jsonify({'error': 'Request body must include a "params" object'}), 400
+
+    try:
+        params = JOB_PARAMS[payload['type']](payload['params'])
+        result_ttl = payload.get('resultTTL')
+        if result_ttl is not None:
+            result_ttl = float(result_ttl)
+            if not math.isfinite(result_ttl) or result_ttl <= 0:
+                raise ValueError('resultTTL must be a positive number of seconds')
+            result_ttl = min(result_ttl, app.config['JOB_MAX_RESULT_TTL'])
+    except (TypeError, ValueError, OverflowError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    JOB_QUEUE.start()
+    try:
+        job = JOB_QUEUE.submit(payload['type'], params, result_ttl)
+    except QueueFull:
+        return jsonify({'error': 'Too many jobs are waiting, please retry later'}), 503
+
+    response = jsonify(_job_status(job))
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job['id']}"
+    return response
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status and progress, with a resultURL once it has succeeded."""
+    JOB_QUEUE.start()
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_status(job))
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Download a finished job's result."""
+    result = JOB_QUEUE.result(job_id)
+    if result is None:
+        if JOB_QUEUE.get(job_id) is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'error': 'Job has no result'}), 409
+    path, mimetype = result
+    return send_file(path, mimetype=mimetype)
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job, or delete a finished one and its result."""
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] in FINISHED_STATES:
+        JOB_QUEUE.delete(job_id)
+        return jsonify({'id': job_id, 'deleted': True})
+    job = JOB_QUEUE.cancel(job_id)
+    if job is None:  # purged or expired since the lookup above
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_status(job))
+
+
+def _job_status(job):
+    status = dict(job)
+    if job['status'] == 'succeeded':
+        status['resultURL'] = f"/api/jobs/{job['id']}/result"
+    return status
+
+
+def _classify_job_params(params):
+    """Validate a classify job's parameters (the /api/classify/batch body)."""
+    if not isinstance(params.get('profiles'), list):
+        raise ValueError('params must include a "profiles" list')
+    max_profiles = app.config['JOB_MAX_PROFILES']
+    if len(params['profiles']) > max_profiles:
+        raise ValueError(f'Too many profiles (maximum is {max_profiles} per job)')
+    return {'profiles': _batch_profiles(params)}
+
+
+def _finite_param(params, name, default):
+    """A numeric job parameter as a float; ValueError unless it is a finite number."""
+    value = float(params.get(name, default))
+    if not math.isfinite(value):
+        raise ValueError(f'{name} must be a finite number')
+    return value
+
+
+def _grid_job_params(params):
+    """Validate a grid job's parameters and expand them into the list of GPA/MCAT points."""
+    gpa_min = round(_finite_param(params, 'gpaMin', 2.5), 2)
+    gpa_max = round(_finite_param(params, 'gpaMax', 4.0), 2)
+    gpa_step = round(_finite_param(params, 'gpaStep', 0.05), 2)
+    mcat_min = int(_finite_param(params, 'mcatMin', 490))
+    mcat_max = int(_finite_param(params, 'mcatMax', 528))
+    mcat_step = int(_finite_param(params, 'mcatStep', 1))
+    if gpa_step <= 0 or mcat_step <= 0:
+        raise ValueError('gpaStep and mcatStep must be positive')
+    if gpa_min > gpa_max or mcat_min > mcat_max:
+        raise ValueError('Minimums must not be greater than maximums')
+
+    gpa_count = int(round((gpa_max - gpa_min) / gpa_step, 6)) + 1
+    mcat_count = (mcat_max - mcat_min) // mcat_step + 1
+    max_points = app.config['JOB_MAX_GRID_POINTS']
+    if gpa_count * mcat_count > max_points:
+        raise ValueError(f'Grid is too large ({gpa_count * mcat_count} points, maximum is {max_points})')
+
+    state = params.get('state') or ''
+    degree = params.get('degree') or ''
+    return {'profiles': [
+        quantize_profile(gpa_min + i * gpa_step, mcat_min + j * mcat_step, state, degree)
+        for i in range(gpa_count) for j in range(mcat_count)
+    ]}
+
+
+def _run_classify_job(job, out):
+    """Classify a roster in chunks, writing the /api/classify/batch NDJSON."""
+    profiles = [None if profile is None else tuple(profile) for profile in job.params['profiles']]
+    job.progress(0, len(profiles))
+    for start in range(0, len(profiles), JOB_CHUNK_PROFILES):
+        chunk = profiles[start:start + JOB_CHUNK_PROFILES]
+        for line in _batch_lines(chunk, _classify_batch(chunk, use_cache=False), start):
+            out.write(line + b'\n')
+        job.progress(start + len(chunk), len(profiles))
+
+
+def _run_grid_job(job, out):
+    """Classify every grid point, writing one NDJSON line of school IDs per point."""
+    store = MEDICAL_SCHOOLS
+    ids = store.ids
+    profiles = [tuple(profile) for profile in job.params['profiles']]
+    job.progress(0, len(profiles))
+    for start in range(0, len(profiles), JOB_CHUNK_PROFILES):
+        chunk = profiles[start:start + JOB_CHUNK_PROFILES]
+        for profile, buckets in zip(chunk, _classify_profiles(chunk, store)):
+            reach, target, undershoot = buckets['Reach'], buckets['Target'], buckets['Undershoot']
+            out.write(encode_object([
+                ('gpa', encode(profile[0])),
+                ('mcat', encode(profile[1])),
+                ('summary', encode({
+                    'totalSchools': len(reach) + len(target) + len(undershoot),
+                    'reachCount': len(reach),
+                    'targetCount': len(target),
+                    'undershootCount': len(undershoot)
+                })),
+                ('reach', encode([ids[position] for position, _ in reach])),
+                ('target', encode([ids[position] for position, _ in target])),
+                ('undershoot', encode([ids[position] for position, _ in undershoot]))
+            ]) + b'\n')
+        job.progress(start + len(chunk), len(profiles))
+
+
+# Parameter validation for each job type
+JOB_PARAMS = {'classify': _classify_job_params, 'grid': _grid_job_params}
+
+_INIT_LOCK = threading.Lock()
+_initialized = False
+
+
+def init_app():
+    """
+    Load the dataset and start the API's background work.
+
+    Maps the school store (building it if needed), opens the job queue and
+    starts its workers, and warms the classify cache with the profiles that
+    were popular in the previous run. Run from __main__ and from the ASGI
+    lifespan startup rather than at import, so tools that only import this
+    module don't build files or start threads. Safe to call more than once.
+
+    Returns:
+        The Flask app
+    """
+    global SCHOOL_ALIAS_PAIRS, JOB_QUEUE, _initialized
+
+    with _INIT_LOCK:
+        if _initialized:
+            return app
+        SCHOOL_ALIAS_PAIRS = load_alias_pairs()
+
+        # Seed popularity before the load, which warms the popular profiles
+        CLASSIFY_CACHE.load_popular(POPULAR_PROFILES_PATH)
+        reload_dataset()
+        atexit.register(CLASSIFY_CACHE.save_popular, POPULAR_PROFILES_PATH)
+
+        JOB_QUEUE = JobQueue(workers=int(os.environ.get('MEDSCHOOLS_JOB_WORKERS', 1)))
+        JOB_QUEUE.register('classify', _run_classify_job, 'application/x-ndjson')
+        JOB_QUEUE.register('grid', _run_grid_job, 'application/x-ndjson')
+        JOB_QUEUE.start()
+        _initialized = True
+    return app
 
 
 if __name__ == '__main__':
+    init_app()
     print("="*60)
     print("Medical Schools API Server")
     print("="*60)
@@ -419,9 +1386,13 @@ if __name__ == '__main__':
     print("  http://localhost:5000/api/schools")
     print("  http://localhost:5000/api/schools?state=CA")
     print("  http://localhost:5000/api/schools?degree=MD")
+    print("  http://localhost:5000/api/search?q=uc+san")
     print("  http://localhost:5000/api/states")
     print("  http://localhost:5000/api/stats")
     print("  http://localhost:5000/api/classify?gpa=3.75&mcat=512")
+    print("  POST http://localhost:5000/api/classify/batch")
+    print("  POST http://localhost:5000/api/jobs")
+    print("  http://localhost:5000/metrics")
     print("="*60)
     print("\nStarting server on http://localhost:5000")
     print("Press Ctrl+C to stop\n")
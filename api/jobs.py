@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Background jobs for the Medical Schools API.
+
+Whole-cohort classifications and grid exports take too long for a request
+thread. Clients submit them as jobs instead and poll for progress; a small
+pool of worker threads runs them in the background.
+
+Job state lives in a local SQLite database (no external broker), so every
+API worker process sees the same jobs and any of them can pick up queued
+work. Jobs stream their output to a result file rather than building it in
+memory, and finished jobs keep it until their TTL runs out. Running jobs
+check for cancellation whenever they report progress.
+
+Jobs left running by a worker process that has exited are marked failed the
+next time another process checks for them.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+JOB_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'output', 'jobs.sqlite3')
+JOB_RESULT_DIR = os.path.join(os.path.dirname(__file__), '..', 'output', 'jobs')
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Minimum seconds between progress writes (and cancellation checks) per job
+PROGRESS_INTERVAL = 0.5
+
+# Seconds between sweeps for expired results and orphaned jobs
+MAINTENANCE_INTERVAL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    result_bytes INTEGER,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    result_ttl REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at);
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when it has been cancelled."""
+
+
+class QueueFull(Exception):
+    """Raised by submit() when too many jobs are already waiting."""
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Job:
+    """
+    Handle passed to a running job's function.
+
+    Attributes:
+        id: Job ID
+        params: The parameters the job was submitted with
+    """
+
+    def __init__(self, queue, job_id, params):
+        self.id = job_id
+        self.params = params
+        self._queue = queue
+        self._last_report = 0.0
+
+    def progress(self, done, total=None):
+        """
+        Report progress, at most every PROGRESS_INTERVAL seconds.
+
+        Args:
+            done: Units of work finished so far
+            total: Total units of work (None keeps the previous total)
+
+        Raises:
+            JobCancelled: If the job has been cancelled
+        """
+        now = time.monotonic()
+        if now - self._last_report < PROGRESS_INTERVAL and done != total:
+            return
+        self._last_report = now
+        if self._queue._report_progress(self.id, done, total):
+            raise JobCancelled()
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with an in-process worker pool.
+
+    Args:
+        path: SQLite database file (shared by every process using the queue)
+        result_dir: Directory for result files
+        workers: Worker threads to run in this process
+        result_ttl: Default seconds a finished job's result is kept
+        max_queued: Jobs allowed to wait before submit() raises QueueFull
+        poll_interval: Seconds idle workers wait between checks for jobs
+            submitted by other processes
+    """
+
+    def __init__(self, path=JOB_DB_PATH, result_dir=JOB_RESULT_DIR, workers=1, result_ttl=3600,
+                 max_queued=100, poll_interval=1.0):
+        self.path = path
+        self.result_dir = result_dir
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_queued = max_queued
+        self.poll_interval = poll_interval
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._running = set()  # IDs of the jobs this process's workers are running
+        self._pid = None
+        self._last_maintenance = 0.0
+
+        os.makedirs(result_dir, exist_ok=True)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per operation, so threads never share one
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Connection(conn)
+
+    def register(self, kind, run, mimetype='application/json'):
+        """
+        Register a job type.
+
+        Args:
+            kind: Name clients submit the job under
+            run: Function taking a Job and a binary file to write the result
+                to. It should call job.progress() regularly.
+            mimetype: Content type of the result
+        """
+        self._handlers[kind] = (run, mimetype)
+
+    def kinds(self):
+        """Return the registered job types."""
+        return sorted(self._handlers)
+
+    def start(self):
+        """
+        Start the worker threads for this process.
+
+        Safe to call repeatedly; after a fork the child starts its own workers.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._running = set()
+            self._stopping.clear()
+            self._recover_orphans()
+            self._threads = [
+                threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the worker threads once their current jobs finish."""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        with self._lock:
+            self._threads = []
+            self._pid = None
+
+    def submit(self, kind, params, result_ttl=None):
+        """
+        Queue a job.
+
+        Args:
+            kind: A registered job type
+            params: JSON-serializable job parameters
+            result_ttl: Seconds to keep the result (defaults to the queue's TTL)
+
+        Returns:
+            The new job's status dict
+
+        Raises:
+            KeyError: If the job type isn't registered
+            QueueFull: If max_queued jobs are already waiting
+        """
+        if kind not in self._handlers:
+            raise KeyError(kind)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            queued = conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (QUEUED,)).fetchone()[0]
+            if queued >= self.max_queued:
+                conn.execute('ROLLBACK')
+                raise QueueFull()
+            conn.execute(
+                'INSERT INTO jobs (id, kind, params, status, result_ttl, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, json.dumps(params), QUEUED,
+                 self.result_ttl if result_ttl is None else result_ttl, now, now)
+            )
+            conn.execute('COMMIT')
+        self._wake.set()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """
+        Return a job's status dict, or None if it doesn't exist or has expired.
+
+        The dict has id, type, status, progress ({done, total}), error,
+        resultBytes and the created/started/finished/expires Unix timestamps.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, kind, status, done, total, error, result_bytes, created_at, started_at, '
+                'finished_at, expires_at FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+        if row is None or (row['expires_at'] is not None and row['expires_at'] <= time.time()):
+            return None
+        return {
+            'id': row['id'],
+            'type': row['kind'],
+            'status': row['status'],
+            'progress': {'done': row['done'], 'total': row['total']},
+            'error': row['error'],
+            'resultBytes': row['result_bytes'],
+            'createdAt': row['created_at'],
+            'startedAt': row['started_at'],
+            'finishedAt': row['finished_at'],
+            'expiresAt': row['expires_at']
+        }
+
+    def result(self, job_id):
+        """
+        Locate a finished job's result.
+
+        Returns:
+            Tuple of (result file path, mimetype), or None if there's no
+            result (yet) or it has expired
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT kind, expires_at FROM jobs WHERE id = ? AND status = ?',
+                (job_id, SUCCEEDED)
+            ).fetchone()
+        if row is None or row['expires_at'] <= time.time():
+            return None
+        path = self._result_path(job_id)
+        if not os.path.exists(path):
+            return None
+        handler = self._handlers.get(row['kind'])
+        return path, handler[1] if handler else 'application/octet-stream'
+
+    def _result_path(self, job_id, suffix='.result'):
+        return os.path.join(self.result_dir, job_id + suffix)
+
+    def _remove_result(self, job_id):
+        try:
+            os.remove(self._result_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def cancel(self, job_id):
+        """
+        Cancel a job.
+
+        A queued job is cancelled right away; a running job stops the next
+        time it reports progress. Finished jobs are left as they are.
+
+        Returns:
+            The job's status dict, or None if it doesn't exist
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'UPDATE jobs SET status = ?, cancel_requested = 1, updated_at = ?, finished_at = ?, '
+                'expires_at = ? + result_ttl WHERE id = ? AND status = ?',
+                (CANCELLED, now, now, now, job_id, QUEUED)
+            )
+            conn.execute(
+                'UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?',
+                (now, job_id, RUNNING)
+            )
+            conn.execute('COMMIT')
+        return self.get(job_id)
+
+    def delete(self, job_id):
+        """Delete a finished job and its result. Returns True if one was deleted."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f'DELETE FROM jobs WHERE id = ? AND status IN ({",".join("?" * len(FINISHED_STATES))})',
+                (job_id, *FINISHED_STATES)
+            )
+        if cursor.rowcount == 0:
+            return False
+        self._remove_result(job_id)
+        return True
+
+    def counts(self):
+        """Return the number of unexpired jobs in each state."""
+        counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT status, COUNT(*) FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status',
+                (time.time(),)
+            ).fetchall()
+        for status, count in rows:
+            counts[status] = count
+        return counts
+
+    def purge_expired(self):
+        """Delete jobs whose results have expired. Returns the number deleted."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            expired = [row[0] for row in conn.execute(
+                'SELECT id FROM jobs WHERE expires_at <= ?', (now,)
+            ).fetchall()]
+            conn.execute('DELETE FROM jobs WHERE expires_at <= ?', (now,))
+            conn.execute('COMMIT')
+        for job_id in expired:
+            self._remove_result(job_id)
+        return len(expired)
+
+    def _recover_orphans(self):
+        """Fail running jobs whose worker process is gone."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id, worker_pid FROM jobs WHERE status = ?', (RUNNING,)
+            ).fetchall()
+            # A job marked with this process's PID that no worker here is
+            # running was left by an earlier process that had the same PID
+            orphans = [
+                row['id'] for row in rows
+                if row['id'] not in self._running and (
+                    row['worker_pid'] == os.getpid() or not _process_alive(row['worker_pid']))
+            ]
+            now = time.time()
+            for job_id in orphans:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ?, '
+                    'expires_at = ? + result_ttl WHERE id = ? AND status = ?',
+                    (FAILED, 'Worker process exited before the job finished', now, now, now, job_id, RUNNING)
+                )
+
+    def _maintain(self):
+        now = time.monotonic()
+        if now - self._last_maintenance < MAINTENANCE_INTERVAL:
+            return
+        self._last_maintenance = now
+        self.purge_expired()
+        self._recover_orphans()
+
+    def _claim(self):
+        """Mark the oldest queued job as running in this process and return it."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT id, kind, params FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1',
+                (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, worker_pid = ?, started_at = ?, updated_at = ? WHERE id = ?',
+                    (RUNNING, os.getpid(), now, now, row['id'])
+                )
+                self._running.add(row['id'])
+            conn.execute('COMMIT')
+        return row
+
+    def _work(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                self._maintain()
+                row = self._claim()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self._wake.wait(self.poll_interval)
+                continue
+
+            try:
+                self._run(row)
+            except sqlite3.Error as e:
+                # Recording the outcome failed (e.g. database is locked); don't
+                # let the job look like it is still running or kill the worker
+                print(f"Job {row['id']}: could not record its result: {e}", file=sys.stderr)
+                self._fail_after_error(row['id'], e)
+            finally:
+                self._running.discard(row['id'])
+
+    def _fail_after_error(self, job_id, error):
+        """Mark a job failed after a database error, retrying once the database is free."""
+        for attempt in range(3):
+            try:
+                self._finish(job_id, FAILED, error=f'Queue database error: {error}')
+                return
+            except sqlite3.Error as e:
+                print(f"Job {job_id}: could not mark it failed: {e}", file=sys.stderr)
+                if self._stopping.wait(self.poll_interval * (attempt + 1)):
+                    return
+
+    def _run(self, row):
+        job = Job(self, row['id'], json.loads(row['params']))
+        handler = self._handlers.get(row['kind'])
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type: {row['kind']}")
+            # Write to a temporary file so a result is only ever seen complete
+            partial_path = self._result_path(job.id, '.part')
+            try:
+                with open(partial_path, 'wb') as out:
+                    handler[0](job, out)
+                size = os.path.getsize(partial_path)
+                os.replace(partial_path, self._result_path(job.id))
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+        except JobCancelled:
+            self._finish(job.id, CANCELLED)
+        except Exception as e:
+            self._finish(job.id, FAILED, error=str(e) or type(e).__name__)
+        else:
+            self._finish(job.id, SUCCEEDED, result_bytes=size)
+
+    def _report_progress(self, job_id, done, total):
+        """Store a job's progress. Returns True if the job has been cancelled."""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET done = ?, total = COALESCE(?, total), updated_at = ? WHERE id = ?',
+                (done, total, time.time(), job_id)
+            )
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row is None or bool(row['cancel_requested'])
+
+    def _finish(self, job_id, status, result_bytes=None, error=None):
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, result_bytes = ?, error = ?, updated_at = ?, finished_at = ?, '
+                'expires_at = ? + result_ttl, done = CASE WHEN ? THEN COALESCE(total, done) ELSE done END '
+                'WHERE id = ?',
+                (status, result_bytes, error, now, now, now, status == SUCCEEDED, job_id)
+            )
+        if cursor.rowcount == 0 or status != SUCCEEDED:
+            # Deleted while running, or there's no result to keep
+            self._remove_result(job_id)
+
+
+class _Connection:
+    """Context manager that closes a sqlite3 connection on exit."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._conn.in_transaction:
+            self._conn.rollback()
+        self._conn.close()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Load Testing Harness for the Medical Schools API
+
+Replays a configurable mix of /api/schools filter queries, /api/classify
+profiles and /api/schools/<id> lookups at a target request rate, and reports
+throughput, latency percentiles and error rates per endpoint.
+
+Requests are scheduled open-loop: latency is measured from the moment a
+request was due to be sent, so queueing inside an overloaded server shows up
+in the percentiles instead of silently lowering the request rate.
+
+Server CPU per request comes from the server's /metrics counters, read
+before and after each run: CPU time spent in request handlers (both modes)
+and, against a running server, the whole server process's CPU time. A
+server with several worker processes answers /metrics from one of them, so
+measure CPU with a single worker.
+
+Usage:
+    # In-process through the Flask test client, real dataset
+    python3 load_test.py --rate 500 --duration 10
+
+    # Generated datasets of several sizes, cold and warm classify cache
+    python3 load_test.py --sizes 200,10000,1000000 --cache cold,warm
+
+    # Against a running server (example_api.py or asgi.py)
+    python3 load_test.py --url http://localhost:8000 --rate 2000
+
+    # Custom traffic mix (relative weights)
+    python3 load_test.py --mix schools=2,classify=6,school=2
+"""
+
+import argparse
+import http.client
+import json
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+STATES = [
+    'AL', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DC', 'FL', 'GA', 'IL', 'IN', 'IA', 'KS',
+    'KY', 'LA', 'MA', 'MD', 'MI', 'MN', 'MO', 'MS', 'NC', 'NE', 'NJ', 'NM', 'NY',
+    'OH', 'OK', 'OR', 'PA', 'SC', 'TN', 'TX', 'UT', 'VA', 'WA', 'WI', 'WV'
+]
+
+DEFAULT_MIX = {'schools': 3, 'classify': 5, 'school': 2}
+
+# Profiles per /api/classify/batch request when warming the cache
+WARMUP_BATCH_SIZE = 500
+
+
+def generate_schools(count, seed=0):
+    """
+    Generate a synthetic school list in the same format as load_medical_schools().
+
+    Args:
+        count: Number of schools
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        List of school dictionaries
+    """
+    rng = random.Random(seed)
+    schools = []
+    for i in range(count):
+        degree = 'MD' if rng.random() < 0.75 else 'DO'
+        state = rng.choice(STATES)
+        gpa = round(rng.uniform(3.3, 3.95), 2)
+        mcat = rng.randint(500, 522) if degree == 'MD' else rng.randint(498, 510)
+        schools.append({
+            'id': i + 1,
+            'name': f'Generated {degree} School {i + 1} of {state}',
+            'state': state,
+            'degreeType': degree,
+            'avgGPA': 'NR' if rng.random() < 0.02 else f'{gpa:.2f}',
+            'avgMCAT': str(mcat),
+            'minMCATNotes': 'NR',
+            'isPublic': rng.random() < 0.5,
+            'applicationSystem': 'AMCAS' if degree == 'MD' else 'AACOMAS',
+            'hasMDPhD': degree == 'MD' and rng.random() < 0.4,
+            'websiteURL': f'https://example.edu/school-{i + 1}/'
+        })
+    return schools
+
+
+class RequestMix:
+    """Weighted generator of request paths, with Zipf-like profile popularity."""
+
+    def __init__(self, weights, school_count, profile_count, seed=0):
+        self.rng = random.Random(seed)
+        self.kinds = list(weights)
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.school_count = school_count
+
+        # A few profiles account for most classify traffic, as in production
+        self.profiles = [
+            (round(self.rng.uniform(3.2, 4.0), 2), self.rng.randint(495, 525), self.rng.choice(STATES + [''] * 10))
+            for _ in range(profile_count)
+        ]
+        self.profile_weights = [1.0 / (rank + 1) for rank in range(profile_count)]
+
+    def classify_path(self, profile):
+        gpa, mcat, state = profile
+        path = f'/api/classify?gpa={gpa}&mcat={mcat}'
+        return path + f'&state={state}' if state else path
+
+    def next(self):
+        """Return (endpoint_name, path) for the next request."""
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == 'classify':
+            profile = self.rng.choices(self.profiles, self.profile_weights)[0]
+            return '/api/classify', self.classify_path(profile)
+        if kind == 'school':
+            return '/api/schools/<id>', f'/api/schools/{self.rng.randint(1, self.school_count)}'
+
+        filters = self.rng.choice([
+            '',
+            f'state={self.rng.choice(STATES)}',
+            'degree=MD',
+            'degree=DO&public=true',
+            f'min_gpa={self.rng.choice(["3.5", "3.7", "3.8"])}',
+            f'min_mcat={self.rng.randint(505, 515)}&max_mcat=520',
+            'mdphd=true&public=false'
+        ])
+        return '/api/schools', '/api/schools' + (f'?{filters}' if filters else '')
+
+
+class InProcessClient:
+    """Issues requests through the Flask test client (one per thread)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def get(self, path):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.get(path)
+        body = response.get_data()
+        return response.status_code, len(body)
+
+    def get_text(self, path):
+        response = self.app.test_client().get(path)
+        return response.status_code, response.get_data(as_text=True)
+
+    def post_json(self, path, payload):
+        response = self.app.test_client().post(path, json=payload)
+        return response.status_code, len(response.get_data())
+
+
+class HTTPClient:
+    """Issues requests to a running server over keep-alive connections."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def get(self, path):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            conn.request('GET', self.prefix + path)
+            response = conn.getresponse()
+            body = response.read()
+            return response.status, len(body)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            raise
+
+    def get_text(self, path):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            conn.request('GET', self.prefix + path)
+            response = conn.getresponse()
+            return response.status, response.read().decode('utf-8')
+        finally:
+            conn.close()
+
+    def post_json(self, path, payload):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=300)
+        try:
+            conn.request('POST', self.prefix + path, body=json.dumps(payload),
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            return response.status, len(response.read())
+        finally:
+            conn.close()
+
+
+def fetch_json(url):
+    """Fetch a JSON document from a running server."""
+    with urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+
+def read_server_cpu(client):
+    """
+    Read the server's CPU counters from /metrics.
+
+    Returns:
+        Tuple of (CPU seconds in request handlers, CPU seconds of the server
+        process); either is None if the server doesn't report it
+    """
+    try:
+        status, text = client.get_text('/metrics')
+    except Exception:
+        return None, None
+    if status != 200:
+        return None, None
+
+    handlers = process = None
+    for line in text.splitlines():
+        if line == '# TYPE medschools_api_request_cpu_seconds_total counter':
+            handlers = 0.0  # Reported, even before any request has been recorded
+        if not line or line.startswith('#'):
+            continue
+        sample, _, value = line.rpartition(' ')
+        name = sample.split('{', 1)[0]
+        if name == 'medschools_api_request_cpu_seconds_total':
+            handlers = (handlers or 0.0) + float(value)
+        elif name == 'process_cpu_seconds_total':
+            process = float(value)
+    return handlers, process
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_load(client, mix, rate, duration, concurrency):
+    """
+    Send requests at a fixed rate for a fixed duration.
+
+    Args:
+        client: InProcessClient or HTTPClient
+        mix: RequestMix producing request paths
+        rate: Target requests per second
+        duration: Seconds to run
+        concurrency: Number of worker threads
+
+    Returns:
+        Dictionary of per-endpoint results and overall totals, including
+        server_cpu: (request handler, process) CPU seconds the server spent
+        during the run, each None if unavailable
+    """
+    work = queue.Queue(maxsize=concurrency * 4)
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0, 'bytes': 0})
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            endpoint, path, due = item
+            try:
+                status, size = client.get(path)
+                error = status >= 500
+            except Exception:
+                status, size, error = 0, 0, True
+            latency = time.perf_counter() - due
+            with lock:
+                result = results[endpoint]
+                result['latencies'].append(latency)
+                result['bytes'] += size
+                if error:
+                    result['errors'] += 1
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    server_before = read_server_cpu(client)
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    interval = 1.0 / rate
+    sent = 0
+    while True:
+        due = start + sent * interval
+        if due - start >= duration:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        endpoint, path = mix.next()
+        work.put((endpoint, path, due))
+        sent += 1
+
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    server_after = read_server_cpu(client)
+    server_cpu = tuple(
+        after - before if before is not None and after is not None else None
+        for before, after in zip(server_before, server_after)
+    )
+
+    return {'endpoints': dict(results), 'elapsed': elapsed, 'cpu': cpu, 'server_cpu': server_cpu, 'sent': sent}
+
+
+def print_report(title, outcome, in_process):
+    """Print a per-endpoint latency table."""
+    elapsed = outcome['elapsed']
+    print(f"\n{title}")
+    print("-" * 96)
+    print(f"{'Endpoint':<20} {'Requests':>9} {'Req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'Errors':>8} {'Avg KB':>8}")
+
+    total = 0
+    for endpoint in sorted(outcome['endpoints']):
+        result = outcome['endpoints'][endpoint]
+        latencies = sorted(result['latencies'])
+        count = len(latencies)
+        total += count
+        print(f"{endpoint:<20} {count:>9} {count / elapsed:>9.1f} "
+              f"{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 95) * 1000:>9.2f} "
+              f"{percentile(latencies, 99) * 1000:>9.2f} {result['errors'] / count * 100 if count else 0:>7.2f}% "
+              f"{result['bytes'] / count / 1024 if count else 0:>8.1f}")
+
+    print("-" * 96)
+    print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+    if not total:
+        return
+    handler_cpu, process_cpu = outcome['server_cpu']
+    if handler_cpu is not None:
+        print(f"Server CPU per request (request handlers): {handler_cpu / total * 1000:.3f} ms")
+    if in_process:
+        # Client and server share the process, so this includes client overhead
+        print(f"CPU per request (client + server): {outcome['cpu'] / total * 1000:.3f} ms")
+    elif process_cpu is not None:
+        print(f"Server CPU per request (server process): {process_cpu / total * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Medical Schools API')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+    parser.add_argument('--rate', type=float, default=200, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads')
+    parser.add_argument('--mix', default=None, help='Traffic weights, e.g. schools=3,classify=5,school=2')
+    parser.add_argument('--profiles', type=int, default=2000, help='Distinct applicant profiles')
+    parser.add_argument('--sizes', default='', help='Generated dataset sizes, e.g. 200,10000,1000000 '
+                                                    '(in-process only; default: the real dataset)')
+    parser.add_argument('--cache', default='warm', help='Classify cache scenarios: cold, warm or cold,warm')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    weights = dict(DEFAULT_MIX)
+    if args.mix:
+        weights = {}
+        for part in args.mix.split(','):
+            kind, weight = part.split('=')
+            if kind not in DEFAULT_MIX:
+                parser.error(f'Unknown request kind: {kind} (expected one of {", ".join(DEFAULT_MIX)})')
+            weights[kind] = float(weight)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    cache_modes = [mode.strip() for mode in args.cache.split(',') if mode.strip()]
+
+    if args.url:
+        if sizes:
+            parser.error('--sizes only works in-process (the server owns its dataset)')
+        client = HTTPClient(args.url)
+        school_count = fetch_json(args.url + '/api/stats')['total_schools']
+        api = None
+    else:
+        import example_api as api
+        client = InProcessClient(api.init_app())
+        school_count = len(api.MEDICAL_SCHOOLS)
+
+    print("=" * 96)
+    print("Medical Schools API Load Test")
+    print("=" * 96)
+    print(f"Target: {args.url or 'in-process test client'}")
+    print(f"Rate: {args.rate:.0f} req/s for {args.duration:.0f}s, {args.concurrency} threads")
+    print(f"Mix: {', '.join(f'{kind}={weight:g}' for kind, weight in weights.items())}")
+
+    for size in sizes or [None]:
+        if size is not None:
+            print(f"\nGenerating {size:,} schools...")
+            started = time.perf_counter()
+            api.reload_dataset(generate_schools(size, args.seed))
+            school_count = size
+            print(f"Dataset ready in {time.perf_counter() - started:.1f}s")
+
+        for mode in cache_modes:
+            mix = RequestMix(weights, school_count, args.profiles, args.seed)
+
+            if mode == 'cold':
+                if api is not None:
+                    api.CLASSIFY_CACHE.reset(api.DATASET_VERSION)
+                else:
+                    print("\nNote: a remote server's cache can't be cleared; 'cold' only skips warmup")
+            elif mode == 'warm':
+                # Classify every profile once so classify traffic hits the cache
+                started = time.perf_counter()
+                for i in range(0, len(mix.profiles), WARMUP_BATCH_SIZE):
+                    client.post_json('/api/classify/batch', {'profiles': [
+                        {'gpa': gpa, 'mcat': mcat, 'state': state}
+                        for gpa, mcat, state in mix.profiles[i:i + WARMUP_BATCH_SIZE]
+                    ]})
+                print(f"\nWarmed {len(mix.profiles)} profiles in {time.perf_counter() - started:.1f}s")
+            else:
+                parser.error(f'Unknown cache mode: {mode} (expected cold or warm)')
+
+            outcome = run_load(client, mix, args.rate, args.duration, args.concurrency)
+            label = f"{size:,} generated schools" if size else f"{school_count} schools"
+            print_report(f"Scenario: {label}, {mode} cache", outcome, api is not None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Request metrics for the Medical Schools API, in Prometheus text format.
+
+Counters are recorded into per-thread shards, so the request hot path never
+takes a lock. Shards are only summed when /metrics is scraped. When a thread
+exits, its counts are folded into a shared total so nothing is lost and the
+shard list doesn't grow with short-lived request threads.
+"""
+
+import threading
+import weakref
+from bisect import bisect_left
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class _Shard:
+    """Counters written by a single thread."""
+
+    def __init__(self, latency_slots, size_slots):
+        self.latency_slots = latency_slots
+        self.size_slots = size_slots
+        self.started = 0
+        self.finished = 0
+        self.requests = {}  # (route, method, status) -> count
+        self.cpu = {}       # route -> CPU seconds spent handling requests
+        self.latency = {}   # route -> [count per bucket..., sum]
+        self.sizes = {}     # route -> [count per bucket..., sum]
+
+    def merge_into(self, other):
+        other.started += self.started
+        other.finished += self.finished
+        for key, count in list(self.requests.items()):
+            other.requests[key] = other.requests.get(key, 0) + count
+        for route, seconds in list(self.cpu.items()):
+            other.cpu[route] = other.cpu.get(route, 0.0) + seconds
+        for source, target, slots in ((self.latency, other.latency, self.latency_slots),
+                                      (self.sizes, other.sizes, self.size_slots)):
+            for route, values in list(source.items()):
+                totals = target.setdefault(route, [0] * (slots + 1))
+                for i, value in enumerate(values):
+                    totals[i] += value
+
+
+def _observe(histograms, route, bounds, value):
+    values = histograms.get(route)
+    if values is None:
+        values = histograms[route] = [0] * (len(bounds) + 2)
+    values[bisect_left(bounds, value)] += 1
+    values[-1] += value
+
+
+class RequestMetrics:
+    """
+    Per-route request counts, latency and response size histograms, and
+    in-flight requests.
+    """
+
+    def __init__(self, prefix='medschools_api', latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS):
+        self.prefix = prefix
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = set()
+        self._retired = self._new_shard()
+
+    def _new_shard(self):
+        # One slot per bucket plus +Inf
+        return _Shard(len(self.latency_buckets) + 1, len(self.size_buckets) + 1)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = self._new_shard()
+            with self._lock:
+                self._shards.add(shard)
+            weakref.finalize(threading.current_thread(), self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._shards.discard(shard)
+            shard.merge_into(self._retired)
+
+    def request_started(self):
+        self._shard().started += 1
+
+    def request_finished(self, route, method, status, seconds, size=None, cpu_seconds=None):
+        """
+        Record a completed request.
+
+        Args:
+            route: URL rule that handled the request (e.g. /api/schools/<int:school_id>)
+            method: HTTP method
+            status: Response status code
+            seconds: Time spent handling the request, including sending a
+                streamed body
+            size: Response body size in bytes (None if unknown)
+            cpu_seconds: CPU time the server spent on the request, measured
+                on the threads that handled it (None if not measured)
+        """
+        shard = self._shard()
+        shard.finished += 1
+        key = (route, method, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        _observe(shard.latency, route, self.latency_buckets, seconds)
+        if size is not None:
+            _observe(shard.sizes, route, self.size_buckets, size)
+        if cpu_seconds is not None:
+            shard.cpu[route] = shard.cpu.get(route, 0.0) + cpu_seconds
+
+    def snapshot(self):
+        """Sum all shards into one."""
+        total = self._new_shard()
+        with self._lock:
+            self._retired.merge_into(total)
+            shards = list(self._shards)
+        for shard in shards:
+            shard.merge_into(total)
+        return total
+
+    def render(self):
+        """Return request metrics in Prometheus text format."""
+        total = self.snapshot()
+        p = self.prefix
+        lines = []
+
+        lines.append(f'# HELP {p}_requests_total Requests handled, by route, method and status.')
+        lines.append(f'# TYPE {p}_requests_total counter')
+        for (route, method, status), count in sorted(total.requests.items()):
+            lines.append(format_sample(f'{p}_requests_total', count,
+                                       {'route': route, 'method': method, 'status': status}))
+
+        lines.append(f'# HELP {p}_requests_in_flight Requests currently being handled.')
+        lines.append(f'# TYPE {p}_requests_in_flight gauge')
+        lines.append(format_sample(f'{p}_requests_in_flight', total.started - total.finished))
+
+        lines.append(f'# HELP {p}_request_cpu_seconds_total CPU time spent handling requests, by route.')
+        lines.append(f'# TYPE {p}_request_cpu_seconds_total counter')
+        for route, seconds in sorted(total.cpu.items()):
+            lines.append(format_sample(f'{p}_request_cpu_seconds_total', seconds, {'route': route}))
+
+        _render_histogram(lines, f'{p}_request_duration_seconds',
+                          'Time spent handling requests, by route.',
+                          total.latency, self.latency_buckets)
+        _render_histogram(lines, f'{p}_response_size_bytes',
+                          'Response body sizes, by route.',
+                          total.sizes, self.size_buckets)
+        return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(lines, name, help_text, histograms, bounds):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for route in sorted(histograms):
+        values = histograms[route]
+        cumulative = 0
+        for bound, count in zip(bounds, values):
+            cumulative += count
+            lines.append(format_sample(f'{name}_bucket', cumulative, {'route': route, 'le': f'{bound:g}'}))
+        cumulative += values[len(bounds)]
+        lines.append(format_sample(f'{name}_bucket', cumulative, {'route': route, 'le': '+Inf'}))
+        lines.append(format_sample(f'{name}_sum', values[-1], {'route': route}))
+        lines.append(format_sample(f'{name}_count', cumulative, {'route': route}))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_sample(name, value, labels=None):
+    """Format one Prometheus sample line."""
+    value_text = repr(value) if isinstance(value, float) else str(value)
+    if labels:
+        label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f'{name}{{{label_text}}} {value_text}'
+    return f'{name} {value_text}'
+
+
+def format_metric(name, metric_type, help_text, samples):
+    """
+    Format a complete metric family.
+
+    Args:
+        name: Metric name
+        metric_type: counter, gauge, ...
+        help_text: One-line description
+        samples: List of (labels_dict_or_None, value) pairs
+
+    Returns:
+        List of text lines
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        lines.append(format_sample(name, value, labels))
+    return lines
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+On-demand request profiling and memory snapshots for the Medical Schools API.
+
+An admin can profile a single request by sending the admin token in the
+X-Profile header (or a _profile query parameter). That request runs under
+cProfile, and handlers mark the stages it passes through (parse args, filter,
+classify, serialize). The stage timings come back in a Server-Timing header,
+and the pstats are saved so they can be fetched afterwards.
+
+Admins can also take tracemalloc snapshots of the long-running process and
+diff each one against the previous, to track down memory growth.
+
+Everything is disabled unless MEDSCHOOLS_ADMIN_TOKEN is set, and requests
+that don't ask for profiling only pay for a context variable lookup per mark().
+"""
+
+import contextvars
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+
+ADMIN_TOKEN = os.environ.get('MEDSCHOOLS_ADMIN_TOKEN', '')
+
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), '..', 'output', 'profiles')
+MAX_SAVED_PROFILES = 50
+
+_active = contextvars.ContextVar('request_profile', default=None)
+
+
+def is_admin(token):
+    """Check a token against the configured admin token."""
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def is_profiling():
+    """Return True if the current request is being profiled."""
+    return _active.get() is not None
+
+
+def mark(stage):
+    """
+    Attribute the time since the previous mark to a named stage.
+
+    Does nothing unless the current request is being profiled.
+    """
+    profile = _active.get()
+    if profile is not None:
+        profile.mark(stage)
+
+
+class RequestProfile:
+    """cProfile run and stage timings for one request."""
+
+    def __init__(self, label):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.stages = {}
+        self._profiler = cProfile.Profile()
+        self._token = None
+        self._started = None
+        self._last_mark = None
+
+    def start(self):
+        self._token = _active.set(self)
+        self._started = self._last_mark = time.perf_counter()
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+        self.total = time.perf_counter() - self._started
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+
+    def pause(self):
+        """Stop profiling until resume(), e.g. between chunks of a streamed body."""
+        self._profiler.disable()
+        _active.reset(self._token)
+        self._token = None
+
+    def resume(self):
+        """
+        Profile again after pause(), on the current thread.
+
+        Time spent paused isn't attributed to the next stage.
+        """
+        self._token = _active.set(self)
+        self._last_mark = time.perf_counter()
+        self._profiler.enable()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last_mark)
+        self._last_mark = now
+
+    def server_timing(self):
+        """Format the stage timings as a Server-Timing header value."""
+        parts = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in self.stages.items()]
+        parts.append(f'total;dur={self.total * 1000:.3f}')
+        return ', '.join(parts)
+
+    def save(self, directory=PROFILE_DIR):
+        """Write the pstats file and prune old profiles."""
+        os.makedirs(directory, exist_ok=True)
+        self._profiler.dump_stats(os.path.join(directory, f'{self.id}.pstats'))
+        with open(os.path.join(directory, f'{self.id}.txt'), 'w') as f:
+            f.write(f'{self.label}\n{self.server_timing()}\n')
+
+        saved = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith('.pstats')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in saved[:-MAX_SAVED_PROFILES]:
+            for suffix in ('.pstats', '.txt'):
+                path = entry.path[:-len('.pstats')] + suffix
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def load_profile_report(profile_id, directory=PROFILE_DIR, limit=40, sort='cumulative'):
+    """
+    Render a saved profile as text.
+
+    Returns:
+        Report string, or None if the profile doesn't exist
+    """
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(directory, f'{profile_id}.pstats')
+    if not os.path.exists(path):
+        return None
+
+    out = io.StringIO()
+    summary_path = os.path.join(directory, f'{profile_id}.txt')
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            out.write(f.read() + '\n')
+    pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class MemorySnapshots:
+    """tracemalloc snapshots, each diffed against the one before it."""
+
+    def __init__(self, frames=10):
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._previous = None
+        self._taken_at = None
+
+    def snapshot(self, limit=25, group_by='lineno'):
+        """
+        Take a snapshot and compare it with the previous one.
+
+        The first call starts tracing and only records a baseline.
+
+        Returns:
+            Dictionary with traced memory totals and the top allocation changes
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._previous = None
+
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            result = {
+                'tracedBytes': current,
+                'peakBytes': peak,
+                'since': self._taken_at,
+                'top': []
+            }
+
+            if self._previous is not None:
+                for stat in snapshot.compare_to(self._previous, group_by)[:limit]:
+                    frame = stat.traceback[0]
+                    result['top'].append({
+                        'location': f'{frame.filename}:{frame.lineno}',
+                        'sizeDiff': stat.size_diff,
+                        'size': stat.size,
+                        'countDiff': stat.count_diff,
+                        'count': stat.count
+                    })
+            else:
+                result['note'] = 'Tracing started; take another snapshot to see what grew'
+
+            self._previous = snapshot
+            self._taken_at = time.time()
+            return result
+
+    def stop(self):
+        """Stop tracing and drop the stored snapshot."""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._previous = None
+            self._taken_at = None
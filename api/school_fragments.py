@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Pre-encoded JSON fragments for the Medical Schools API.
+
+School records never change while a dataset snapshot is loaded, so each one is
+JSON-encoded once up front (see school_store.py). Responses are then assembled
+by joining the cached bytes, and only the small per-request fields
+(classification, diffs, in-state advantage) are encoded on the fly.
+"""
+
+import json
+
+# Compact, ASCII-safe output, matching what Flask's jsonify produces. NaN and
+# infinities raise ValueError instead of producing invalid JSON.
+_ENCODER = json.JSONEncoder(separators=(',', ':'), allow_nan=False)
+
+
+def encode(value):
+    """Encode a plain Python value to JSON bytes."""
+    return _ENCODER.encode(value).encode('ascii')
+
+
+def encode_object(fields):
+    """
+    Assemble a JSON object from already-encoded values.
+
+    Args:
+        fields: Iterable of (key, encoded_bytes) pairs
+
+    Returns:
+        JSON object as bytes
+    """
+    buf = bytearray(b'{')
+    for key, value in fields:
+        if len(buf) > 1:
+            buf += b','
+        buf += encode(key)
+        buf += b':'
+        buf += value
+    buf += b'}'
+    return bytes(buf)
+
+
+def encode_array(fragments):
+    """Assemble a JSON array from already-encoded elements."""
+    return b'[' + b','.join(fragments) + b']'
+
+
+def classification_suffix(overall, gpa_class, mcat_class, gpa_diff, mcat_diff, in_state_advantage):
+    """
+    Encode the per-request classification fields that close a school fragment.
+
+    The result starts with a comma and ends with the closing brace, so it can be
+    appended directly to a school fragment with its own closing brace removed.
+    """
+    return (
+        f',"classification":"{overall}"'
+        f',"gpaClassification":"{gpa_class}"'
+        f',"mcatClassification":"{mcat_class}"'
+        f',"gpaDiff":{_ENCODER.encode(gpa_diff)}'
+        f',"mcatDiff":{_ENCODER.encode(mcat_diff)}'
+        f',"inStateAdvantage":{_ENCODER.encode(in_state_advantage)}}}'
+    ).encode('ascii')
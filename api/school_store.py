@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Read-only school data for the Medical Schools API, shared between workers.
+
+Python objects can't be shared between pre-forked workers: reference count
+updates touch every page that holds one, so copy-on-write pages get copied
+and each worker ends up with its own full copy of the dataset. The store
+instead keeps everything the hot routes need in flat arrays inside a single
+file that every worker memory-maps, so the data lives once in the page cache:
+
+- the pre-encoded JSON of every school, comma-separated in one blob, so a run
+  of consecutive schools goes into a JSON array as a single slice
+- dictionary-encoded state, degree type and application system columns, the
+  public / MD-PhD flags, and the parsed average GPA and MCAT
+- the classifiable schools in competitiveness order, with the columns the
+  classification loop reads copied alongside so it scans them sequentially
+
+The first worker to start builds the file for the current dataset; the others
+just map it. The file name is keyed by the source data's content hash, so a
+changed CSV gets a fresh file.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+from array import array
+
+from dataset_snapshot import (
+    PayloadWriter, SnapshotError, map_container, pack_container, parse_gpa, parse_mcat,
+    read_container, write_container
+)
+from school_fragments import encode, encode_array
+
+MAGIC = b'MEDSTORE'
+FORMAT_VERSION = 1
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), '..', 'output')
+
+# School fields stored as dictionary-encoded columns
+CATEGORY_FIELDS = ('state', 'degreeType', 'applicationSystem')
+
+
+def store_path_for(source_version):
+    """Store file for a given source dataset version."""
+    return os.path.join(STORE_DIR, f'school_store-{source_version}.store')
+
+
+class SchoolStore:
+    """
+    Read-only accessors over the school columns and pre-encoded JSON.
+
+    Schools are addressed by position (their index in the original list).
+    Use build() or open() to create one.
+    """
+
+    def __init__(self, header, payload, backing=None):
+        self.header = header
+        self.version = header['version']
+        self._payload = payload
+        self._backing = backing  # mmap or bytes kept alive for the views
+        self._count = header['count']
+        self._values = header['categories']
+        self._codes = {
+            field: {value: code for code, value in enumerate(values)}
+            for field, values in self._values.items()
+        }
+
+        self.ids = self.array('ids')
+        self._offsets = self.array('fragmentOffsets')
+        self._blob = self.array('fragments')
+        if header['sequentialIds']:
+            self._positions = None
+        else:
+            self._positions = {school_id: position for position, school_id in enumerate(self.ids)}
+
+    @classmethod
+    def build(cls, schools, path=None):
+        """
+        Build a store from a list of school dicts.
+
+        Args:
+            schools: School dicts in the format of load_medical_schools()
+            path: File to write and map (None keeps the store in this process)
+        """
+        payload = PayloadWriter()
+        arrays = {}
+
+        def add(name, values):
+            arrays[name] = [*payload.add(values), values.typecode]
+
+        count = len(schools)
+        digest = hashlib.sha1()
+        offsets = array('Q', [0])
+        fragments = []
+        for school in schools:
+            fragment = encode(school)
+            digest.update(fragment)
+            fragments.append(fragment)
+            # Each fragment is followed by a comma (the last one virtually)
+            offsets.append(offsets[-1] + len(fragment) + 1)
+        add('fragmentOffsets', offsets)
+        arrays['fragments'] = [*payload.add(b','.join(fragments)), 'B']
+        del fragments
+
+        ids = array('I', (school['id'] for school in schools))
+        add('ids', ids)
+
+        categories = {}
+        codes = {}
+        for field in CATEGORY_FIELDS:
+            values = sorted({school[field] for school in schools})
+            categories[field] = values
+            codes[field] = {value: code for code, value in enumerate(values)}
+            add(field, array('H', (codes[field][school[field]] for school in schools)))
+
+        add('isPublic', array('B', (bool(school['isPublic']) for school in schools)))
+        add('hasMDPhD', array('B', (bool(school['hasMDPhD']) for school in schools)))
+        gpas = array('d', (parse_gpa(school['avgGPA']) for school in schools))
+        mcats = array('i', (parse_mcat(school['avgMCAT']) for school in schools))
+        add('gpa', gpas)
+        add('mcat', mcats)
+
+        # Classifiable schools, most competitive first (stable sort, so every
+        # classification bucket comes out already ordered)
+        ranked = [i for i in range(count) if gpas[i] != 0 and mcats[i] != 0]
+        ranked.sort(key=lambda i: (gpas[i], mcats[i]), reverse=True)
+        add('rankedPositions', array('I', ranked))
+        add('rankedGPA', array('d', (gpas[i] for i in ranked)))
+        add('rankedMCAT', array('i', (mcats[i] for i in ranked)))
+        add('rankedState', array('H', (codes['state'][schools[i]['state']] for i in ranked)))
+        add('rankedDegreeType', array('H', (codes['degreeType'][schools[i]['degreeType']] for i in ranked)))
+        add('rankedPublic', array('B', (bool(schools[i]['isPublic']) for i in ranked)))
+
+        header = {
+            'formatVersion': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'count': count,
+            # Content hash of the encoded schools, used to tag anything
+            # derived from them
+            'version': digest.hexdigest()[:12],
+            'sequentialIds': list(ids) == list(range(1, count + 1)),
+            'categories': categories,
+            'arrays': arrays
+        }
+
+        if path is None:
+            data = pack_container(MAGIC, FORMAT_VERSION, header, payload)
+            header, view = read_container(memoryview(data), MAGIC, FORMAT_VERSION)
+            return cls(header, view, data)
+
+        write_container(path, MAGIC, FORMAT_VERSION, header, payload)
+        # Older stores are for data that's no longer current; workers that
+        # still map one keep their pages until they exit
+        for old_path in glob.glob(os.path.join(os.path.dirname(path), 'school_store-*.store')):
+            if os.path.abspath(old_path) != os.path.abspath(path):
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Map an existing store file.
+
+        Returns:
+            SchoolStore, or None if the file is missing or unusable
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            header, payload, mapped = map_container(path, MAGIC, FORMAT_VERSION)
+        except SnapshotError:
+            return None
+        return cls(header, payload, mapped)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        """Decode one school back into a dict (for the non-hot-path routes)."""
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        return json.loads(bytes(self.fragment(position)))
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self[position]
+
+    def array(self, name):
+        """Read-only view of a stored column."""
+        offset, length, typecode = self.header['arrays'][name]
+        return self._payload[offset:offset + length].cast(typecode)
+
+    def values(self, field):
+        """Distinct values of a category column, indexed by code."""
+        return self._values[field]
+
+    def code(self, field, value):
+        """Code of a category value, or None if no school has it."""
+        return self._codes[field].get(value)
+
+    def position(self, school_id):
+        """Position of a school ID, or None if it isn't in the store."""
+        if self._positions is not None:
+            return self._positions.get(school_id)
+        if 1 <= school_id <= self._count:
+            return school_id - 1
+        return None
+
+    def fragment(self, position):
+        """Encoded JSON of the school at a position (a view into the store)."""
+        offsets = self._offsets
+        return self._blob[offsets[position]:offsets[position + 1] - 1]
+
+    def school(self, school_id):
+        """Return the encoded school object for an ID, or None."""
+        position = self.position(school_id)
+        return None if position is None else bytes(self.fragment(position))
+
+    def encode_array(self, positions):
+        """Encode the schools at the given positions as a JSON array."""
+        offsets, blob = self._offsets, self._blob
+        if isinstance(positions, range) and positions.step == 1:
+            if not positions:
+                return b'[]'
+            return b'[' + blob[offsets[positions.start]:offsets[positions.stop] - 1] + b']'
+
+        # Copy each run of consecutive positions as one slice
+        runs = []
+        start = end = None
+        for position in positions:
+            if position == end:
+                end += 1
+                continue
+            if start is not None:
+                runs.append(blob[offsets[start]:offsets[end] - 1])
+            start, end = position, position + 1
+        if start is not None:
+            runs.append(blob[offsets[start]:offsets[end] - 1])
+        return encode_array(runs)
+
+    def classified(self, position, suffix):
+        """Encode one classified school (suffix from classification_suffix())."""
+        return bytes(self.fragment(position)[:-1]) + suffix
+
+    def classified_array(self, rows):
+        """
+        Encode classified schools as a JSON array.
+
+        Args:
+            rows: Iterable of (position, suffix_bytes) pairs, where the suffix
+                comes from classification_suffix()
+
+        Returns:
+            JSON array as bytes
+        """
+        fragment = self.fragment
+        buf = bytearray(b'[')
+        for position, suffix in rows:
+            if len(buf) > 1:
+                buf += b','
+            buf += fragment(position)[:-1]
+            buf += suffix
+        buf += b']'
+        return bytes(buf)
+
+    def ranked(self):
+        """
+        Classifiable schools, most competitive first.
+
+        Returns:
+            Iterator of (position, gpa, mcat, state_code, degree_code, is_public)
+        """
+        return zip(
+            self.array('rankedPositions'),
+            self.array('rankedGPA'),
+            self.array('rankedMCAT'),
+            self.array('rankedState'),
+            self.array('rankedDegreeType'),
+            self.array('rankedPublic')
+        )
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Typeahead search over school names for the Medical Schools API.
+
+Every school is indexed under its official name plus any known aliases
+("UC San Diego", "UCLA" and other short names from the repo's alias tables),
+and under the initialism of its official name, so abbreviations like "UCSD"
+or "VCU" find the school by prefix ("ucsdsom").
+Names are split into normalized tokens, and queries are matched token by
+token against the vocabulary:
+
+- exact token matches score highest
+- any token can match as a prefix ("univ of cal"), which also covers the word
+  the user is still typing
+- tokens with a typo are found through a trigram index over the vocabulary
+  and confirmed with a bounded edit distance
+
+Every query token has to match for a school to be returned. Schools are
+ranked by the IDF-weighted sum of their token matches, with a bonus when a
+name starts with (or contains) the query as typed.
+"""
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Words left out of initialisms ("University of California San Diego" -> "ucsd")
+INITIALISM_STOPWORDS = {'of', 'at', 'the', 'and', 'in', 'for'}
+
+# Weight of each kind of token match
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.85
+FUZZY_WEIGHT = 0.6
+
+# Extra score when a name starts with / contains the whole query
+STARTS_WITH_BONUS = 2.0
+CONTAINS_BONUS = 1.0
+
+# Limits on how far one query token fans out into the vocabulary
+MAX_PREFIX_EXPANSIONS = 200
+MIN_TRIGRAM_OVERLAP = 0.3
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = text.lower().replace('&', ' and ')
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def initialism(normalized):
+    """First letters of a normalized name's words, skipping INITIALISM_STOPWORDS."""
+    return ''.join(word[0] for word in normalized.split() if word not in INITIALISM_STOPWORDS)
+
+
+def _trigrams(token):
+    padded = f' {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_typos(token):
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def _within_distance(a, b, limit):
+    """Return the Levenshtein distance between a and b if it is <= limit, else None."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, char_b in enumerate(b, 1):
+            cost = previous[j - 1] + (char_a != char_b)
+            cost = min(cost, previous[j] + 1, current[j - 1] + 1)
+            current.append(cost)
+            best = min(best, cost)
+        if best > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class SchoolSearchIndex:
+    """
+    Token and trigram inverted indexes over school names and aliases.
+
+    Args:
+        schools: Iterable of school dicts (uses id, name, state, degreeType)
+        alias_pairs: Pairs of names that refer to the same school, as returned
+            by school_aliases.load_alias_pairs(). Pairs that can't be tied to a
+            loaded school are ignored.
+    """
+
+    def __init__(self, schools, alias_pairs=()):
+        self._schools = {}   # school id -> fields returned in results
+        self._names = {}     # school id -> [(display name, normalized name), ...]
+        self._postings = {}  # token -> set of school ids
+
+        for school in schools:
+            self._schools[school['id']] = {
+                'name': school['name'],
+                'state': school['state'],
+                'degreeType': school['degreeType']
+            }
+            self._add_name(school['id'], school['name'])
+            self._add_initialism(school['id'], school['name'])
+        self._add_aliases(alias_pairs)
+
+        self._vocabulary = sorted(self._postings)
+        self._trigram_index = {}  # trigram -> list of vocabulary tokens
+        for token in self._vocabulary:
+            for gram in _trigrams(token):
+                self._trigram_index.setdefault(gram, []).append(token)
+
+        total = len(self._schools) or 1
+        self._idf = {
+            token: math.log(1 + total / len(ids)) for token, ids in self._postings.items()
+        }
+
+    def __len__(self):
+        return len(self._schools)
+
+    def _add_name(self, school_id, name):
+        normalized = normalize(name)
+        if not normalized:
+            return
+        names = self._names.setdefault(school_id, [])
+        if any(existing == normalized for _, existing in names):
+            return
+        names.append((name, normalized))
+        for token in normalized.split():
+            self._postings.setdefault(token, set()).add(school_id)
+
+    def _add_initialism(self, school_id, name):
+        # Indexed as a token only, so results still show a real name
+        letters = initialism(normalize(name))
+        if len(letters) >= 3:
+            self._postings.setdefault(letters, set()).add(school_id)
+
+    def _add_aliases(self, alias_pairs):
+        by_name = {}
+        for school_id, names in self._names.items():
+            for _, normalized in names:
+                by_name.setdefault(normalized, school_id)
+
+        # Alias tables chain through each other (short name -> other source's
+        # name -> CSV name), so repeat until nothing new resolves
+        pending = list(alias_pairs)
+        while pending:
+            unresolved = []
+            for name, other in pending:
+                school_id = by_name.get(normalize(name), by_name.get(normalize(other)))
+                if school_id is None:
+                    unresolved.append((name, other))
+                    continue
+                for alias in (name, other):
+                    self._add_name(school_id, alias)
+                    by_name.setdefault(normalize(alias), school_id)
+            if len(unresolved) == len(pending):
+                break
+            pending = unresolved
+
+    def _expand(self, token):
+        """
+        Find vocabulary tokens that a query token can stand for.
+
+        Returns:
+            Dictionary mapping vocabulary token to match weight
+        """
+        matches = {}
+        if token in self._postings:
+            matches[token] = EXACT_WEIGHT
+
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, token)
+        for candidate in vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(token):
+                break
+            matches.setdefault(candidate, PREFIX_WEIGHT)
+
+        limit = _max_typos(token)
+        if limit:
+            grams = _trigrams(token)
+            overlap = {}
+            for gram in grams:
+                for candidate in self._trigram_index.get(gram, ()):
+                    overlap[candidate] = overlap.get(candidate, 0) + 1
+            needed = MIN_TRIGRAM_OVERLAP * len(grams)
+            for candidate, shared in overlap.items():
+                if shared < needed or candidate in matches:
+                    continue
+                if _within_distance(token, candidate, limit) is not None:
+                    matches[candidate] = FUZZY_WEIGHT
+                elif len(candidate) > len(token) and \
+                        _within_distance(token, candidate[:len(token)], limit) is not None:
+                    matches[candidate] = FUZZY_WEIGHT * PREFIX_WEIGHT
+        return matches
+
+    def search(self, query, limit=10):
+        """
+        Find schools matching a partially typed name.
+
+        Args:
+            query: Search text; the last word may be incomplete
+            limit: Maximum number of results
+
+        Returns:
+            List of result dicts (id, name, state, degreeType, matched, score),
+            best match first
+        """
+        normalized_query = normalize(query)
+        tokens = normalized_query.split()
+        if not tokens:
+            return []
+
+        # Score each school token by token, keeping only schools that match
+        # every token so far
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for candidate, weight in self._expand(token).items():
+                score = weight * self._idf[candidate]
+                for school_id in self._postings[candidate]:
+                    if score > token_scores.get(school_id, 0.0):
+                        token_scores[school_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    school_id: total + token_scores[school_id]
+                    for school_id, total in scores.items() if school_id in token_scores
+                }
+            if not scores:
+                return []
+
+        results = []
+        for school_id, score in scores.items():
+            matched, bonus = self._best_name(school_id, normalized_query)
+            results.append((score + bonus, school_id, matched))
+        results.sort(key=lambda r: (-r[0], self._schools[r[1]]['name']))
+
+        hits = []
+        for score, school_id, matched in results[:limit]:
+            school = self._schools[school_id]
+            hits.append({
+                'id': school_id,
+                'name': school['name'],
+                'state': school['state'],
+                'degreeType': school['degreeType'],
+                'matched': matched,
+                'score': round(score, 3)
+            })
+        return hits
+
+    def _best_name(self, school_id, normalized_query):
+        """Pick the name or alias that best matches the query as typed."""
+        names = self._names[school_id]
+        for name, normalized in names:
+            if normalized.startswith(normalized_query):
+                return name, STARTS_WITH_BONUS
+        for name, normalized in names:
+            if normalized_query in normalized:
+                return name, CONTAINS_BONUS
+        return names[0][0], 0.0
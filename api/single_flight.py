@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing.
+
+When many identical requests arrive at once (for example a counselor sharing a
+classification link with a whole class), only the first one runs the
+computation. The others wait for it and share the result, or the exception it
+raised.
+"""
+
+import threading
+from concurrent.futures import Future, TimeoutError
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one computation.
+
+    Only calls that overlap in time are merged; once a computation finishes its
+    key is forgotten, so caching results is left to the caller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.coalesced = 0
+
+    def do(self, key, compute, timeout=None):
+        """
+        Run compute() for a key, or wait for the call already running it.
+
+        Args:
+            key: Hashable key identifying identical requests
+            compute: Zero-argument function producing the result
+            timeout: Seconds a waiting caller will wait before giving up
+
+        Returns:
+            The result of compute()
+
+        Raises:
+            TimeoutError: If a waiting caller times out (the running
+                computation is not affected)
+            Exception: Whatever compute() raised, re-raised in every caller
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(timeout=timeout)
+
+        try:
+            result = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def in_flight(self):
+        """Return the number of computations currently running."""
+        with self._lock:
+            return len(self._in_flight)
+
@@ -1,5 +1,12 @@
+import os
+import sys
+
 import pandas as pd
-import re
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT
+from match_cache import MatchCache
+from school_resolver import SchoolResolver
 
 # Additional AAMC matriculation data from the external links
 # Format: 'School Name': (in_state_pct, out_state_pct, advantage)
@@ -96,51 +103,49 @@ additional_aamc_data = {
     'Utah-Eccles': (72.8, 27.2, 'huge'),
 }
 
-def clean_school_name(name):
-    """Clean school names for matching"""
-    name = str(name).strip()
-    name = re.sub(r'\s+', ' ', name)
-    name = re.sub(r'^university of ', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' college of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' school of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' medical college$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+school$', '', name, flags=re.IGNORECASE)
-    return name.lower().strip()
-
 def enhance_with_additional_data():
     """Add more AAMC matriculation data to the CSV"""
     # Load current data
-    df = pd.read_csv('/Users/itaysolomon/medical-school-advisor/public/medical_schools_data.csv')
+    df = pd.read_csv(DEFAULT_CSV_PATH)
 
     added_count = 0
+    index = SchoolResolver.from_names(additional_aamc_data)
+
+    # Stored decisions (including manual overrides) come before lookups
+    cache = MatchCache('additional_aamc')
+    decided = cache.applicable(df['Medical School Name'])
+    claimed = {
+        decision.school_name: key for key, decision in decided.items()
+        if decision.school_name is not None and key in additional_aamc_data
+    }
+    new_decisions = []
 
     for idx, row in df.iterrows():
         school_name = row['Medical School Name']
 
         # Check if school already has matriculation data
         if pd.isna(row['In-State Matriculants %']):
-            # Try exact match first
-            if school_name in additional_aamc_data:
-                in_state, out_state, advantage = additional_aamc_data[school_name]
+            key = claimed.get(school_name)
+            if key is None:
+                # Exact name, match key or alias (name containment matched the
+                # wrong school for short keys like 'Virginia' and 'New York')
+                match = index.lookup(school_name)
+                if match is not None and match.school_id not in decided:
+                    key = match.school_id
+                    decided[key] = None
+                    new_decisions.append((key, school_name, 100, match.method))
+            if key is not None:
+                in_state, out_state, advantage = additional_aamc_data[key]
                 df.at[idx, 'In-State Matriculants %'] = in_state
                 df.at[idx, 'Out-of-State Matriculants %'] = out_state
                 df.at[idx, 'In-State Advantage'] = advantage
                 added_count += 1
-                continue
 
-            # Try fuzzy matching
-            clean_target = clean_school_name(school_name)
-            for aamc_school, (in_state, out_state, advantage) in additional_aamc_data.items():
-                clean_aamc = clean_school_name(aamc_school)
-                if clean_target == clean_aamc or clean_target in clean_aamc or clean_aamc in clean_target:
-                    df.at[idx, 'In-State Matriculants %'] = in_state
-                    df.at[idx, 'Out-of-State Matriculants %'] = out_state
-                    df.at[idx, 'In-State Advantage'] = advantage
-                    added_count += 1
-                    break
+    if new_decisions:
+        cache.record(new_decisions)
 
     # Save enhanced data
-    df.to_csv('/Users/itaysolomon/medical-school-advisor/public/medical_schools_data_enhanced.csv', index=False)
+    df.to_csv(os.path.join(REPO_ROOT, 'public', 'medical_schools_data_enhanced.csv'), index=False)
 
     print(f"Added matriculation data for {added_count} additional schools")
 
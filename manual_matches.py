@@ -1,5 +1,11 @@
+import os
+import sys
+
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from dataset_snapshot import DEFAULT_CSV_PATH
+
 # Manual mappings for schools that should match but don't automatically
 manual_matches = {
     # Format: 'existing_school_name': ('accepted_school_name', in_state_rate, out_state_rate, advantage)
@@ -127,7 +133,7 @@ manual_matches = {
 def apply_manual_matches():
     """Apply manual matches to the CSV data"""
     # Load the current data
-    df = pd.read_csv('/Users/itaysolomon/medical-school-advisor/public/medical_schools_data.csv')
+    df = pd.read_csv(DEFAULT_CSV_PATH)
 
     matches_applied = 0
 
@@ -146,7 +152,7 @@ def apply_manual_matches():
             print(f"Applied manual match: {school_name} -> {accepted_name}")
 
     # Save updated data
-    df.to_csv('/Users/itaysolomon/medical-school-advisor/public/medical_schools_data.csv', index=False)
+    df.to_csv(DEFAULT_CSV_PATH, index=False)
 
     print(f"\nApplied {matches_applied} manual matches")
     schools_with_data = df['In-State Acceptance Rate %'].notna().sum()
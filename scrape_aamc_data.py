@@ -1,108 +1,160 @@
 import pandas as pd
-import requests
-import io
+import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from fuzzywuzzy import fuzz
-from fuzzywuzzy import process
 import pdfplumber
-import tempfile
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT, file_sha256
+from http_fetch import fetch_file
+from match_cache import MatchCache
+from school_matcher import match_names
+
+# A school row: state, school name, then the ten numeric columns
+# (AppsTotal, AppsIn%, AppsOut%, AppsMen%, AppsWomen%, MatricTotal, MatricIn%, MatricOut%, MatricMen%, MatricWomen%);
+# groups 3 and 4 are the matriculants' in-state and out-of-state percentages
+_NUMBER = r'\d+(?:,\d+)*(?:\.\d+)?'
+AAMC_ROW = re.compile(
+    rf'^([A-Z]{{2}})\s+(.+?)(?:\s+{_NUMBER}){{6}}\s+({_NUMBER})\s+({_NUMBER})(?:\s+{_NUMBER}){{2}}$'
+)
+TRAILING_NUMBER = re.compile(r'\s+\d+(?:,\d+)?\s*$')
+HEADER_WORDS = ('school', 'state', 'applications', 'matriculants', 'total', 'by in state', 'by gender')
+
+# Parsed pages of each AAMC PDF, by SHA-256 of the PDF
+AAMC_PAGE_CACHE_DIR = os.path.join(REPO_ROOT, 'output', 'aamc_pages')
+
+# Bump when parse_aamc_line changes, so pages cached by an older parser are reparsed
+AAMC_PARSER_VERSION = 2
+
+# Pages handed to a worker process at a time
+PAGES_PER_TASK = 4
+
+
+def parse_aamc_line(line):
+    """
+    Parse one line of AAMC PDF text.
+
+    Returns:
+        Dictionary with school_name, state, in_state_matriculants_pct and
+        out_state_matriculants_pct, or None if the line isn't a school row
+    """
+    line = line.strip()
+    if not line:
+        return None
+    match = AAMC_ROW.match(line)
+    if not match:
+        return None
+    state, school_name = match.group(1, 2)
 
-def clean_school_name(name):
-    """Clean school names for better matching"""
-    name = str(name).strip()
-    # Remove common prefixes/suffixes that might differ
-    name = re.sub(r'\s+', ' ', name)
-    name = re.sub(r'^university of ', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' college of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' school of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' medical college$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+school$', '', name, flags=re.IGNORECASE)
-    return name.lower().strip()
-
-def download_aamc_data(url):
-    """Download and parse AAMC PDF data using text extraction and regex"""
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-
-        # Save PDF to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_file.write(response.content)
-            temp_file_path = temp_file.name
+    # Skip header-like lines
+    school_name_lower = school_name.lower()
+    if any(header in school_name_lower for header in HEADER_WORDS):
+        return None
 
-        # Parse PDF with pdfplumber - extract text instead of tables
-        all_text = ""
+    try:
+        in_state_matric_pct, out_state_matric_pct = (float(pct) for pct in match.group(3, 4))
+    except ValueError:  # "1,234" where a percentage belongs
+        return None
+    if not (0 <= in_state_matric_pct <= 100 and 0 <= out_state_matric_pct <= 100):
+        return None
 
-        with pdfplumber.open(temp_file_path) as pdf:
+    return {
+        'school_name': TRAILING_NUMBER.sub('', school_name).strip(),
+        'state': state,
+        'in_state_matriculants_pct': in_state_matric_pct,
+        'out_state_matriculants_pct': out_state_matric_pct
+    }
+
+
+def parse_aamc_page(text):
+    """Parse the school rows out of one page of PDF text."""
+    rows = []
+    for line in (text or '').split('\n'):
+        row = parse_aamc_line(line)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def _parse_pages(pdf_path, page_numbers):
+    """Parse some pages of a PDF (runs in a worker process). Returns rows per page."""
+    pages = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number in page_numbers:
+            page = pdf.pages[page_number]
+            pages.append(parse_aamc_page(page.extract_text()))
+            page.close()
+    return pages
+
+
+def _iter_pdf_pages(pdf_path, jobs):
+    """Yield the rows of each page in order, parsing pages in parallel when jobs > 1."""
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        if jobs <= 1 or page_count <= PAGES_PER_TASK:
+            # One page at a time, dropping each page's parsed objects after use
             for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    all_text += page_text + "\n"
-
-        # Clean up temporary file
-        os.unlink(temp_file_path)
-
-        # Parse the text using regex patterns
-        aamc_data = []
-
-        # Split text into lines
-        lines = all_text.split('\n')
-
-        # Print sample lines for debugging
-        print("Sample text lines:")
-        data_lines = [line for line in lines if line.strip() and len(line.split()) > 8][:5]
-        for i, line in enumerate(data_lines):
-            print(f"  Line {i}: {line}")
-
-        # More flexible pattern to match school entries
-        # Looking for lines with state codes and matriculant percentages
-        pattern = r'^([A-Z]{2})\s+(.+?)\s+\d+(?:,\d+)?\s+\d+(?:\.\d+)?(?:\s+\d+(?:\.\d+)?)*?\s+(\d+(?:\.\d+)?)\s+(\d+(?:\.\d+)?)(?:\s+\d+(?:\.\d+)?)*?$'
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            match = re.match(pattern, line)
-            if match:
-                state, school_name = match.groups()[:2]
-                matric_pcts = match.groups()[2:]
-
-                # Skip header-like lines
-                if any(header in school_name.lower() for header in ['school', 'state', 'applications', 'matriculants', 'total', 'by in state', 'by gender']):
-                    continue
-
-                # Extract the matriculants in-state and out-of-state percentages
-                # Table structure: State, School, AppsTotal, AppsIn%, AppsOut%, AppsMen%, AppsWomen%, MatricTotal, MatricIn%, MatricOut%, MatricMen%, MatricWomen%
-                try:
-                    parts = line.split()
-                    if len(parts) >= 12:  # Ensure we have the full row
-                        # Matriculants in-state % should be at index 9, out-of-state % at index 10
-                        try:
-                            matric_in_state_idx = 8  # 0-indexed: State(0), School(1), AppsTotal(2), AppsIn(3), AppsOut(4), AppsMen(5), AppsWomen(6), MatricTotal(7), MatricIn(8), MatricOut(9), MatricMen(10), MatricWomen(11)
-                            matric_out_state_idx = 9
-
-                            in_state_matric_pct = float(parts[matric_in_state_idx])
-                            out_state_matric_pct = float(parts[matric_out_state_idx])
-
-                            # Validate percentages
-                            if 0 <= in_state_matric_pct <= 100 and 0 <= out_state_matric_pct <= 100:
-                                # Clean up school name by removing any trailing numbers
-                                school_name = re.sub(r'\s+\d+(?:,\d+)?\s*$', '', school_name).strip()
-
-                                aamc_data.append({
-                                    'school_name': school_name,
-                                    'state': state,
-                                    'in_state_matriculants_pct': in_state_matric_pct,
-                                    'out_state_matriculants_pct': out_state_matric_pct
-                                })
-                        except (ValueError, IndexError):
-                            # If direct indexing fails, try to find the matriculants section
-                            pass
-                except Exception as e:
-                    print(f"Error parsing line '{line}': {e}")
-                    continue
+                yield parse_aamc_page(page.extract_text())
+                page.close()
+            return
+
+    chunks = [range(start, min(start + PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PAGES_PER_TASK)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for pages in executor.map(_parse_pages, repeat(pdf_path), chunks):
+            yield from pages
+
+
+def iter_aamc_rows(pdf_path, jobs=None, cache_dir=AAMC_PAGE_CACHE_DIR):
+    """
+    Stream the school rows of an AAMC matriculant PDF, page by page.
+
+    Parsed pages are cached by the PDF's SHA-256 (and AAMC_PARSER_VERSION),
+    so an unchanged PDF is never parsed twice.
+
+    Args:
+        pdf_path: Path of the PDF
+        jobs: Worker processes for parsing pages (default: CPU count)
+        cache_dir: Where parsed pages are cached (None disables the cache)
+
+    Yields:
+        Row dictionaries (see parse_aamc_line), in page order
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f'{file_sha256(pdf_path)}-v{AAMC_PARSER_VERSION}.json')
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached_pages = json.load(f)
+        except (OSError, ValueError):
+            cached_pages = None
+        if cached_pages is not None:
+            for rows in cached_pages:
+                yield from rows
+            return
+
+    pages = []
+    for rows in _iter_pdf_pages(pdf_path, jobs or os.cpu_count() or 1):
+        pages.append(rows)
+        yield from rows
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.part'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(pages, f)
+        os.replace(tmp_path, cache_path)
+
+
+def download_aamc_data(url, jobs=None):
+    """Download the AAMC PDF (streamed to disk) and parse its school rows"""
+    try:
+        pdf_path = fetch_file(url)
+        aamc_data = list(iter_aamc_rows(pdf_path, jobs=jobs))
 
         print(f"Extracted {len(aamc_data)} schools from AAMC PDF text")
 
@@ -120,36 +172,34 @@ def download_aamc_data(url):
         traceback.print_exc()
         return None
 
-def match_schools(existing_df, aamc_df):
-    """Match schools between existing data and AAMC data"""
-    matched_data = []
-
-    for idx, row in existing_df.iterrows():
-        existing_name = row['Medical School Name']
-        existing_state = row['State']
-
-        # Clean names for matching
-        clean_existing = clean_school_name(existing_name)
-
-        # Find best match in AAMC data
-        best_match = None
-        best_score = 0
+def match_schools(existing_df, aamc_df, cache=None):
+    """
+    Match schools between existing data and AAMC data
 
-        for aamc_idx, aamc_row in aamc_df.iterrows():
-            aamc_name = aamc_row['school_name']
-            aamc_state = aamc_row['state']
+    Args:
+        existing_df: Our schools
+        aamc_df: Schools parsed from the AAMC PDF
+        cache: Optional MatchCache; stored decisions are applied first and new
+            ones are recorded, so re-runs only score names they haven't seen
+    """
+    matched_data = []
 
-            # Try exact state match first
-            if aamc_state == existing_state:
-                clean_aamc = clean_school_name(aamc_name)
-                score = fuzz.ratio(clean_existing, clean_aamc)
+    # Each AAMC line describes one school: stored decisions, exact name,
+    # match key and alias matches first, then one-to-one fuzzy matching of
+    # the closest same-state names (if the score is high enough - adjust
+    # threshold as needed)
+    matches = match_names(
+        zip(existing_df.index, existing_df['Medical School Name'], existing_df['State']),
+        zip(aamc_df.index, aamc_df['school_name'], aamc_df['state']),
+        score=lambda clean_existing, _, clean_aamc, __: fuzz.ratio(clean_existing, clean_aamc),
+        cache=cache, min_score=71
+    )
 
-                if score > best_score:
-                    best_score = score
-                    best_match = aamc_row
+    for idx, row in existing_df.iterrows():
+        best_match_idx, best_score = matches.get(idx, (None, None))
+        best_match = None if best_match_idx is None else aamc_df.loc[best_match_idx]
 
-        # Use match if score is high enough (adjust threshold as needed)
-        if best_match is not None and best_score > 70:
+        if best_match is not None:
             matched_row = row.copy()
             matched_row['In-State Matriculants %'] = best_match['in_state_matriculants_pct']
             matched_row['Out-of-State Matriculants %'] = best_match['out_state_matriculants_pct']
@@ -170,7 +220,7 @@ def main():
     aamc_url = "https://www.aamc.org/media/5976/download"
 
     # Load existing medical schools data
-    existing_df = pd.read_csv('/Users/itaysolomon/medical-school-advisor/public/medical_schools_data.csv')
+    existing_df = pd.read_csv(DEFAULT_CSV_PATH)
 
     print(f"Loaded {len(existing_df)} schools from existing database")
 
@@ -184,10 +234,10 @@ def main():
     print(f"Downloaded {len(aamc_df)} schools from AAMC")
 
     # Match schools and add in-state/out-of-state data
-    matched_df = match_schools(existing_df, aamc_df)
+    matched_df = match_schools(existing_df, aamc_df, cache=MatchCache('aamc'))
 
     # Save updated data
-    output_file = '/Users/itaysolomon/medical-school-advisor/public/medical_schools_data_updated.csv'
+    output_file = os.path.join(REPO_ROOT, 'public', 'medical_schools_data_updated.csv')
     matched_df.to_csv(output_file, index=False)
 
     # Summary statistics
@@ -1,44 +1,21 @@
-import requests
+import os
+import sys
 from bs4 import BeautifulSoup
 import pandas as pd
-import re
 from fuzzywuzzy import fuzz
 
-def clean_school_name(name):
-    """Clean school names for better matching"""
-    name = str(name).strip()
-
-    # Normalize common variations
-    name = re.sub(r'\s+', ' ', name)
-    name = re.sub(r'[^\w\s]', ' ', name)  # Replace punctuation with spaces
-    name = re.sub(r'\s+', ' ', name)  # Normalize spaces again
-
-    # Remove common prefixes/suffixes
-    name = re.sub(r'^the\s+', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'^university of ', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'^college of ', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' college of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' school of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' medical college$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' medical school$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' school of medicine and science$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r' of medicine$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+school$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+college$', '', name, flags=re.IGNORECASE)
-
-    # Handle common abbreviations
-    name = re.sub(r'\bmed\b', 'medicine', name, flags=re.IGNORECASE)
-    name = re.sub(r'\buniv\b', 'university', name, flags=re.IGNORECASE)
-
-    return name.lower().strip()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT
+from http_fetch import fetch
+from match_cache import MatchCache
+from school_matcher import match_names
 
 def scrape_accepted_data():
     """Scrape in-state/out-of-state acceptance rates from Accepted.com"""
     url = 'https://www.accepted.com/resources/selectivity-index/medical-school/'
 
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        response.raise_for_status()
+        response = fetch(url)
 
         soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -115,70 +92,76 @@ def scrape_accepted_data():
         print(f"Error scraping Accepted.com: {e}")
         return None
 
-def match_schools(existing_df, accepted_df):
-    """Match schools between existing data and Accepted.com data with improved matching"""
+def score_match(clean_existing, existing_state, clean_accepted, accepted_state):
+    """Score how well an Accepted.com name matches one of our names (higher is better)"""
+    # Calculate different matching scores
+    name_score = fuzz.ratio(clean_existing, clean_accepted)
+    partial_score = fuzz.partial_ratio(clean_existing, clean_accepted)
+    token_score = fuzz.token_sort_ratio(clean_existing, clean_accepted)
+
+    # Use the highest of the three scores
+    score = max(name_score, partial_score, token_score)
+
+    # Bonus for state match
+    if accepted_state == existing_state:
+        score += 15
+
+    # Bonus for high partial match (good for long names)
+    if partial_score > 85:
+        score += 10
+
+    return score
+
+def is_acceptable_match(score, clean_existing, existing_state, clean_accepted, accepted_state):
+    """Very lenient matching criteria to maximize coverage"""
+    partial_ratio = fuzz.partial_ratio(clean_existing, clean_accepted)
+    return (
+        score > 60 or  # Good overall match
+        (score > 45 and existing_state == accepted_state) or  # Decent match with state confirmation
+        partial_ratio > 85 or  # Very strong partial match
+        (partial_ratio > 75 and len(clean_existing) > 10 and len(clean_accepted) > 10)  # Strong partial for longer names
+    )
+
+def match_schools(existing_df, accepted_df, cache=None):
+    """
+    Match schools between existing data and Accepted.com data with improved matching
+
+    Args:
+        existing_df: Our schools
+        accepted_df: Schools scraped from Accepted.com
+        cache: Optional MatchCache; stored decisions are applied first and new
+            ones are recorded, so re-runs only score names they haven't seen
+    """
     matched_data = []
-    used_matches = set()  # Track which Accepted.com entries have been used
 
-    for idx, row in existing_df.iterrows():
-        existing_name = row['Medical School Name']
-        existing_state = row['State']
-
-        # Clean names for matching
-        clean_existing = clean_school_name(existing_name)
-
-        # Find best match in Accepted data
-        best_match = None
-        best_score = 0
-        best_match_idx = -1
-
-        for aamc_idx, aamc_row in accepted_df.iterrows():
-            if aamc_idx in used_matches:
-                continue
-
-            aamc_name = aamc_row['school_name']
-            aamc_state = aamc_row['state']
-
-            clean_aamc = clean_school_name(aamc_name)
-
-            # Calculate different matching scores
-            name_score = fuzz.ratio(clean_existing, clean_aamc)
-            partial_score = fuzz.partial_ratio(clean_existing, clean_aamc)
-            token_score = fuzz.token_sort_ratio(clean_existing, clean_aamc)
-
-            # Use the highest of the three scores
-            score = max(name_score, partial_score, token_score)
-
-            # Bonus for state match
-            if aamc_state == existing_state:
-                score += 15
-
-            # Bonus for high partial match (good for long names)
-            if partial_score > 85:
-                score += 10
+    def acceptable_score(clean_existing, existing_state, clean_accepted, accepted_state):
+        score = score_match(clean_existing, existing_state, clean_accepted, accepted_state)
+        if is_acceptable_match(score, clean_existing, existing_state, clean_accepted, accepted_state):
+            return score
+        return None
 
-            if score > best_score:
-                best_score = score
-                best_match = aamc_row
-                best_match_idx = aamc_idx
+    # Stored decisions, exact name, match key and alias matches claim their
+    # Accepted.com entry first. The rest are scored against the closest names
+    # both nationally and within the school's state (which gets a score
+    # bonus), and the one-to-one matching with the highest total score wins,
+    # so an earlier school can't take the entry a later school matches better
+    matches = match_names(
+        zip(existing_df.index, existing_df['Medical School Name'], existing_df['State']),
+        zip(accepted_df.index, accepted_df['school_name'], accepted_df['state']),
+        score=acceptable_score, cache=cache, national=True
+    )
 
-        # Very lenient matching criteria to maximize coverage
-        partial_ratio = fuzz.partial_ratio(clean_existing, clean_school_name(best_match['school_name']))
-        should_match = (
-            best_score > 60 or  # Good overall match
-            (best_score > 45 and existing_state == best_match['state']) or  # Decent match with state confirmation
-            partial_ratio > 85 or  # Very strong partial match
-            (partial_ratio > 75 and len(clean_existing) > 10 and len(clean_school_name(best_match['school_name'])) > 10)  # Strong partial for longer names
-        )
+    for idx, row in existing_df.iterrows():
+        best_match_idx, best_score = matches.get(idx, (None, None))
+        best_match = None if best_match_idx is None else accepted_df.loc[best_match_idx]
 
-        if best_match is not None and should_match:
+        if best_match is not None:
             matched_row = row.copy()
             matched_row['In-State Acceptance Rate %'] = best_match['in_state_acceptance_rate']
             matched_row['Out-of-State Acceptance Rate %'] = best_match['out_state_acceptance_rate']
             matched_row['In-State Advantage'] = best_match['in_state_advantage']
             matched_row['Match Score'] = best_score
             matched_data.append(matched_row)
-            used_matches.add(best_match_idx)  # Mark this match as used
         else:
             # No match found, add with None values
             matched_row = row.copy()
@@ -192,7 +175,7 @@ def match_schools(existing_df, accepted_df):
 
 def main():
     # Load existing medical schools data
-    existing_df = pd.read_csv('/Users/itaysolomon/medical-school-advisor/public/medical_schools_data.csv')
+    existing_df = pd.read_csv(DEFAULT_CSV_PATH)
 
     print(f"Loaded {len(existing_df)} schools from existing database")
 
@@ -206,10 +189,10 @@ def main():
     print(f"Scraped {len(accepted_df)} schools from Accepted.com")
 
     # Match schools and add in-state/out-of-state data
-    matched_df = match_schools(existing_df, accepted_df)
+    matched_df = match_schools(existing_df, accepted_df, cache=MatchCache('accepted'))
 
     # Save updated data
-    output_file = '/Users/itaysolomon/medical-school-advisor/public/medical_schools_data_with_rates.csv'
+    output_file = os.path.join(REPO_ROOT, 'public', 'medical_schools_data_with_rates.csv')
     matched_df.to_csv(output_file, index=False)
 
     # Summary statistics
@@ -4,7 +4,12 @@ Update Medical Schools CSV with Casper Test Requirements
 Adds a column indicating which schools require the Casper test based on Shemmassian Consulting data.
 """
 
-import csv
+import os
+
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT
+from enrichment import enrich_csv
+from keyword_matcher import KeywordMatcher
+from school_resolver import SchoolResolver
 
 # Schools that require Casper test (from Shemmassian Consulting - Appendix A)
 # Updated March 2025 for 2025-2026 application cycle
@@ -61,24 +66,23 @@ DO_SCHOOLS_REQUIRING_CASPER = {
 # - Arkansas College of Osteopathic Medicine (highly recommended but not required)
 
 
-def normalize_school_name(name):
-    """
-    Normalize school names for better matching.
-    Remove extra spaces, handle common variations.
-    """
-    # Common name variations to standardize
-    name = name.strip()
-    name = name.replace("  ", " ")  # Remove double spaces
+# Names on the Casper list that are spelled differently in our CSV
+NAME_REPLACEMENTS = {
+    "Texas Tech University Health Sciences Center El Paso Paul L. Foster School of Medicine": "Texas Tech University Health Sciences Center Paul L. Foster School of Medicine",
+    "Texas Tech University Health Sciences Center School of Medicine at Lubbock": "Texas Tech University Health Sciences Center School of Medicine – Lubbock",
+    "University of Texas Health Science Center at Houston, McGovern Medical School": "University of Texas McGovern Medical School at Houston",
+    "University of Texas Health Science Center at San Antonio, Long School of Medicine": "University of Texas School of Medicine at San Antonio",
+}
 
-    # Handle specific variations
-    replacements = {
-        "Texas Tech University Health Sciences Center El Paso Paul L. Foster School of Medicine": "Texas Tech University Health Sciences Center Paul L. Foster School of Medicine",
-        "Texas Tech University Health Sciences Center School of Medicine at Lubbock": "Texas Tech University Health Sciences Center School of Medicine – Lubbock",
-        "University of Texas Health Science Center at Houston, McGovern Medical School": "University of Texas McGovern Medical School at Houston",
-        "University of Texas Health Science Center at San Antonio, Long School of Medicine": "University of Texas School of Medicine at San Antonio",
-    }
+# Resolve CSV names against each list by exact name, match key or alias
+MD_CASPER_INDEX = SchoolResolver.from_names(MD_SCHOOLS_REQUIRING_CASPER)
+DO_CASPER_INDEX = SchoolResolver.from_names(DO_SCHOOLS_REQUIRING_CASPER)
 
-    return replacements.get(name, name)
+# Both lists in one automaton, each name tagged with its degree type
+CASPER_MATCHER = KeywordMatcher(
+    [(name, "MD") for name in sorted(MD_SCHOOLS_REQUIRING_CASPER)]
+    + [(name, "DO") for name in sorted(DO_SCHOOLS_REQUIRING_CASPER)]
+)
 
 
 def requires_casper(school_name, degree_type):
@@ -92,31 +96,26 @@ def requires_casper(school_name, degree_type):
     Returns:
         Boolean: True if school requires Casper, False otherwise
     """
-    normalized_name = normalize_school_name(school_name)
-
-    # Check MD schools
     if degree_type == "MD":
-        # Direct match
-        if normalized_name in MD_SCHOOLS_REQUIRING_CASPER:
-            return True
+        index = MD_CASPER_INDEX
+    elif degree_type == "DO":
+        index = DO_CASPER_INDEX
+    else:
+        return False
 
-        # Fuzzy matching for common variations
-        for casper_school in MD_SCHOOLS_REQUIRING_CASPER:
-            if casper_school.lower() in normalized_name.lower():
-                return True
+    if index.lookup(school_name) is not None:
+        return True
 
-    # Check DO schools
-    elif degree_type == "DO":
-        # Direct match
-        if normalized_name in DO_SCHOOLS_REQUIRING_CASPER:
-            return True
+    # Fall back to list names contained in the school's name
+    return any(degree == degree_type for _, degree in CASPER_MATCHER.find(school_name))
 
-        # Fuzzy matching for common variations
-        for casper_school in DO_SCHOOLS_REQUIRING_CASPER:
-            if casper_school.lower() in normalized_name.lower():
-                return True
 
-    return False
+def casper_columns(table):
+    """Requires Casper column for an enrichment Table."""
+    return {'Requires Casper': [
+        'True' if requires_casper(school_name, degree_type) else 'False'
+        for school_name, degree_type in zip(table['Medical School Name'], table['Degree Type'])
+    ]}
 
 
 def update_csv_with_casper_requirements(input_file, output_file):
@@ -127,32 +126,8 @@ def update_csv_with_casper_requirements(input_file, output_file):
         input_file: Path to input CSV
         output_file: Path to output CSV
     """
-    schools_data = []
-
-    # Read existing CSV
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
-        for row in reader:
-            school_name = row['Medical School Name']
-            degree_type = row['Degree Type']
-
-            # Determine Casper requirement
-            casper_required = requires_casper(school_name, degree_type)
-            row['Requires Casper'] = 'True' if casper_required else 'False'
-
-            schools_data.append(row)
-
-    # Write updated CSV
-    new_fieldnames = list(fieldnames) + ['Requires Casper']
-
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=new_fieldnames)
-        writer.writeheader()
-        writer.writerows(schools_data)
-
-    return schools_data
+    table, _ = enrich_csv(input_file, output_file, [('casper', casper_columns)])
+    return table.rows()
 
 
 def print_summary(schools_data):
@@ -179,8 +154,8 @@ def print_summary(schools_data):
 
 
 def main():
-    input_file = "../public/medical_schools_data.csv"
-    output_file = "../public/medical_schools_data_with_casper.csv"
+    input_file = DEFAULT_CSV_PATH
+    output_file = os.path.join(REPO_ROOT, 'public', 'medical_schools_data_with_casper.csv')
 
     print("Updating medical schools CSV with Casper test requirements...")
     print("Source: Shemmassian Consulting - Appendix A (March 2025 update)")
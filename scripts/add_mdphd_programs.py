@@ -4,9 +4,12 @@ Add MD/PhD Program Information to Medical Schools Database
 Updates the CSV to indicate which schools offer MD/PhD programs.
 """
 
-import csv
 import re
 
+from dataset_snapshot import DEFAULT_CSV_PATH
+from enrichment import enrich_csv
+from keyword_matcher import KeywordMatcher
+
 # U.S. Schools with MD/PhD programs (from Shemmassian Consulting)
 # These are partial names/keywords to match against our database
 MDPHD_SCHOOLS = {
@@ -212,6 +215,10 @@ MDPHD_SCHOOLS = {
 }
 
 
+# Compiled once; matches list names in a school's name (and vice versa)
+MDPHD_MATCHER = KeywordMatcher((name, True) for name in sorted(MDPHD_SCHOOLS))
+
+
 def has_mdphd_program(school_name, degree_type):
     """
     Check if a school offers an MD/PhD program.
@@ -227,17 +234,16 @@ def has_mdphd_program(school_name, degree_type):
     if degree_type == "DO":
         return False
 
-    # Check if any MD/PhD school keyword matches
-    school_name_lower = school_name.lower()
+    # A list keyword in the school's name, or the school's name in a keyword
+    return bool(MDPHD_MATCHER.find(school_name) or MDPHD_MATCHER.within(school_name))
 
-    for mdphd_school in MDPHD_SCHOOLS:
-        mdphd_school_lower = mdphd_school.lower()
 
-        # Check for substring match
-        if mdphd_school_lower in school_name_lower or school_name_lower in mdphd_school_lower:
-            return True
-
-    return False
+def mdphd_columns(table):
+    """MD/PhD Program column for an enrichment Table."""
+    return {'MD/PhD Program': [
+        'Yes' if has_mdphd_program(school_name, degree_type) else 'No'
+        for school_name, degree_type in zip(table['Medical School Name'], table['Degree Type'])
+    ]}
 
 
 def update_csv_with_mdphd(input_file, output_file):
@@ -248,32 +254,8 @@ def update_csv_with_mdphd(input_file, output_file):
         input_file: Path to input CSV
         output_file: Path to output CSV
     """
-    schools_data = []
-
-    # Read existing CSV
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
-        for row in reader:
-            school_name = row['Medical School Name']
-            degree_type = row['Degree Type']
-
-            # Check if school has MD/PhD program
-            has_program = has_mdphd_program(school_name, degree_type)
-            row['MD/PhD Program'] = 'Yes' if has_program else 'No'
-
-            schools_data.append(row)
-
-    # Write updated CSV
-    new_fieldnames = list(fieldnames) + ['MD/PhD Program']
-
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=new_fieldnames)
-        writer.writeheader()
-        writer.writerows(schools_data)
-
-    return schools_data
+    table, _ = enrich_csv(input_file, output_file, [('mdphd', mdphd_columns)])
+    return table.rows()
 
 
 def print_summary(schools_data):
@@ -293,8 +275,8 @@ def print_summary(schools_data):
 
 
 def main():
-    input_file = "medical_schools_data.csv"
-    output_file = "medical_schools_data.csv"  # Overwrite
+    input_file = DEFAULT_CSV_PATH
+    output_file = DEFAULT_CSV_PATH  # Overwrite
 
     print("Adding MD/PhD program information to medical schools database...")
 
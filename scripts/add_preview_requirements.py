@@ -4,7 +4,12 @@ Update Medical Schools CSV with AAMC PREview Exam Requirements
 Adds a column indicating AAMC PREview requirements based on Shemmassian Consulting data.
 """
 
-import csv
+import os
+
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT
+from enrichment import enrich_csv
+from keyword_matcher import KeywordMatcher
+from school_resolver import SchoolResolver
 
 # Schools with AAMC PREview requirements (from Shemmassian Consulting - March 2025)
 # Only MD schools are listed as requiring/recommending PREview
@@ -43,28 +48,28 @@ DO_SCHOOLS_PREVIEW_RECOMMENDED = {
 }
 
 
-def normalize_school_name(name):
-    """
-    Normalize school names for better matching.
-    Remove extra spaces, handle common variations.
-    """
-    name = name.strip()
-    name = name.replace("  ", " ")  # Remove double spaces
+# Names on the PREview list that are spelled differently in our CSV
+NAME_REPLACEMENTS = {
+    "Rutgers - Robert Wood Johnson Medical School": "Rutgers Robert Wood Johnson Medical School",
+    "University of Alabama at Birmingham Marnix E. Heersink School of Medicine": "University of Alabama at Birmingham Heersink School of Medicine",
+    "University of California at Davis School of Medicine": "University of California Davis School of Medicine",
+    "University of California Los Angeles David Geffen School of Medicine": "University of California Los Angeles David Geffen School of Medicine",
+    "University of Hawaii John A. Burns School of Medicine": "University of Hawaii John A. Burns School of Medicine",
+    "University of Louisville School of Medicine": "University of Louisville School of Medicine",
+    "University of Massachusetts Medical School": "University of Massachusetts Medical School",
+    "University of Utah School of Medicine": "University of Utah School of Medicine",
+    "University of Wisconsin School of Medicine and Public Health": "University of Wisconsin School of Medicine and Public Health",
+}
 
-    # Common name variations to standardize
-    replacements = {
-        "Rutgers - Robert Wood Johnson Medical School": "Rutgers Robert Wood Johnson Medical School",
-        "University of Alabama at Birmingham Marnix E. Heersink School of Medicine": "University of Alabama at Birmingham Heersink School of Medicine",
-        "University of California at Davis School of Medicine": "University of California Davis School of Medicine",
-        "University of California Los Angeles David Geffen School of Medicine": "University of California Los Angeles David Geffen School of Medicine",
-        "University of Hawaii John A. Burns School of Medicine": "University of Hawaii John A. Burns School of Medicine",
-        "University of Louisville School of Medicine": "University of Louisville School of Medicine",
-        "University of Massachusetts Medical School": "University of Massachusetts Medical School",
-        "University of Utah School of Medicine": "University of Utah School of Medicine",
-        "University of Wisconsin School of Medicine and Public Health": "University of Wisconsin School of Medicine and Public Health",
-    }
+# Resolve CSV names against each list by exact name, match key or alias
+MD_PREVIEW_INDEX = SchoolResolver.from_names(MD_SCHOOLS_PREVIEW_REQUIREMENTS)
+DO_PREVIEW_INDEX = SchoolResolver.from_names(DO_SCHOOLS_PREVIEW_RECOMMENDED)
 
-    return replacements.get(name, name)
+# Both tables in one automaton; values are (degree type, requirement)
+PREVIEW_MATCHER = KeywordMatcher(
+    [(name, ("MD", requirement)) for name, requirement in MD_SCHOOLS_PREVIEW_REQUIREMENTS.items()]
+    + [(name, ("DO", requirement)) for name, requirement in DO_SCHOOLS_PREVIEW_RECOMMENDED.items()]
+)
 
 
 def get_preview_requirement(school_name, degree_type):
@@ -78,33 +83,33 @@ def get_preview_requirement(school_name, degree_type):
     Returns:
         String: PREview requirement status or "Not Required"
     """
-    normalized_name = normalize_school_name(school_name)
-
-    # Check MD schools first
     if degree_type == "MD":
-        # Direct match
-        if normalized_name in MD_SCHOOLS_PREVIEW_REQUIREMENTS:
-            return MD_SCHOOLS_PREVIEW_REQUIREMENTS[normalized_name]
-
-        # Fuzzy matching for common variations
-        for preview_school, requirement in MD_SCHOOLS_PREVIEW_REQUIREMENTS.items():
-            if preview_school.lower() in normalized_name.lower():
-                return requirement
-
-    # Check DO schools
+        index, requirements = MD_PREVIEW_INDEX, MD_SCHOOLS_PREVIEW_REQUIREMENTS
     elif degree_type == "DO":
-        # Direct match
-        if normalized_name in DO_SCHOOLS_PREVIEW_RECOMMENDED:
-            return DO_SCHOOLS_PREVIEW_RECOMMENDED[normalized_name]
+        index, requirements = DO_PREVIEW_INDEX, DO_SCHOOLS_PREVIEW_RECOMMENDED
+    else:
+        return "Not Required"
 
-        # Fuzzy matching for common variations
-        for preview_school, requirement in DO_SCHOOLS_PREVIEW_RECOMMENDED.items():
-            if preview_school.lower() in normalized_name.lower():
-                return requirement
+    resolution = index.lookup(school_name)
+    if resolution is not None:
+        return requirements[resolution.school_id]
+
+    # Fall back to list names contained in the school's name (first in table order)
+    for _, (degree, requirement) in PREVIEW_MATCHER.find(school_name):
+        if degree == degree_type:
+            return requirement
 
     return "Not Required"
 
 
+def preview_columns(table):
+    """Requires PREview column for an enrichment Table."""
+    return {'Requires PREview': [
+        get_preview_requirement(school_name, degree_type)
+        for school_name, degree_type in zip(table['Medical School Name'], table['Degree Type'])
+    ]}
+
+
 def update_csv_with_preview_requirements(input_file, output_file):
     """
     Read the existing CSV and add PREview requirement column.
@@ -113,32 +118,8 @@ def update_csv_with_preview_requirements(input_file, output_file):
         input_file: Path to input CSV
         output_file: Path to output CSV
     """
-    schools_data = []
-
-    # Read existing CSV
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
-        for row in reader:
-            school_name = row['Medical School Name']
-            degree_type = row['Degree Type']
-
-            # Determine PREview requirement
-            preview_requirement = get_preview_requirement(school_name, degree_type)
-            row['Requires PREview'] = preview_requirement
-
-            schools_data.append(row)
-
-    # Write updated CSV
-    new_fieldnames = list(fieldnames) + ['Requires PREview']
-
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=new_fieldnames)
-        writer.writeheader()
-        writer.writerows(schools_data)
-
-    return schools_data
+    table, _ = enrich_csv(input_file, output_file, [('preview', preview_columns)])
+    return table.rows()
 
 
 def print_summary(schools_data):
@@ -164,8 +145,8 @@ def print_summary(schools_data):
 
 
 def main():
-    input_file = "../public/medical_schools_data.csv"
-    output_file = "../public/medical_schools_data_with_preview.csv"
+    input_file = DEFAULT_CSV_PATH
+    output_file = os.path.join(REPO_ROOT, 'public', 'medical_schools_data_with_preview.csv')
 
     print("Updating medical schools CSV with AAMC PREview requirements...")
     print("Source: Shemmassian Consulting - AAMC PREview guide (March 2025)")
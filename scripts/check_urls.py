@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Check that the schools' website URLs are alive.
+
+Checks every URL in the Website URL column concurrently with aiohttp:
+
+- at most --jobs requests in flight, at most PER_HOST_LIMIT per host, and
+  requests to one host spaced at least --host-interval seconds apart
+- HEAD first; servers that reject HEAD (405, 403, 501, ...) or fail it are
+  retried with GET
+- redirects are followed and the final URL recorded, so moved pages can be
+  updated (--apply-redirects rewrites permanent redirects in the CSV; fix
+  add_website_urls.py too, or the next enrichment run restores the old URL)
+- results are cached in output/url_checks.json: live URLs are re-checked
+  after OK_TTL, failing ones after FAILED_TTL
+
+The report (output/url_status.csv) lists every school with its URL, HTTP
+status, final URL and error.
+
+Usage:
+    python3 scripts/check_urls.py
+    python3 scripts/check_urls.py --refresh             # ignore cached results
+    python3 scripts/check_urls.py --apply-redirects     # update moved URLs in the CSV
+    python3 scripts/check_urls.py https://medicine.uams.edu/ https://www.acom.edu/
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from dataset_snapshot import DEFAULT_CSV_PATH, SNAPSHOT_DIR
+from enrichment import Table
+
+CHECKS_PATH = os.path.join(SNAPSHOT_DIR, 'url_checks.json')
+REPORT_PATH = os.path.join(SNAPSHOT_DIR, 'url_status.csv')
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Seconds before a cached result is checked again
+OK_TTL = 7 * 24 * 60 * 60
+FAILED_TTL = 6 * 60 * 60
+
+DEFAULT_JOBS = 32
+PER_HOST_LIMIT = 2
+HOST_INTERVAL = 0.25
+TIMEOUT = 20
+
+# HEAD responses that say nothing about the page; retried with GET
+_HEAD_UNSUPPORTED = {400, 403, 404, 405, 406, 429, 500, 501, 503}
+
+_PERMANENT_REDIRECTS = {301, 308}
+
+
+class HostLimiter:
+    """
+    Per-host concurrency and request spacing.
+
+    Args:
+        concurrency: Requests in flight per host
+        interval: Minimum seconds between request starts to one host
+    """
+
+    def __init__(self, concurrency=PER_HOST_LIMIT, interval=HOST_INTERVAL):
+        self.concurrency = concurrency
+        self.interval = interval
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    def _host(self, url):
+        return urlsplit(url).netloc.lower()
+
+    async def acquire(self, url):
+        host = self._host(url)
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        await semaphore.acquire()
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            wait = self._last_start.get(host, 0) + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start[host] = time.monotonic()
+
+    def release(self, url):
+        self._semaphores[self._host(url)].release()
+
+
+def _result(url, status=None, final_url=None, permanent=False, error=None):
+    ok = status is not None and status < 400
+    return {
+        'url': url,
+        'ok': ok,
+        'status': status,
+        'final_url': final_url or url,
+        'permanent_redirect': permanent,
+        'error': error,
+        'checked_at': time.time(),
+    }
+
+
+async def _request(session, method, url):
+    async with session.request(method, url, allow_redirects=True) as response:
+        permanent = bool(response.history) and all(
+            step.status in _PERMANENT_REDIRECTS for step in response.history
+        )
+        return response.status, str(response.url), permanent
+
+
+async def check_url(session, limiter, url):
+    """
+    Check one URL: HEAD, then GET if HEAD is rejected or fails.
+
+    Returns:
+        Result dictionary (url, ok, status, final_url, permanent_redirect,
+        error, checked_at)
+    """
+    await limiter.acquire(url)
+    try:
+        try:
+            status, final_url, permanent = await _request(session, 'HEAD', url)
+            if status not in _HEAD_UNSUPPORTED:
+                return _result(url, status, final_url, permanent)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        try:
+            status, final_url, permanent = await _request(session, 'GET', url)
+            return _result(url, status, final_url, permanent)
+        except asyncio.TimeoutError:
+            return _result(url, error='timed out')
+        except aiohttp.ClientError as e:
+            return _result(url, error=str(e) or type(e).__name__)
+    finally:
+        limiter.release(url)
+
+
+async def check_urls(urls, jobs=DEFAULT_JOBS, per_host=PER_HOST_LIMIT,
+                     host_interval=HOST_INTERVAL, timeout=TIMEOUT):
+    """
+    Check URLs concurrently.
+
+    Args:
+        urls: URLs to check (duplicates are checked once)
+        jobs: Maximum requests in flight
+        per_host: Maximum requests in flight per host
+        host_interval: Minimum seconds between requests to one host
+        timeout: Seconds allowed per request
+
+    Returns:
+        Dictionary mapping URL to result
+    """
+    urls = list(dict.fromkeys(urls))
+    limiter = HostLimiter(per_host, host_interval)
+    connector = aiohttp.TCPConnector(limit=jobs, limit_per_host=per_host, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        results = await asyncio.gather(*(check_url(session, limiter, url) for url in urls))
+    return dict(zip(urls, results))
+
+
+def load_checks(path=CHECKS_PATH):
+    """Cached results by URL."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checks(checks, path=CHECKS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.part'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_current(result, now=None):
+    """Whether a cached result is within its TTL."""
+    ttl = OK_TTL if result.get('ok') else FAILED_TTL
+    return (now or time.time()) - result.get('checked_at', 0) < ttl
+
+
+def write_report(path, names, urls, checks):
+    """Write one row per school with its URL's check result."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Medical School Name', 'Website URL', 'OK', 'Status', 'Final URL', 'Error', 'Checked At'])
+        for name, url in zip(names, urls):
+            result = checks.get(url)
+            if not url or result is None:
+                writer.writerow([name, url, '', '', '', 'no URL' if not url else '', ''])
+                continue
+            checked_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(result['checked_at']))
+            final_url = result['final_url'] if result['final_url'] != url else ''
+            writer.writerow([name, url, result['ok'], result['status'] or '', final_url,
+                             result['error'] or '', checked_at])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the schools\' website URLs')
+    parser.add_argument('urls', nargs='*', help='Check these URLs instead of the CSV')
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='Dataset CSV')
+    parser.add_argument('--report', default=REPORT_PATH, help='Status report CSV')
+    parser.add_argument('--cache', default=CHECKS_PATH, help='Cached results')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached results')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='Requests in flight')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT, help='Requests in flight per host')
+    parser.add_argument('--host-interval', type=float, default=HOST_INTERVAL,
+                        help='Seconds between requests to one host')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='Seconds per request')
+    parser.add_argument('--apply-redirects', action='store_true',
+                        help='Replace permanently redirected URLs in the CSV with their final URL')
+    args = parser.parse_args()
+
+    table = None
+    if args.urls:
+        names, urls = list(args.urls), list(args.urls)
+    else:
+        table = Table.read(args.csv)
+        names, urls = table['Medical School Name'], table.get('Website URL')
+
+    checks = load_checks(args.cache)
+    now = time.time()
+    pending = [url for url in dict.fromkeys(urls)
+               if url and (args.refresh or url not in checks or not is_current(checks[url], now))]
+
+    print(f"Checking {len(pending)} URLs ({len(set(filter(None, urls))) - len(pending)} cached)...")
+    started = time.perf_counter()
+    if pending:
+        checks.update(asyncio.run(check_urls(
+            pending, jobs=max(1, args.jobs), per_host=max(1, args.per_host),
+            host_interval=args.host_interval, timeout=args.timeout
+        )))
+        save_checks(checks, args.cache)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+    results = [checks[url] for url in dict.fromkeys(urls) if url in checks]
+    dead = [result for result in results if not result['ok']]
+    moved = [result for result in results if result['ok'] and result['final_url'] != result['url']]
+    print(f"  live: {len(results) - len(dead)}  dead: {len(dead)}  redirected: {len(moved)}")
+    for result in dead:
+        print(f"  ✗ {result['url']} ({result['status'] or result['error']})")
+
+    if not args.urls:
+        write_report(args.report, names, urls, checks)
+        print(f"Report: {args.report}")
+
+    if args.apply_redirects and table is not None:
+        updated = [
+            checks[url]['final_url']
+            if url in checks and checks[url]['ok'] and checks[url]['permanent_redirect'] else url
+            for url in urls
+        ]
+        changed = sum(1 for old, new in zip(urls, updated) if old != new)
+        if changed:
+            table['Website URL'] = updated
+            table.write(args.csv)
+        print(f"Updated {changed} permanently redirected URLs in {args.csv}")
+
+    if dead:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Binary snapshot of the medical schools CSV for fast startup.
+
+Parsing the CSV on every process start gets slow as the dataset grows. This
+script compiles it once into a single file that can be memory-mapped:
+
+- every CSV column, stored either as a dictionary-encoded category (codes
+  plus the distinct values) or as UTF-8 text with an offsets array
+- typed columns with the parsed average GPA (float64) and MCAT (int32)
+- prebuilt indexes: row IDs for each value of the filter columns (state,
+  degree type, application system, public status), and the classifiable
+  rows sorted most competitive first
+
+Opening a snapshot only reads the header; columns are read straight out of
+the mapped file, so pre-forked workers share the same pages. The header
+records the size, mtime and SHA-256 of the source CSV, and loaders fall
+back to the CSV when the snapshot is missing, stale or from another format.
+
+Usage:
+    python3 scripts/dataset_snapshot.py build
+    python3 scripts/dataset_snapshot.py build --csv public/medical_schools_data.csv
+    python3 scripts/dataset_snapshot.py info
+    python3 scripts/dataset_snapshot.py verify
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+MAGIC = b'MEDSNAP\0'
+FORMAT_VERSION = 1
+
+# magic, format version, header length, header CRC-32
+_PREFIX = struct.Struct('<8sIII')
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DEFAULT_CSV_PATH = os.path.join(REPO_ROOT, 'public', 'medical_schools_data.csv')
+SNAPSHOT_DIR = os.path.join(REPO_ROOT, 'output')
+
+# Columns that get a value -> row IDs index
+INDEXED_COLUMNS = ('State', 'Degree Type', 'Application System', 'Public School Status')
+
+# Columns with at most this many distinct values are dictionary-encoded
+MAX_CATEGORY_VALUES = 65535
+
+
+def snapshot_path_for(csv_path):
+    """Default snapshot location for a CSV file (output/<name>.snapshot)."""
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(SNAPSHOT_DIR, f'{name}.snapshot')
+
+
+def parse_gpa(gpa_str):
+    """Parse an Average GPA cell (same rules as the API): 0.0 if not reported."""
+    if not gpa_str or gpa_str == 'NR':
+        return 0.0
+    if '–' in gpa_str or '-' in gpa_str:
+        gpa_str = gpa_str.split('–')[0].split('-')[0]
+    try:
+        return float(gpa_str.replace('+', '').strip())
+    except ValueError:
+        return 0.0
+
+
+def parse_mcat(mcat_str):
+    """Parse an Average MCAT cell (same rules as the API): 0 if not reported."""
+    if not mcat_str or mcat_str == 'NR':
+        return 0
+    if '–' in mcat_str or '-' in mcat_str:
+        mcat_str = mcat_str.split('–')[0].split('-')[0]
+    try:
+        return int(float(mcat_str.replace('+', '').strip()))
+    except ValueError:
+        return 0
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_info(csv_path):
+    """Size, mtime and SHA-256 of a source CSV, recorded by files built from it."""
+    stat = os.stat(csv_path)
+    return {
+        'path': os.path.basename(csv_path),
+        'size': stat.st_size,
+        'mtimeNs': stat.st_mtime_ns,
+        'sha256': file_sha256(csv_path)
+    }
+
+
+def source_is_current(source, csv_path):
+    """
+    Check whether a CSV still has the contents recorded by source_info().
+
+    Size and mtime are compared first; the CSV is only hashed when its
+    mtime changed but the size didn't (e.g. after a fresh checkout).
+    """
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return False
+    if stat.st_size != source['size']:
+        return False
+    if stat.st_mtime_ns == source['mtimeNs']:
+        return True
+    return file_sha256(csv_path) == source['sha256']
+
+
+class PayloadWriter:
+    """Accumulates 8-byte aligned arrays and records where each one lands."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def add(self, data):
+        data = bytes(data)
+        padding = -self.size % 8
+        if padding:
+            self.parts.append(b'\0' * padding)
+            self.size += padding
+        offset = self.size
+        self.parts.append(data)
+        self.size += len(data)
+        return [offset, len(data)]
+
+    def add_strings(self, values):
+        offsets = array('Q', [0])
+        blobs = []
+        total = 0
+        for value in values:
+            encoded = value.encode('utf-8')
+            blobs.append(encoded)
+            total += len(encoded)
+            offsets.append(total)
+        return {'offsets': self.add(offsets), 'text': self.add(b''.join(blobs))}
+
+
+def build_snapshot(csv_path=DEFAULT_CSV_PATH, snapshot_path=None):
+    """
+    Compile a CSV into a snapshot file.
+
+    The file is written to a temporary name and renamed into place, so
+    readers never see a partial snapshot.
+
+    Returns:
+        The snapshot header dictionary
+    """
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_for(csv_path)
+
+    source = source_info(csv_path)
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        columns = {name: [] for name in fieldnames}
+        for row in reader:
+            for name in fieldnames:
+                columns[name].append(row.get(name) or '')
+    row_count = len(columns[fieldnames[0]]) if fieldnames else 0
+
+    payload = PayloadWriter()
+    header = {
+        'formatVersion': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'rows': row_count,
+        'builtAt': time.time(),
+        'source': source,
+        'fieldnames': fieldnames,
+        'columns': {},
+        'indexes': {}
+    }
+    header['datasetVersion'] = header['source']['sha256'][:12]
+
+    for name in fieldnames:
+        values = columns[name]
+        distinct = sorted(set(values))
+        if len(distinct) <= MAX_CATEGORY_VALUES and (len(distinct) <= 255 or 2 * len(distinct) <= row_count):
+            codes_of = {value: code for code, value in enumerate(distinct)}
+            codes = array('B' if len(distinct) <= 256 else 'H', [codes_of[v] for v in values])
+            header['columns'][name] = {
+                'kind': 'category',
+                'typecode': codes.typecode,
+                'codes': payload.add(codes),
+                'values': payload.add_strings(distinct)
+            }
+            if name in INDEXED_COLUMNS:
+                postings = [array('I') for _ in distinct]
+                for row_id, code in enumerate(codes):
+                    postings[code].append(row_id)
+                offsets = array('Q', [0])
+                for rows in postings:
+                    offsets.append(offsets[-1] + len(rows))
+                header['indexes'][name] = {
+                    'offsets': payload.add(offsets),
+                    'rows': payload.add(b''.join(rows.tobytes() for rows in postings))
+                }
+        else:
+            header['columns'][name] = dict(kind='text', **payload.add_strings(values))
+
+    gpas = array('d', (parse_gpa(v) for v in columns.get('Average GPA', [''] * row_count)))
+    mcats = array('i', (parse_mcat(v) for v in columns.get('Average MCAT', [''] * row_count)))
+    header['columns']['gpa'] = {'kind': 'float64', 'data': payload.add(gpas)}
+    header['columns']['mcat'] = {'kind': 'int32', 'data': payload.add(mcats)}
+
+    # Classifiable rows, most competitive first (stable, like the API's sort)
+    competitive = [i for i in range(row_count) if gpas[i] and mcats[i]]
+    competitive.sort(key=lambda i: (gpas[i], mcats[i]), reverse=True)
+    header['indexes']['competitive'] = {'rows': payload.add(array('I', competitive))}
+
+    write_container(snapshot_path, MAGIC, FORMAT_VERSION, header, payload)
+    return header
+
+
+class SnapshotError(Exception):
+    """The snapshot file is missing, corrupt or from an incompatible build."""
+
+
+def pack_container(magic, version, header, payload):
+    """
+    Serialize a header and payload into the mappable container layout.
+
+    Layout: fixed prefix (magic, format version, header length, header CRC),
+    JSON header, padding to 8 bytes, then the payload. The payload length and
+    CRC are added to the header.
+
+    Returns:
+        The container as bytes
+    """
+    body = b''.join(payload.parts)
+    header['payloadLength'] = len(body)
+    header['payloadCrc32'] = zlib.crc32(body)
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    prefix = _PREFIX.pack(magic, version, len(header_bytes), zlib.crc32(header_bytes))
+    padding = b'\0' * (-(len(prefix) + len(header_bytes)) % 8)
+    return b''.join((prefix, header_bytes, padding, body))
+
+
+def write_container(path, magic, version, header, payload):
+    """
+    Write a container file (see pack_container()).
+
+    Written to a temporary file and renamed into place, so readers never see
+    a partial file.
+    """
+    data = pack_container(magic, version, header, payload)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def map_container(path, magic, version):
+    """
+    Memory-map a file written by write_container() and check its header.
+
+    Returns:
+        (header dict, payload memoryview, mmap object)
+
+    Raises:
+        SnapshotError: If the file can't be used
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f'Cannot open {path}: {e}')
+    header, payload = read_container(memoryview(mapped), magic, version)
+    return header, payload, mapped
+
+
+def read_container(view, magic, version):
+    """
+    Check the header of a container held in memory.
+
+    Returns:
+        (header dict, payload memoryview)
+
+    Raises:
+        SnapshotError: If the data can't be used
+    """
+    if len(view) < _PREFIX.size:
+        raise SnapshotError('File is too short')
+    found_magic, found_version, header_length, header_crc = _PREFIX.unpack_from(view)
+    if found_magic != magic:
+        raise SnapshotError('Unrecognized file type')
+    if found_version != version:
+        raise SnapshotError(f'File format {found_version}, expected {version}')
+
+    header_bytes = view[_PREFIX.size:_PREFIX.size + header_length]
+    if zlib.crc32(header_bytes) != header_crc:
+        raise SnapshotError('Header checksum mismatch')
+    try:
+        header = json.loads(bytes(header_bytes))
+    except ValueError:
+        raise SnapshotError('Header is not valid JSON')
+    if header.get('byteorder') != sys.byteorder:
+        raise SnapshotError('File was built on a machine with a different byte order')
+
+    start = _PREFIX.size + header_length
+    start += -start % 8
+    payload = view[start:]
+    if len(payload) != header.get('payloadLength'):
+        raise SnapshotError('Payload is truncated')
+    return header, payload
+
+
+class DatasetSnapshot:
+    """
+    Read-only view of a snapshot file, backed by mmap.
+
+    Args:
+        path: Snapshot file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header, self._payload, self._mmap = map_container(path, MAGIC, FORMAT_VERSION)
+
+        self.rows = self.header['rows']
+        self.fieldnames = self.header['fieldnames']
+        self.version = self.header['datasetVersion']
+        self._columns = self.header['columns']
+        self._category_values = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _array(self, location, typecode):
+        offset, length = location
+        return self._payload[offset:offset + length].cast(typecode)
+
+    def _strings(self, spec):
+        """Decode a whole string table at once."""
+        offsets = self._array(spec['offsets'], 'Q')
+        offset, length = spec['text']
+        raw = self._payload[offset:offset + length]
+        text = str(raw, 'utf-8')
+        if len(text) == len(raw):
+            # ASCII: byte offsets are character offsets
+            return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+        return [str(raw[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(len(offsets) - 1)]
+
+    def _values(self, name):
+        """Distinct values of a category column (decoded once)."""
+        values = self._category_values.get(name)
+        if values is None:
+            values = self._category_values[name] = self._strings(self._columns[name]['values'])
+        return values
+
+    def column(self, name):
+        """
+        Return a whole column.
+
+        Text and category columns come back as a list of str. The typed gpa
+        and mcat columns come back as read-only memoryviews over the file.
+        """
+        spec = self._columns[name]
+        kind = spec['kind']
+        if kind == 'category':
+            values = self._values(name)
+            return [values[code] for code in self._array(spec['codes'], spec['typecode'])]
+        if kind == 'text':
+            return self._strings(spec)
+        return self._array(spec['data'], 'd' if kind == 'float64' else 'i')
+
+    def value(self, name, row_id):
+        """
+        Read a single cell without decoding the rest of the column.
+
+        A str for CSV columns; a float or int for the typed gpa and mcat
+        columns.
+        """
+        spec = self._columns[name]
+        kind = spec['kind']
+        if kind == 'category':
+            code = self._array(spec['codes'], spec['typecode'])[row_id]
+            spec = spec['values']
+            row_id = code
+        elif kind != 'text':
+            return self._array(spec['data'], 'd' if kind == 'float64' else 'i')[row_id]
+        offsets = self._array(spec['offsets'], 'Q')
+        offset = spec['text'][0]
+        return str(self._payload[offset + offsets[row_id]:offset + offsets[row_id + 1]], 'utf-8')
+
+    def row(self, row_id):
+        """
+        Return one row as a CSV-style dict of strings, reading only its cells.
+
+        Only the CSV's fieldnames are included, not the typed gpa and mcat
+        columns.
+        """
+        return {name: self.value(name, row_id) for name in self.fieldnames}
+
+    def iter_rows(self, row_ids=None):
+        """
+        Yield rows as CSV-style dicts of strings, like csv.DictReader.
+
+        Only the CSV's fieldnames are included, not the typed gpa and mcat
+        columns.
+
+        Args:
+            row_ids: Rows to read, in order (defaults to every row). Given
+                rows are read cell by cell, so an index lookup never decodes
+                whole columns.
+        """
+        if row_ids is not None:
+            for row_id in row_ids:
+                yield self.row(row_id)
+            return
+        columns = [(name, self.column(name)) for name in self.fieldnames]
+        for row_id in range(self.rows):
+            yield {name: values[row_id] for name, values in columns}
+
+    def lookup(self, column, value):
+        """
+        Return the IDs of rows whose indexed column equals value, in row order.
+
+        Raises:
+            KeyError: If the column isn't indexed
+        """
+        index = self.header['indexes'][column]
+        values = self._values(column)
+        try:
+            code = values.index(value)
+        except ValueError:
+            return []
+        offsets = self._array(index['offsets'], 'Q')
+        return self._array(index['rows'], 'I')[offsets[code]:offsets[code + 1]]
+
+    def competitive_rows(self):
+        """Row IDs with a usable GPA and MCAT, most competitive first."""
+        return self._array(self.header['indexes']['competitive']['rows'], 'I')
+
+    def verify(self):
+        """Check the payload checksum (reads the whole file)."""
+        return zlib.crc32(self._payload) == self.header['payloadCrc32']
+
+    def is_fresh(self, csv_path):
+        """Check whether the snapshot was built from the current CSV contents."""
+        return source_is_current(self.header['source'], csv_path)
+
+
+def open_for_csv(csv_path, snapshot_path=None):
+    """
+    Open the snapshot for a CSV if there is an up-to-date one.
+
+    Returns:
+        DatasetSnapshot, or None if the caller should read the CSV instead
+    """
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_for(csv_path)
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        snapshot = DatasetSnapshot(snapshot_path)
+    except (SnapshotError, KeyError, ValueError):
+        return None
+    if not snapshot.is_fresh(csv_path):
+        return None
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and inspect dataset snapshots')
+    parser.add_argument('command', choices=['build', 'info', 'verify'])
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='Source CSV file')
+    parser.add_argument('--out', help='Snapshot file (default: output/<csv name>.snapshot)')
+    args = parser.parse_args()
+
+    snapshot_path = args.out or snapshot_path_for(args.csv)
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        header = build_snapshot(args.csv, snapshot_path)
+        elapsed = time.perf_counter() - started
+        print(f"Built {snapshot_path}")
+        print(f"  Rows: {header['rows']}, version {header['datasetVersion']}, "
+              f"{os.path.getsize(snapshot_path):,} bytes in {elapsed:.2f}s")
+        return
+
+    try:
+        started = time.perf_counter()
+        snapshot = DatasetSnapshot(snapshot_path)
+        opened = time.perf_counter() - started
+    except SnapshotError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.command == 'info':
+        source = snapshot.header['source']
+        print(f"Snapshot: {snapshot_path} (opened in {opened * 1000:.2f}ms)")
+        print(f"  Rows: {snapshot.rows}, version {snapshot.version}")
+        print(f"  Source: {source['path']} ({source['size']:,} bytes, sha256 {source['sha256'][:12]})")
+        print(f"  Fresh: {'yes' if snapshot.is_fresh(args.csv) else 'no (rebuild with: build)'}")
+        for name, spec in snapshot.header['columns'].items():
+            print(f"  {name}: {spec['kind']}")
+        print(f"  Indexes: {', '.join(snapshot.header['indexes'])}")
+    else:
+        if snapshot.verify():
+            print(f"OK: {snapshot_path}")
+        else:
+            print(f"Checksum mismatch: {snapshot_path}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Single-pass columnar enrichment of the medical schools CSV.
+
+Each enrichment script (application systems, MD/PhD, website URLs, Casper,
+PREview, matriculation) provides an enricher: a function that takes the
+dataset as a Table and returns the column(s) it computes, e.g.
+
+    def casper_columns(table):
+        return {'Requires Casper': [...one value per row...]}
+
+enrich_csv() reads the CSV into a Table once, applies every enricher and
+writes the result once, so adding enrichers doesn't add I/O. A Table keeps
+one list per column, so enrichers read just the columns they need (zip over
+table['Medical School Name'], table['Degree Type']) instead of building a
+dict per row.
+
+An enricher value of '' means "nothing found" and doesn't replace a value
+already in the CSV (such as a hand-entered website URL).
+
+Usage:
+    python3 scripts/enrichment.py                      # enrich public/medical_schools_data.csv in place
+    python3 scripts/enrichment.py --only casper preview
+    python3 scripts/enrichment.py --output /tmp/enriched.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT
+
+
+class Table:
+    """
+    Column-oriented table of CSV values.
+
+    Args:
+        fieldnames: Column names, in order
+        columns: Dictionary mapping column name to a list of values
+    """
+
+    def __init__(self, fieldnames, columns):
+        self.fieldnames = list(fieldnames)
+        self._columns = {name: list(columns[name]) for name in self.fieldnames}
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"columns have different lengths: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def read(cls, path):
+        """Read a CSV file into a Table."""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            fieldnames = next(reader, [])
+            width = len(fieldnames)
+            rows = [(row + [''] * (width - len(row)))[:width] for row in reader]
+        columns = zip(*rows) if rows else [()] * len(fieldnames)
+        return cls(fieldnames, dict(zip(fieldnames, columns)))
+
+    def write(self, path):
+        """Write the table as CSV, through a temporary file renamed over path."""
+        tmp_path = f'{path}.{os.getpid()}.part'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.fieldnames)
+                writer.writerows(zip(*(self._columns[name] for name in self.fieldnames)))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __setitem__(self, name, values):
+        values = list(values)
+        if len(values) != self._length:
+            raise ValueError(f"column {name!r} has {len(values)} values for {self._length} rows")
+        if name not in self._columns:
+            self.fieldnames.append(name)
+        self._columns[name] = values
+
+    def get(self, name, default=''):
+        """A column, or a column of default values if the table doesn't have it."""
+        if name in self._columns:
+            return self._columns[name]
+        return [default] * self._length
+
+    def fill(self, name, values):
+        """Set a column, keeping existing values where the new value is ''."""
+        current = self.get(name)
+        self[name] = [value if value != '' else old for value, old in zip(values, current)]
+
+    def rows(self):
+        """The table as a list of row dicts (for summaries and scripts that want rows)."""
+        columns = [self._columns[name] for name in self.fieldnames]
+        return [dict(zip(self.fieldnames, values)) for values in zip(*columns)]
+
+
+def apply_enrichers(table, enrichers):
+    """
+    Run enrichers over a table in memory.
+
+    Args:
+        table: Table to update
+        enrichers: List of (name, function); each function takes the table
+            and returns a dictionary mapping column name to values
+
+    Returns:
+        Dictionary mapping enricher name to seconds taken
+    """
+    timings = {}
+    for name, enricher in enrichers:
+        started = time.perf_counter()
+        for column, values in enricher(table).items():
+            table.fill(column, values)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def default_enrichers(facts_path=None):
+    """
+    The repo's enrichers, in the order they are applied.
+
+    Args:
+        facts_path: AAMC FACTS Table A-1 spreadsheet; matriculation data is
+            only added when it is given
+
+    Returns:
+        List of (name, function)
+    """
+    if REPO_ROOT not in sys.path:
+        sys.path.append(REPO_ROOT)
+    from add_casper_requirements import casper_columns
+    from add_mdphd_programs import mdphd_columns
+    from add_preview_requirements import preview_columns
+    from add_website_urls import website_url_columns
+    from update_application_systems import application_system_columns
+
+    enrichers = [
+        ('application_systems', application_system_columns),
+        ('mdphd', mdphd_columns),
+        ('website_urls', website_url_columns),
+        ('casper', casper_columns),
+        ('preview', preview_columns),
+    ]
+    if facts_path:
+        from update_matriculation_data import load_facts_matriculation, matriculation_columns
+        facts_data = load_facts_matriculation(facts_path)
+        enrichers.append(('matriculation', lambda table: matriculation_columns(table, facts_data)))
+    return enrichers
+
+
+# Scripts the default enrichers are defined in (relative to the repo root)
+ENRICHER_SOURCES = [
+    'scripts/update_application_systems.py',
+    'scripts/add_mdphd_programs.py',
+    'add_website_urls.py',
+    'scripts/add_casper_requirements.py',
+    'scripts/add_preview_requirements.py',
+]
+
+
+def enrich_csv(input_file, output_file, enrichers):
+    """
+    Read a CSV once, apply every enricher, and write it once.
+
+    Returns:
+        Tuple of (Table, timings by enricher name)
+    """
+    table = Table.read(input_file)
+    timings = apply_enrichers(table, enrichers)
+    table.write(output_file)
+    return table, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add every enrichment column to the schools CSV in one pass')
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='Input CSV')
+    parser.add_argument('--output', help='Output CSV (default: update the input in place)')
+    parser.add_argument('--facts', help='AAMC FACTS Table A-1 spreadsheet for matriculation data')
+    parser.add_argument('--only', nargs='+', metavar='ENRICHER', help='Only run these enrichers')
+    args = parser.parse_args()
+
+    enrichers = default_enrichers(args.facts)
+    if args.only:
+        unknown = set(args.only) - {name for name, _ in enrichers}
+        if unknown:
+            parser.error(f"unknown enricher(s): {', '.join(sorted(unknown))}")
+        enrichers = [(name, enricher) for name, enricher in enrichers if name in args.only]
+
+    output_file = args.output or args.csv
+    table, timings = enrich_csv(args.csv, output_file, enrichers)
+    print(f"Enriched {len(table)} schools -> {output_file}")
+    for name, elapsed in timings.items():
+        print(f"  {name}: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
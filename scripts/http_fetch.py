@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP fetching for the scrapers.
+
+Every scraper downloads its source pages through this module instead of
+calling requests.get directly:
+
+- one requests.Session per process, so connections are kept alive and
+  pooled across calls
+- timeouts, and retries with exponential backoff on connection errors,
+  429 and 5xx responses (honoring Retry-After)
+- at most PER_HOST_LIMIT requests to the same host at once, counting
+  streamed downloads until their body is on disk, also when fetching many
+  URLs in parallel with fetch_many()
+- an on-disk cache in output/http_cache/. Responses younger than max_age
+  are served without a request; older ones are revalidated with
+  If-None-Match / If-Modified-Since, so an unchanged page costs a 304
+  instead of a full download. If the network fails, the cached copy is
+  served (marked stale).
+- offline replay (--offline, or HTTP_FETCH_OFFLINE=1): serve everything
+  from the cache and never touch the network, e.g. to re-run a scraper
+  against what it downloaded last time
+
+Usage:
+    from http_fetch import fetch, fetch_file
+    response = fetch(url)            # .content, .text, .status_code, .from_cache
+    pdf_path = fetch_file(pdf_url)   # large files: streamed to disk, path returned
+
+    python3 scripts/http_fetch.py https://example.com/page   # fetch into the cache
+    python3 scripts/http_fetch.py --offline https://example.com/page
+    python3 scripts/http_fetch.py --list
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from dataset_snapshot import SNAPSHOT_DIR
+
+CACHE_DIR = os.path.join(SNAPSHOT_DIR, 'http_cache')
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# (connect, read) timeout in seconds
+TIMEOUT = (10, 60)
+
+# Attempts after the first, and the backoff base (0.5s, 1s, 2s, ...)
+RETRIES = 4
+BACKOFF_FACTOR = 0.5
+
+# Concurrent requests per host, and pooled connections per host
+PER_HOST_LIMIT = 4
+
+# Cached responses younger than this are used without revalidating
+DEFAULT_MAX_AGE = 60 * 60
+
+OFFLINE_ENV = 'HTTP_FETCH_OFFLINE'
+
+# Bytes per read when streaming a download to disk
+CHUNK_SIZE = 64 * 1024
+
+_CHARSET = re.compile(r'charset=([\w.:-]+)', re.IGNORECASE)
+
+
+class OfflineCacheMiss(LookupError):
+    """Raised in offline mode for a URL that isn't in the cache."""
+
+
+class CachedResponse:
+    """
+    A fetched (or cached) HTTP response.
+
+    Attributes:
+        url: Requested URL
+        status_code: HTTP status of the original full response
+        headers: Response headers (Content-Type, ETag, Last-Modified, ...)
+        content: Body as bytes
+        from_cache: 'fresh' (no request), 'revalidated' (304), 'stale'
+            (network or server failed) or 'offline'; None for a full download
+    """
+
+    def __init__(self, url, status_code, headers, content, from_cache=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        """Body decoded with the charset from Content-Type (UTF-8 if none)."""
+        match = _CHARSET.search(self.headers.get('Content-Type', ''))
+        encoding = match.group(1) if match else 'utf-8'
+        try:
+            return self.content.decode(encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+    def raise_for_status(self):
+        """No-op: fetch() already raised for error responses."""
+
+
+class HTTPCache:
+    """
+    On-disk response cache: <sha256 of URL>.json (metadata) and .body.
+
+    Args:
+        directory: Cache directory
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f'{base}.json', f'{base}.body'
+
+    def body_path(self, url):
+        """Where the body of a cached response is stored."""
+        return self._paths(url)[1]
+
+    def load_meta(self, url):
+        """
+        Read the metadata of a cached response.
+
+        Returns:
+            Metadata dictionary, or None if the URL isn't (completely) cached
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            size = os.path.getsize(body_path)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or size != meta.get('size'):
+            return None
+        return meta
+
+    def read_body(self, url):
+        with open(self.body_path(url), 'rb') as f:
+            return f.read()
+
+    def store(self, url, status_code, headers, body):
+        """
+        Write a response; body first, so metadata never points at a partial body.
+
+        Args:
+            body: Bytes, or an iterable of byte chunks (written as they arrive)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        chunks = [body] if isinstance(body, bytes) else body
+        size = 0
+        tmp_path = f'{body_path}.{os.getpid()}.{threading.get_ident()}.part'
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, body_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        meta = {
+            'url': url,
+            'status_code': status_code,
+            'headers': {
+                name: headers[name]
+                for name in ('Content-Type', 'ETag', 'Last-Modified')
+                if headers.get(name)
+            },
+            'size': size,
+            'fetched_at': time.time(),
+        }
+        return self._write_meta(meta_path, meta)
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = f'{meta_path}.{os.getpid()}.{threading.get_ident()}.part'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, meta_path)
+        return meta
+
+    def touch(self, url, meta):
+        """Mark a cached response as just revalidated."""
+        meta_path, _ = self._paths(url)
+        return self._write_meta(meta_path, dict(meta, fetched_at=time.time()))
+
+    def entries(self):
+        """Yield the metadata of every cached response."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+
+
+class Fetcher:
+    """
+    Pooled, retrying, caching HTTP client.
+
+    Args:
+        cache: HTTPCache to use (default: output/http_cache; False disables
+            caching)
+        offline: Serve only from the cache (defaults to the
+            HTTP_FETCH_OFFLINE environment variable)
+        per_host: Maximum concurrent requests to one host
+        max_age: Seconds a cached response is used without revalidating
+    """
+
+    def __init__(self, cache=None, offline=None, per_host=PER_HOST_LIMIT, max_age=DEFAULT_MAX_AGE):
+        self.cache = HTTPCache() if cache is None else (cache or None)
+        if offline is None:
+            offline = os.environ.get(OFFLINE_ENV, '') not in ('', '0')
+        self.offline = offline
+        self.per_host = per_host
+        self.max_age = max_age
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=RETRIES, backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True, raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=per_host)
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _get(self, url, headers, max_age, stream=False, on_body=None):
+        """
+        Serve a URL from the cache or send a (conditional) GET.
+
+        Args:
+            stream: Don't read the body into memory
+            on_body: Called with a successful response before the host slot
+                is released, so a streamed download counts against the
+                per-host limit until its body has been read
+
+        Returns:
+            (metadata, from_cache label, None) when the cached copy is to be
+            used, otherwise (None, None, successful requests.Response)
+        """
+        max_age = self.max_age if max_age is None else max_age
+        meta = self.cache.load_meta(url) if self.cache else None
+
+        if self.offline:
+            if meta is None:
+                raise OfflineCacheMiss(f"not in the HTTP cache (offline mode): {url}")
+            return meta, 'offline', None
+
+        if meta is not None and time.time() - meta.get('fetched_at', 0) < max_age:
+            return meta, 'fresh', None
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            validators = meta.get('headers', {})
+            if validators.get('ETag'):
+                request_headers['If-None-Match'] = validators['ETag']
+            if validators.get('Last-Modified'):
+                request_headers['If-Modified-Since'] = validators['Last-Modified']
+
+        with self._host_limit(url):
+            try:
+                response = self.session.get(url, headers=request_headers, timeout=TIMEOUT, stream=stream)
+            except requests.RequestException as e:
+                if meta is None:
+                    raise
+                print(f"Warning: {url}: {e}; using the cached copy", file=sys.stderr)
+                return meta, 'stale', None
+
+            if response.status_code == 304 and meta is not None:
+                response.close()
+                return self.cache.touch(url, meta), 'revalidated', None
+            if response.status_code >= 500 and meta is not None:
+                response.close()
+                print(f"Warning: {url}: HTTP {response.status_code}; using the cached copy", file=sys.stderr)
+                return meta, 'stale', None
+
+            try:
+                response.raise_for_status()
+                if on_body is not None:
+                    on_body(response)
+            finally:
+                if stream:
+                    response.close()
+        return None, None, response
+
+    def fetch(self, url, headers=None, max_age=None):
+        """
+        GET a URL through the cache.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers
+            max_age: Override the fetcher's max_age (0 always revalidates)
+
+        Returns:
+            CachedResponse
+
+        Raises:
+            requests.HTTPError for 4xx/5xx responses (after retries),
+            requests.RequestException if the network fails and nothing is
+            cached, OfflineCacheMiss in offline mode for uncached URLs
+        """
+        meta, from_cache, response = self._get(url, headers, max_age)
+        if response is None:
+            return CachedResponse(url, meta.get('status_code', 200), meta.get('headers', {}),
+                                  self.cache.read_body(url), from_cache)
+
+        headers = dict(response.headers)
+        if self.cache:
+            self.cache.store(url, response.status_code, headers, response.content)
+        return CachedResponse(url, response.status_code, headers, response.content)
+
+    def fetch_file(self, url, headers=None, max_age=None):
+        """
+        GET a URL into the cache without holding the body in memory.
+
+        For large downloads such as PDFs: the body is streamed to disk in
+        chunks. Same caching and errors as fetch().
+
+        Returns:
+            Path of the cached body
+        """
+        if not self.cache:
+            raise ValueError("fetch_file() needs a cache")
+        def store(response):
+            self.cache.store(url, response.status_code, dict(response.headers),
+                             response.iter_content(CHUNK_SIZE))
+
+        self._get(url, headers, max_age, stream=True, on_body=store)
+        return self.cache.body_path(url)
+
+    def fetch_many(self, urls, jobs=8, **kwargs):
+        """
+        Fetch several URLs in parallel (still at most per_host per host).
+
+        Returns:
+            Dictionary mapping URL to CachedResponse, or to the exception
+            fetching it raised
+        """
+        urls = list(dict.fromkeys(urls))
+
+        def fetch_one(url):
+            try:
+                return self.fetch(url, **kwargs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            return dict(zip(urls, executor.map(fetch_one, urls)))
+
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+
+def default_fetcher():
+    """The process-wide Fetcher, created on first use."""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher()
+        return _default_fetcher
+
+
+def fetch(url, headers=None, max_age=None):
+    """GET a URL with the shared Fetcher (see Fetcher.fetch)."""
+    return default_fetcher().fetch(url, headers=headers, max_age=max_age)
+
+
+def fetch_file(url, headers=None, max_age=None):
+    """Download a URL into the cache with the shared Fetcher (see Fetcher.fetch_file)."""
+    return default_fetcher().fetch_file(url, headers=headers, max_age=max_age)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch URLs into the scrapers\' HTTP cache')
+    parser.add_argument('urls', nargs='*', help='URLs to fetch')
+    parser.add_argument('--offline', action='store_true', help='Only serve from the cache')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE,
+                        help=f'Seconds before revalidating a cached response (default: {DEFAULT_MAX_AGE})')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Cache directory')
+    parser.add_argument('--list', action='store_true', help='List cached responses')
+    args = parser.parse_args()
+
+    cache = HTTPCache(args.cache_dir)
+    if args.list:
+        for meta in cache.entries():
+            age = (time.time() - meta.get('fetched_at', 0)) / 3600
+            print(f"  {meta.get('size', 0):>9} bytes  {age:6.1f}h old  {meta.get('url')}")
+        return
+    if not args.urls:
+        parser.error('give URLs to fetch, or --list')
+
+    fetcher = Fetcher(cache, offline=args.offline or None, max_age=args.max_age)
+    failed = 0
+    for url, result in fetcher.fetch_many(args.urls).items():
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"  failed   {url}: {result}")
+        else:
+            print(f"  {result.from_cache or 'download':<11} {len(result.content):>9} bytes  {url}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
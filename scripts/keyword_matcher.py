@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Multi-keyword matching for the school rule tables.
+
+The enrichment rules (Casper and PREview lists, MD/PhD programs, TMDSAS
+schools) match a school when one of their names appears in the school's
+name. Checking every rule name against every school is O(rules) substring
+searches per school; KeywordMatcher compiles all names of a table into one
+Aho-Corasick automaton instead, so a single scan over a school name finds
+every rule it contains, however many rules there are.
+
+Names are compared case-insensitively, as plain substrings (the same test as
+`rule.lower() in school_name.lower()`).
+
+Usage:
+    from keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher([("Baylor College of Medicine", "TMDSAS"), ...])
+    matcher.find("Baylor College of Medicine")   # [("Baylor College of Medicine", "TMDSAS")]
+
+    python3 scripts/keyword_matcher.py   # list schools matched by more than one rule
+"""
+
+import bisect
+import sys
+from collections import deque
+
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT
+from enrichment import Table
+
+# Joins keywords for within(); never appears in a school name
+_SEPARATOR = '\0'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a table of keywords.
+
+    Args:
+        keywords: Iterable of (keyword, value) pairs
+    """
+
+    def __init__(self, keywords):
+        self._keywords = list(keywords)  # (keyword, value), in the order given
+
+        # Trie of the lowercased keywords; outputs[node] lists the keywords
+        # (by position) that end at node or at any node on its failure chain
+        self._goto = [{}]
+        outputs = [[]]
+        for position, (keyword, _) in enumerate(self._keywords):
+            node = 0
+            for char in keyword.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(position)
+
+        # Breadth-first failure links
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                outputs[child].extend(outputs[self._fail[child]])
+        self._outputs = [tuple(output) for output in outputs]
+
+        # All keywords in one string, for within()
+        lowered = [keyword.lower() for keyword, _ in self._keywords]
+        self._blob = _SEPARATOR.join(lowered)
+        self._starts = []
+        offset = 0
+        for keyword in lowered:
+            self._starts.append(offset)
+            offset += len(keyword) + len(_SEPARATOR)
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def _positions(self, text):
+        """Positions of the keywords occurring in text, in one pass over it."""
+        found = set()
+        node = 0
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+    def find(self, text):
+        """
+        Find the keywords that occur in a text.
+
+        Returns:
+            List of (keyword, value), in the order the keywords were given
+        """
+        return [self._keywords[position] for position in sorted(self._positions(text))]
+
+    def within(self, text):
+        """
+        Find the keywords that contain a text (the reverse of find()).
+
+        Searches all keywords at once with str.find over a single joined
+        string instead of testing each keyword in turn.
+
+        Returns:
+            List of (keyword, value), in the order the keywords were given
+        """
+        needle = text.lower()
+        if _SEPARATOR in needle or not self._keywords:
+            return []
+        found = []
+        start = self._blob.find(needle)
+        while start != -1:
+            position = bisect.bisect_right(self._starts, start) - 1
+            found.append(self._keywords[position])
+            if position + 1 == len(self._starts):
+                break
+            start = self._blob.find(needle, self._starts[position + 1])
+        return found
+
+
+def rule_matchers():
+    """
+    The matchers of the enrichment scripts.
+
+    Returns:
+        List of (rule table name, KeywordMatcher)
+    """
+    if REPO_ROOT not in sys.path:
+        sys.path.append(REPO_ROOT)
+    from add_casper_requirements import CASPER_MATCHER
+    from add_mdphd_programs import MDPHD_MATCHER
+    from add_preview_requirements import PREVIEW_MATCHER
+    from update_application_systems import APPLICATION_SYSTEM_MATCHER
+
+    return [
+        ('Casper', CASPER_MATCHER),
+        ('PREview', PREVIEW_MATCHER),
+        ('MD/PhD', MDPHD_MATCHER),
+        ('Application System', APPLICATION_SYSTEM_MATCHER),
+    ]
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV_PATH
+    names = Table.read(csv_path)['Medical School Name']
+
+    ambiguous = 0
+    for table_name, matcher in rule_matchers():
+        for name in names:
+            matches = matcher.find(name)
+            if len(matches) < 2:
+                continue
+            ambiguous += 1
+            conflict = len({value for _, value in matches}) > 1
+            print(f"[{table_name}] {name}{' (conflicting values)' if conflict else ''}")
+            for keyword, value in matches:
+                print(f"    {keyword!r} -> {value}")
+    print(f"{ambiguous} schools matched by more than one rule")
+
+
+if __name__ == '__main__':
+    main()
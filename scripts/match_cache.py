@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of school-name match decisions.
+
+The enrichment scripts (scrape_aamc_data.py, scrape_accepted_data.py,
+enhance_aamc_data.py) map each source's school names onto the names in our
+CSV. Source names rarely change between cycles, so every decision is stored
+in a SQLite file keyed by (source, raw name), with the chosen school, its
+score and how it was made:
+
+- exact / key / alias: resolved by SchoolResolver lookups
+- fuzzy: picked by fuzzy scoring
+- manual: set by a person with the override command
+
+Re-runs apply the stored decisions first and only score names they haven't
+seen. Decisions whose school is no longer in the CSV are ignored and made
+again. Manual decisions are never replaced by automatic ones, and a manual
+decision without a school keeps a source name from matching at all.
+
+Usage:
+    python3 scripts/match_cache.py list --source accepted
+    python3 scripts/match_cache.py review --below 80
+    python3 scripts/match_cache.py override accepted "Penn State" "Pennsylvania State University College of Medicine"
+    python3 scripts/match_cache.py override accepted "Some Program" --no-match
+    python3 scripts/match_cache.py forget accepted "Penn State"
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from dataset_snapshot import SNAPSHOT_DIR
+
+MATCH_DB_PATH = os.path.join(SNAPSHOT_DIR, 'match_decisions.sqlite3')
+
+MANUAL = 'manual'
+
+# Fuzzy decisions scoring below this are listed by the review command
+REVIEW_THRESHOLD = 80
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    source TEXT NOT NULL,
+    raw_name TEXT NOT NULL,
+    school_name TEXT,        -- NULL: the source name matches no school
+    score REAL,
+    method TEXT NOT NULL,
+    decided_at REAL NOT NULL,
+    PRIMARY KEY (source, raw_name)
+);
+"""
+
+Decision = namedtuple('Decision', ['school_name', 'score', 'method', 'decided_at'])
+
+
+class MatchCache:
+    """
+    Match decisions for one data source.
+
+    Args:
+        source: Name of the data source (e.g. 'aamc', 'accepted')
+        path: SQLite file holding the decisions
+    """
+
+    def __init__(self, source, path=MATCH_DB_PATH):
+        self.source = source
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def decisions(self):
+        """
+        Load every decision for this source.
+
+        Returns:
+            Dictionary mapping raw name to Decision
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT raw_name, school_name, score, method, decided_at FROM decisions "
+                "WHERE source = ?", (self.source,)
+            ).fetchall()
+        return {raw_name: Decision(*rest) for raw_name, *rest in rows}
+
+    def applicable(self, school_names):
+        """
+        Load the decisions that still apply to the current dataset.
+
+        Args:
+            school_names: Names of the schools in the CSV
+
+        Returns:
+            Dictionary mapping raw name to Decision. Decisions pointing at a
+            school that is no longer in the CSV are left out, except manual
+            no-match decisions.
+        """
+        school_names = set(school_names)
+        return {
+            raw_name: decision for raw_name, decision in self.decisions().items()
+            if decision.school_name in school_names
+            or (decision.school_name is None and decision.method == MANUAL)
+        }
+
+    def record(self, decisions):
+        """
+        Store automatic decisions, leaving manual ones in place.
+
+        Args:
+            decisions: Iterable of (raw_name, school_name, score, method)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO decisions (source, raw_name, school_name, score, method, decided_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, raw_name) DO UPDATE SET "
+                "school_name = excluded.school_name, score = excluded.score, "
+                "method = excluded.method, decided_at = excluded.decided_at "
+                "WHERE decisions.method != 'manual'",
+                [(self.source, raw_name, school_name, score, method, now)
+                 for raw_name, school_name, score, method in decisions]
+            )
+
+    def override(self, raw_name, school_name):
+        """Set a manual decision (school_name None means no match)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO decisions "
+                "(source, raw_name, school_name, score, method, decided_at) "
+                "VALUES (?, ?, ?, NULL, ?, ?)",
+                (self.source, raw_name, school_name, MANUAL, time.time())
+            )
+
+    def forget(self, raw_name):
+        """Drop a decision so the next run makes it again. Returns True if one existed."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM decisions WHERE source = ? AND raw_name = ?", (self.source, raw_name)
+            )
+        return cursor.rowcount > 0
+
+
+def _all_decisions(path, source=None):
+    """Yield (source, raw_name, Decision) for every decision, optionally for one source."""
+    if not os.path.exists(path):
+        return
+    conn = sqlite3.connect(path)
+    try:
+        query = "SELECT source, raw_name, school_name, score, method, decided_at FROM decisions"
+        params = ()
+        if source:
+            query += " WHERE source = ?"
+            params = (source,)
+        for row_source, raw_name, *rest in conn.execute(query + " ORDER BY source, raw_name", params):
+            yield row_source, raw_name, Decision(*rest)
+    finally:
+        conn.close()
+
+
+def _print_decision(source, raw_name, decision):
+    score = '  -' if decision.score is None else f"{decision.score:3.0f}"
+    target = decision.school_name or '(no match)'
+    print(f"  [{source}] {score} {decision.method:<6} {raw_name} -> {target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Review and override school match decisions')
+    parser.add_argument('--db', default=MATCH_DB_PATH, help='Decision database file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help='List decisions')
+    list_parser.add_argument('--source', help='Only this data source')
+
+    review_parser = commands.add_parser('review', help='List low-confidence fuzzy decisions')
+    review_parser.add_argument('--source', help='Only this data source')
+    review_parser.add_argument('--below', type=float, default=REVIEW_THRESHOLD,
+                               help=f'Score threshold (default: {REVIEW_THRESHOLD})')
+
+    override_parser = commands.add_parser('override', help='Set a manual decision')
+    override_parser.add_argument('source')
+    override_parser.add_argument('raw_name', help='School name as spelled by the source')
+    override_parser.add_argument('school_name', nargs='?', help='Medical School Name in our CSV')
+    override_parser.add_argument('--no-match', action='store_true',
+                                 help='The source name matches no school')
+
+    forget_parser = commands.add_parser('forget', help='Drop a decision')
+    forget_parser.add_argument('source')
+    forget_parser.add_argument('raw_name')
+
+    args = parser.parse_args()
+
+    if args.command in ('list', 'review'):
+        count = 0
+        for source, raw_name, decision in _all_decisions(args.db, args.source):
+            if args.command == 'review' and not (
+                    decision.method == 'fuzzy' and (decision.score or 0) < args.below):
+                continue
+            _print_decision(source, raw_name, decision)
+            count += 1
+        print(f"{count} decisions")
+        return
+
+    cache = MatchCache(args.source, args.db)
+    if args.command == 'override':
+        if bool(args.school_name) == args.no_match:
+            parser.error('override needs either a school name or --no-match')
+        cache.override(args.raw_name, args.school_name)
+        print(f"Saved: {args.raw_name} -> {args.school_name or '(no match)'}")
+    elif args.command == 'forget':
+        if not cache.forget(args.raw_name):
+            print(f"Error: no decision for {args.raw_name!r} in {args.source}")
+            sys.exit(1)
+        print(f"Forgot: {args.raw_name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Incremental build pipeline for the medical schools dataset.
+
+The dataset is built by scripts that each add or refresh some columns. This
+runner declares them as stages with explicit input and output files:
+
+    [scrape] --> base CSV --> enrich --> output/pipeline/medical_schools_data.csv
+
+enrich applies every enricher (application systems, MD/PhD, website URLs,
+Casper, PREview and, with --facts, matriculation) in one pass over the CSV;
+see enrichment.py.
+
+- A stage's fingerprint is the SHA-256 of its input files, including the
+  scripts it runs, so nothing re-runs unless a school list, the base CSV or
+  the FACTS spreadsheet changed.
+- scrape reads a web page, which no local file can fingerprint, so it runs
+  every time. That is cheap: http_fetch revalidates its cached copy of the
+  page with a conditional request, and if the scraped CSV comes out
+  identical, enrich is still skipped.
+- Stages whose fingerprint and outputs haven't changed are skipped. A stage
+  that re-runs but writes identical output doesn't re-run the stages after it.
+- Stages start as soon as their inputs are ready, independent ones in
+  parallel.
+- Outputs are written to a temporary file and renamed into place, so an
+  interrupted run never leaves a half-written CSV.
+- enrich keeps every column it doesn't compute (including hand-maintained
+  ones) as it is. Empty enricher values don't replace values already in the
+  CSV.
+
+Stage fingerprints are kept in output/pipeline/state.json.
+
+Usage:
+    python3 scripts/pipeline.py                # build output/pipeline/medical_schools_data.csv
+    python3 scripts/pipeline.py --dry-run      # show which stages would run
+    python3 scripts/pipeline.py --publish      # then replace public/medical_schools_data.csv
+    python3 scripts/pipeline.py --facts ~/Downloads/2025_FACTS_Table_A-1.xlsx
+    python3 scripts/pipeline.py --scrape       # start from a fresh scrape instead of the CSV
+    python3 scripts/pipeline.py --force enrich
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dataset_snapshot import DEFAULT_CSV_PATH, REPO_ROOT, SNAPSHOT_DIR, file_sha256
+from enrichment import ENRICHER_SOURCES, default_enrichers, enrich_csv
+from school_aliases import ALIAS_SOURCES
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORK_DIR = os.path.join(SNAPSHOT_DIR, 'pipeline')
+STATE_PATH = os.path.join(WORK_DIR, 'state.json')
+
+# Bump to re-run every stage after changing how stages are run
+PIPELINE_VERSION = 2
+
+Stage = namedtuple('Stage', ['name', 'inputs', 'outputs', 'run', 'remote'], defaults=(False,))
+Stage.__doc__ = """
+A pipeline step.
+
+Fields:
+    name: Stage name
+    inputs: Files the stage reads, including its own scripts
+    outputs: Files the stage writes
+    run: Callable run(inputs, outputs); outputs are temporary paths that are
+        renamed into place once it returns
+    remote: The stage also reads remote data its inputs don't capture, so
+        it runs every time (default False)
+"""
+
+
+def _script(name):
+    return os.path.join(SCRIPTS_DIR, name)
+
+
+def _work(name):
+    return os.path.join(WORK_DIR, name)
+
+
+# Scripts behind SchoolResolver; stages that match names depend on all of them
+RESOLVER_SOURCES = [_script('school_resolver.py'), _script('school_aliases.py')] + [
+    os.path.join(REPO_ROOT, path) for path, _ in ALIAS_SOURCES
+]
+
+
+def _relative(path):
+    return os.path.relpath(path, REPO_ROOT)
+
+
+def _run_scrape(inputs, outputs):
+    from scrape_medical_schools import save_to_csv
+    from shemmassian_table import SHEMMASSIAN_URL, scrape_school_records
+    # max_age=0: always revalidate the cached page (a 304 when it hasn't changed)
+    records = scrape_school_records(SHEMMASSIAN_URL, max_age=0)
+    save_to_csv([record.as_row() for record in records], outputs[0])
+
+
+def build_stages(base_csv=DEFAULT_CSV_PATH, facts_path=None, scrape=False):
+    """
+    Declare the pipeline.
+
+    Args:
+        base_csv: CSV the enrich stage starts from
+        facts_path: AAMC FACTS Table A-1 spreadsheet; matriculation data is
+            only added when it is given
+        scrape: Start from a fresh scrape of the schools page instead of base_csv
+
+    Returns:
+        List of Stages, each after the stages it depends on
+    """
+    stages = []
+    if scrape:
+        scraped = _work('scraped_schools.csv')
+        stages.append(Stage(
+            'scrape', [_script('scrape_medical_schools.py'), _script('shemmassian_table.py'), _script('http_fetch.py')],
+            [scraped], _run_scrape, remote=True
+        ))
+        base_csv = scraped
+
+    scripts = [os.path.join(REPO_ROOT, path) for path in ENRICHER_SOURCES]
+    scripts += [_script('enrichment.py'), *RESOLVER_SOURCES, _script('pipeline.py')]
+    extra_inputs = []
+    if facts_path:
+        extra_inputs = [facts_path, _script('update_matriculation_data.py')]
+
+    def run_enrich(inputs, outputs):
+        enrich_csv(inputs[0], outputs[0], default_enrichers(facts_path))
+
+    stages.append(Stage(
+        'enrich', [base_csv, *extra_inputs, *scripts],
+        [_work('medical_schools_data.csv')], run_enrich
+    ))
+    return stages
+
+
+def fingerprint(stage):
+    """SHA-256 over the stage name and the content of each of its inputs."""
+    digest = hashlib.sha256(f'{PIPELINE_VERSION}:{stage.name}'.encode())
+    for path in stage.inputs:
+        digest.update(f'\0{_relative(path)}\0{file_sha256(path)}'.encode())
+    return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order, skipping those whose inputs are unchanged.
+
+    Args:
+        stages: Output of build_stages()
+        state_path: JSON file with the fingerprint and output hashes of each
+            stage's last successful run
+    """
+
+    def __init__(self, stages, state_path=STATE_PATH):
+        self.stages = stages
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+        producers = {}
+        for stage in stages:
+            for path in stage.outputs:
+                producers[path] = stage.name
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if path in producers}
+            for stage in stages
+        }
+
+    def _is_current(self, stage, stage_fingerprint):
+        recorded = self.state.get(stage.name)
+        if not recorded or recorded.get('fingerprint') != stage_fingerprint:
+            return False
+        outputs = recorded.get('outputs', {})
+        for path in stage.outputs:
+            if not os.path.exists(path) or file_sha256(path) != outputs.get(_relative(path)):
+                return False
+        return True
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f'{self.state_path}.{os.getpid()}.part'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _execute(self, stage, force):
+        """Run one stage unless it is current. Returns True if it ran."""
+        missing = [path for path in stage.inputs if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"missing input: {', '.join(_relative(path) for path in missing)}")
+        stage_fingerprint = fingerprint(stage)
+        if not force and not stage.remote and self._is_current(stage, stage_fingerprint):
+            return False
+
+        for path in stage.outputs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_paths = [f'{path}.{os.getpid()}.part' for path in stage.outputs]
+        try:
+            stage.run(list(stage.inputs), tmp_paths)
+            for tmp_path, path in zip(tmp_paths, stage.outputs):
+                os.replace(tmp_path, path)
+        finally:
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        with self._lock:
+            self.state[stage.name] = {
+                'fingerprint': stage_fingerprint,
+                'outputs': {_relative(path): file_sha256(path) for path in stage.outputs},
+                'finished_at': time.time()
+            }
+            self._save_state()
+        return True
+
+    def plan(self, force=()):
+        """
+        Work out which stages would run, without running anything.
+
+        Returns:
+            List of (stage name, reason), where reason is None for stages that
+            would be skipped
+        """
+        pending = set()
+        plan = []
+        for stage in self.stages:
+            reason = None
+            if stage.name in force:
+                reason = 'forced'
+            elif any(not os.path.exists(path) for path in stage.inputs if path not in self._outputs()):
+                reason = 'missing input'
+            elif stage.remote:
+                reason = 'remote input'
+            elif self.dependencies[stage.name] & pending:
+                reason = 'if upstream output changes'
+            elif not self._is_current(stage, fingerprint(stage)):
+                reason = 'inputs changed'
+            if reason:
+                pending.add(stage.name)
+            plan.append((stage.name, reason))
+        return plan
+
+    def _outputs(self):
+        return {path for stage in self.stages for path in stage.outputs}
+
+    def run(self, force=(), jobs=4):
+        """
+        Run the pipeline.
+
+        Args:
+            force: Names of stages to run even if they are current
+            jobs: Maximum number of stages running at once
+
+        Returns:
+            Dictionary mapping stage name to 'ran', 'skipped', 'failed' or
+            'blocked' (not run because a stage it depends on failed)
+        """
+        results = {}
+        remaining = list(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while remaining or running:
+                for stage in list(remaining):
+                    dependencies = self.dependencies[stage.name]
+                    if any(results.get(name) in ('failed', 'blocked') for name in dependencies):
+                        results[stage.name] = 'blocked'
+                        remaining.remove(stage)
+                        print(f"  blocked {stage.name}")
+                    elif all(name in results for name in dependencies):
+                        remaining.remove(stage)
+                        started = time.perf_counter()
+                        future = executor.submit(self._execute, stage, stage.name in force)
+                        running[future] = (stage, started)
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, started = running.pop(future)
+                    elapsed = time.perf_counter() - started
+                    try:
+                        ran = future.result()
+                    except Exception as e:
+                        results[stage.name] = 'failed'
+                        print(f"  failed  {stage.name}: {e}")
+                        continue
+                    results[stage.name] = 'ran' if ran else 'skipped'
+                    if ran:
+                        print(f"  ran     {stage.name} ({elapsed:.2f}s)")
+                    else:
+                        print(f"  skipped {stage.name} (unchanged)")
+        return results
+
+
+def publish(source_path, target_path):
+    """Atomically replace target_path with source_path. Returns False if they are identical."""
+    if os.path.exists(target_path) and file_sha256(source_path) == file_sha256(target_path):
+        return False
+    tmp_path = f'{target_path}.{os.getpid()}.part'
+    shutil.copyfile(source_path, tmp_path)
+    os.replace(tmp_path, target_path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally build the medical schools dataset')
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='Base CSV (and --publish target)')
+    parser.add_argument('--facts', help='AAMC FACTS Table A-1 spreadsheet for matriculation data')
+    parser.add_argument('--scrape', action='store_true',
+                        help='Start from a fresh scrape instead of the base CSV')
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help="Run these stages even if unchanged ('all' for every stage)")
+    parser.add_argument('--jobs', type=int, default=4, help='Stages to run in parallel')
+    parser.add_argument('--dry-run', action='store_true', help='Only show which stages would run')
+    parser.add_argument('--publish', action='store_true', help='Replace the base CSV with the result')
+    args = parser.parse_args()
+
+    stages = build_stages(args.csv, facts_path=args.facts, scrape=args.scrape)
+    names = [stage.name for stage in stages]
+    force = set(names) if 'all' in args.force else set(args.force)
+    unknown = force - set(names)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))} (stages: {', '.join(names)})")
+
+    pipeline = Pipeline(stages)
+    if args.dry_run:
+        for name, reason in pipeline.plan(force):
+            print(f"  {'run' if reason else 'skip':<4} {name}" + (f" ({reason})" if reason else ''))
+        return
+
+    started = time.perf_counter()
+    results = pipeline.run(force=force, jobs=max(1, args.jobs))
+    ran = sum(1 for result in results.values() if result == 'ran')
+    print(f"{ran} of {len(stages)} stages ran in {time.perf_counter() - started:.2f}s")
+    if any(result in ('failed', 'blocked') for result in results.values()):
+        sys.exit(1)
+
+    output = stages[-1].outputs[0]
+    print(f"Dataset: {_relative(output)}")
+    if args.publish:
+        if publish(output, args.csv):
+            print(f"Published to {_relative(args.csv)}")
+        else:
+            print(f"{_relative(args.csv)} is already up to date")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Collect the school-name alias tables that are hardcoded across the repo.
+
+Several scripts carry their own name mappings (SCHOOL_MAPPING in
+update_matriculation_data.py, manual_matches in manual_matches.py, and the
+NAME_REPLACEMENTS in the Casper/PREview scripts). This module reads those
+dict literals straight from the source files with ast, so the tables can be
+reused without importing the scripts (and their pandas/requests
+dependencies) or copying them.
+
+Usage:
+    python3 scripts/school_aliases.py
+"""
+
+import ast
+import os
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# (file relative to the repo root, dict variable name)
+ALIAS_SOURCES = [
+    ('scripts/update_matriculation_data.py', 'SCHOOL_MAPPING'),
+    ('manual_matches.py', 'manual_matches'),
+    ('scripts/add_casper_requirements.py', 'NAME_REPLACEMENTS'),
+    ('scripts/add_preview_requirements.py', 'NAME_REPLACEMENTS'),
+]
+
+
+def read_dict_literal(path, variable):
+    """
+    Find a dict literal assigned to a variable anywhere in a Python file.
+
+    Args:
+        path: Python source file
+        variable: Name the dict is assigned to (module level or inside a function)
+
+    Returns:
+        The dict, or an empty dict if the file or assignment doesn't exist
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign) or not isinstance(node.value, ast.Dict):
+            continue
+        if any(isinstance(target, ast.Name) and target.id == variable for target in node.targets):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                return {}
+    return {}
+
+
+def load_alias_pairs(root=REPO_ROOT, sources=ALIAS_SOURCES):
+    """
+    Read every alias table as pairs of names that refer to the same school.
+
+    Tuple values (as in manual_matches) use their first element as the name.
+
+    Returns:
+        List of (name, other_name) pairs, in source order
+    """
+    pairs = []
+    for relative_path, variable in sources:
+        table = read_dict_literal(os.path.join(root, relative_path), variable)
+        for key, value in table.items():
+            if isinstance(value, tuple):
+                value = value[0] if value else None
+            if isinstance(key, str) and isinstance(value, str) and key != value:
+                pairs.append((key, value))
+    return pairs
+
+
+if __name__ == '__main__':
+    for relative_path, variable in ALIAS_SOURCES:
+        table = read_dict_literal(os.path.join(REPO_ROOT, relative_path), variable)
+        print(f"{relative_path} {variable}: {len(table)} entries")
+    print(f"Total alias pairs: {len(load_alias_pairs())}")
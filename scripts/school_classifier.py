@@ -9,7 +9,10 @@ https://www.shemmassianconsulting.com/blog/how-many-medical-schools-should-i-app
 
 import csv
 import json
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
+
+from dataset_snapshot import open_for_csv
+from school_db import open_database
 
 
 class SchoolClassifier:
@@ -231,6 +234,43 @@ class SchoolClassifier:
             'mcat_diff': user_mcat - school_mcat
         }
 
+    def read_schools(self, csv_path: str, filters: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Read school rows, from the SQLite database or binary snapshot when
+        one is up to date.
+
+        The database answers the filters with an indexed query; the snapshot
+        answers the degree type, state and application system filters from
+        its prebuilt indexes. Either way only matching rows are read.
+        Otherwise every CSV row is returned and the caller filters them.
+
+        Args:
+            csv_path: Path to medical schools CSV
+            filters: Additional filters (degree type, etc.)
+
+        Returns:
+            Iterator of CSV-style row dictionaries
+        """
+        database = open_database(csv_path)
+        if database is not None:
+            keys = ('degree_type', 'state', 'app_system')
+            yield from database.rows({key: filters.get(key) for key in keys} if filters else None)
+            return
+
+        snapshot = open_for_csv(csv_path)
+        if snapshot is None:
+            with open(csv_path, 'r', encoding='utf-8') as f:
+                yield from csv.DictReader(f)
+            return
+
+        row_ids = None
+        for column, key in (('Degree Type', 'degree_type'), ('State', 'state'),
+                            ('Application System', 'app_system')):
+            if filters and filters.get(key):
+                matches = set(snapshot.lookup(column, filters[key]))
+                row_ids = matches if row_ids is None else row_ids & matches
+        yield from snapshot.iter_rows(None if row_ids is None else sorted(row_ids))
+
     def classify_all_schools(
         self,
         user_gpa: float,
@@ -254,21 +294,18 @@ class SchoolClassifier:
         """
         schools = []
 
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-
-            for school in reader:
-                # Apply filters if provided
-                if filters:
-                    if filters.get('degree_type') and school['Degree Type'] != filters['degree_type']:
-                        continue
-                    if filters.get('state') and school['State'] != filters['state']:
-                        continue
-                    if filters.get('app_system') and school['Application System'] != filters['app_system']:
-                        continue
-
-                classification = self.classify_school(user_gpa, user_mcat, school, user_state)
-                schools.append(classification)
+        for school in self.read_schools(csv_path, filters):
+            # Apply filters if provided
+            if filters:
+                if filters.get('degree_type') and school['Degree Type'] != filters['degree_type']:
+                    continue
+                if filters.get('state') and school['State'] != filters['state']:
+                    continue
+                if filters.get('app_system') and school['Application System'] != filters['app_system']:
+                    continue
+
+            classification = self.classify_school(user_gpa, user_mcat, school, user_state)
+            schools.append(classification)
 
         # Categorize results
         reach_schools = [s for s in schools if s['classification'] == 'Reach']
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+SQLite storage engine for the medical schools dataset.
+
+The CSV stays the source of truth and the import format. This script loads it
+into an embedded SQLite database so queries use indexes instead of scanning
+every row:
+
+- a schools table with the filter columns (state, degree type, application
+  system, public status, MD/PhD), the parsed average GPA and MCAT, and the
+  full CSV row
+- indexes on each filter column and on the numeric GPA / MCAT columns
+- an FTS5 table over school names for word and prefix search
+
+Filters use the same keys as SchoolClassifier (state, degree_type,
+app_system) plus the /api/schools ones (public, mdphd, min/max GPA and MCAT,
+name), and are translated into a parameterized WHERE clause. Rows are
+streamed from the cursor, so memory stays flat however large the dataset is.
+
+Like the binary snapshot, the database records the size, mtime and SHA-256 of
+its source CSV, and readers ignore it once the CSV has changed.
+
+Usage:
+    python3 scripts/school_db.py build
+    python3 scripts/school_db.py build --csv public/medical_schools_data.csv
+    python3 scripts/school_db.py info
+    python3 scripts/school_db.py query --state CA --degree MD --min-gpa 3.7
+    python3 scripts/school_db.py query --name "univ california" --explain
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from dataset_snapshot import (
+    DEFAULT_CSV_PATH, SNAPSHOT_DIR, parse_gpa, parse_mcat, source_info, source_is_current
+)
+
+FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE schools (
+    id INTEGER PRIMARY KEY,  -- CSV row number from 1, same as the API's school IDs
+    name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    degree_type TEXT NOT NULL,
+    app_system TEXT NOT NULL,
+    is_public INTEGER NOT NULL,
+    has_mdphd INTEGER NOT NULL,
+    gpa REAL NOT NULL,       -- 0 when not reported
+    mcat INTEGER NOT NULL,   -- 0 when not reported
+    row TEXT NOT NULL        -- every CSV column, as a JSON object
+);
+CREATE INDEX schools_state ON schools (state);
+CREATE INDEX schools_degree_type ON schools (degree_type);
+CREATE INDEX schools_app_system ON schools (app_system);
+CREATE INDEX schools_is_public ON schools (is_public);
+CREATE INDEX schools_has_mdphd ON schools (has_mdphd);
+CREATE INDEX schools_gpa ON schools (gpa, mcat);
+CREATE INDEX schools_mcat ON schools (mcat);
+CREATE VIRTUAL TABLE school_names USING fts5(name, content='schools', content_rowid='id');
+"""
+
+# Filter key -> (SQL condition, conversion of the filter value)
+FILTER_CLAUSES = {
+    'state': ('state = ?', str),
+    'degree_type': ('degree_type = ?', str),
+    'app_system': ('app_system = ?', str),
+    'public': ('is_public = ?', int),
+    'mdphd': ('has_mdphd = ?', int),
+    'min_gpa': ('gpa >= ?', float),
+    'max_gpa': ('gpa <= ?', float),
+    'min_mcat': ('mcat >= ?', int),
+    'max_mcat': ('mcat <= ?', int),
+}
+
+_NAME_TOKEN = re.compile(r'\w+')
+
+
+def database_path_for(csv_path):
+    """Default database location for a CSV file (output/<name>.sqlite3)."""
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(SNAPSHOT_DIR, f'{name}.sqlite3')
+
+
+def build_database(csv_path=DEFAULT_CSV_PATH, db_path=None):
+    """
+    Import a CSV into a new database file.
+
+    The database is written to a temporary name and renamed into place, so
+    readers never see a partial import.
+
+    Returns:
+        Number of schools imported
+    """
+    if db_path is None:
+        db_path = database_path_for(csv_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    tmp_path = f'{db_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    source = source_info(csv_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            conn.executemany(
+                'INSERT INTO schools (id, name, state, degree_type, app_system, is_public, has_mdphd, '
+                'gpa, mcat, row) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (_school_values(row_id, row) for row_id, row in enumerate(reader, 1))
+            )
+            fieldnames = list(reader.fieldnames or [])
+        conn.execute("INSERT INTO school_names (school_names) VALUES ('rebuild')")
+
+        count = conn.execute('SELECT COUNT(*) FROM schools').fetchone()[0]
+        meta = {
+            'formatVersion': FORMAT_VERSION,
+            'builtAt': time.time(),
+            'rows': count,
+            'source': source,
+            'fieldnames': fieldnames
+        }
+        conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)',
+                         [(key, json.dumps(value)) for key, value in meta.items()])
+        conn.commit()
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return count
+
+
+def _school_values(row_id, row):
+    return (
+        row_id,
+        row.get('Medical School Name') or '',
+        row.get('State') or '',
+        row.get('Degree Type') or '',
+        row.get('Application System') or '',
+        row.get('Public School Status') == 'Public',
+        row.get('MD/PhD Program') == 'Yes',  # Not in every export
+        parse_gpa(row.get('Average GPA')),
+        parse_mcat(row.get('Average MCAT')),
+        json.dumps(row, ensure_ascii=False)
+    )
+
+
+def name_query(text):
+    """FTS5 query matching names with every word of text as a word prefix."""
+    return ' '.join(f'"{token}"*' for token in _NAME_TOKEN.findall(text.lower()))
+
+
+def where_clause(filters):
+    """
+    Translate filters into a SQL WHERE clause.
+
+    Args:
+        filters: Dict of filter key -> value (see FILTER_CLAUSES, plus 'name'
+            for a name search). None and '' values are ignored.
+
+    Returns:
+        Tuple of (clause starting with ' WHERE', or '', and its parameters)
+
+    Raises:
+        KeyError: For an unknown filter key
+    """
+    conditions = []
+    params = []
+    for key, value in (filters or {}).items():
+        if value is None or value == '':
+            continue
+        if key == 'name':
+            query = name_query(value)
+            if not query:
+                continue
+            conditions.append('id IN (SELECT rowid FROM school_names WHERE school_names MATCH ?)')
+            params.append(query)
+            continue
+        condition, convert = FILTER_CLAUSES[key]
+        conditions.append(condition)
+        params.append(convert(value))
+    if not conditions:
+        return '', []
+    return ' WHERE ' + ' AND '.join(conditions), params
+
+
+class SchoolDatabase:
+    """
+    Read-only queries over a database built by build_database().
+
+    Each thread gets its own connection, so one instance can be shared by
+    a threaded server.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        rows = self._connection().execute('SELECT key, value FROM meta').fetchall()
+        self.meta = {key: json.loads(value) for key, value in rows}
+        if self.meta.get('formatVersion') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported database format: {self.meta.get("formatVersion")}')
+        self.version = self.meta['source']['sha256'][:12]
+        self.fieldnames = self.meta['fieldnames']
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            uri = 'file:' + os.path.abspath(self.path) + '?mode=ro'
+            conn = self._local.conn = sqlite3.connect(uri, uri=True)
+        return conn
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def is_fresh(self, csv_path):
+        """Check whether the database was built from the current CSV contents."""
+        return source_is_current(self.meta['source'], csv_path)
+
+    def _select(self, columns, filters):
+        where, params = where_clause(filters)
+        return f'SELECT {columns} FROM schools{where} ORDER BY id', params
+
+    def select_ids(self, filters=None):
+        """Iterate the IDs of the schools matching filters."""
+        sql, params = self._select('id', filters)
+        for (school_id,) in self._connection().execute(sql, params):
+            yield school_id
+
+    def rows(self, filters=None):
+        """Iterate the CSV-style row dicts of the schools matching filters."""
+        sql, params = self._select('row', filters)
+        for (row,) in self._connection().execute(sql, params):
+            yield json.loads(row)
+
+    def count(self, filters=None):
+        """Count the schools matching filters."""
+        where, params = where_clause(filters)
+        return self._connection().execute(f'SELECT COUNT(*) FROM schools{where}', params).fetchone()[0]
+
+    def search_names(self, text, limit=10):
+        """
+        Find schools whose names contain every word of text (as a word prefix).
+
+        Returns:
+            List of (id, name) pairs, best match first
+        """
+        query = name_query(text)
+        if not query:
+            return []
+        return self._connection().execute(
+            'SELECT rowid, name FROM school_names WHERE school_names MATCH ? ORDER BY rank LIMIT ?',
+            (query, limit)
+        ).fetchall()
+
+    def explain(self, filters=None):
+        """Return SQLite's query plan for a filtered query, one step per line."""
+        sql, params = self._select('id', filters)
+        return [row[-1] for row in self._connection().execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def open_database(csv_path, db_path=None):
+    """
+    Open the database for a CSV if there is an up-to-date one.
+
+    Returns:
+        SchoolDatabase, or None if the caller should read the CSV instead
+    """
+    if db_path is None:
+        db_path = database_path_for(csv_path)
+    if not os.path.exists(db_path):
+        return None
+    try:
+        database = SchoolDatabase(db_path)
+    except (sqlite3.Error, KeyError, ValueError):
+        return None
+    if not database.is_fresh(csv_path):
+        return None
+    return database
+
+
+def ensure_database(csv_path, db_path=None):
+    """Open the database for a CSV, importing the CSV first if needed."""
+    database = open_database(csv_path, db_path)
+    if database is None:
+        build_database(csv_path, db_path)
+        database = SchoolDatabase(db_path or database_path_for(csv_path))
+    return database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query the SQLite school database')
+    parser.add_argument('command', choices=['build', 'info', 'query'])
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='Source CSV file')
+    parser.add_argument('--db', help='Database file (default: output/<csv name>.sqlite3)')
+    parser.add_argument('--state', help='Filter by state code')
+    parser.add_argument('--degree', help='Filter by degree type (MD or DO)')
+    parser.add_argument('--app-system', help='Filter by application system')
+    parser.add_argument('--min-gpa', type=float)
+    parser.add_argument('--max-gpa', type=float)
+    parser.add_argument('--min-mcat', type=int)
+    parser.add_argument('--max-mcat', type=int)
+    parser.add_argument('--name', help='Words in the school name')
+    parser.add_argument('--explain', action='store_true', help='Print the query plan')
+    args = parser.parse_args()
+
+    db_path = args.db or database_path_for(args.csv)
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        count = build_database(args.csv, db_path)
+        elapsed = time.perf_counter() - started
+        print(f"Built {db_path}")
+        print(f"  Rows: {count}, {os.path.getsize(db_path):,} bytes in {elapsed:.2f}s")
+        return
+
+    if not os.path.exists(db_path):
+        print(f"Error: {db_path} not found (create it with: build)")
+        sys.exit(1)
+    database = SchoolDatabase(db_path)
+
+    if args.command == 'info':
+        source = database.meta['source']
+        print(f"Database: {db_path}")
+        print(f"  Rows: {len(database)}, version {database.version}")
+        print(f"  Source: {source['path']} ({source['size']:,} bytes, sha256 {source['sha256'][:12]})")
+        print(f"  Fresh: {'yes' if database.is_fresh(args.csv) else 'no (rebuild with: build)'}")
+        return
+
+    filters = {
+        'state': args.state and args.state.upper(),
+        'degree_type': args.degree and args.degree.upper(),
+        'app_system': args.app_system and args.app_system.upper(),
+        'min_gpa': args.min_gpa,
+        'max_gpa': args.max_gpa,
+        'min_mcat': args.min_mcat,
+        'max_mcat': args.max_mcat,
+        'name': args.name
+    }
+    if args.explain:
+        for step in database.explain(filters):
+            print(f"  plan: {step}")
+    count = 0
+    for row in database.rows(filters):
+        count += 1
+        print(f"{row['Medical School Name']} ({row['State']}, {row['Degree Type']}) "
+              f"GPA {row['Average GPA']}, MCAT {row['Average MCAT']}")
+    print(f"{count} schools")
+
+
+if __name__ == '__main__':
+    main()
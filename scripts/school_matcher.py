@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Candidate generation for fuzzy school-name matching.
+
+Scoring every name against every other name with fuzzy ratios is quadratic,
+which is fine for 200 schools but not for national program lists. Instead,
+CandidateIndex represents each name as a sparse TF-IDF vector of character
+trigrams, kept in an inverted index (trigram -> postings) per block (usually
+the state). A query only touches the postings of its own trigrams, and only
+the few most similar names are handed to the expensive fuzzy scorer.
+
+Rare trigrams ("ebb", "lark") weigh far more than common ones ("edi",
+"ine"), so misspellings and reordered words still rank the right school
+near the top.
+
+Usage:
+    from school_matcher import CandidateIndex, assign, match_names
+    from school_resolver import match_key
+
+    index = CandidateIndex((row_id, match_key(name), state) for ...)
+    for row_id, similarity in index.candidates(match_key(query), block=state):
+        ...
+    matches = assign(scored_pairs, min_score=60)
+
+    # Whole flow: cache, resolver, candidates, assignment
+    matches = match_names(schools, entries, score=fuzzy_score, cache=MatchCache('aamc'))
+"""
+
+import heapq
+import itertools
+import math
+from collections import Counter
+
+NGRAM_SIZE = 3
+
+# Candidates returned per query, and the cosine similarity they need
+DEFAULT_TOP_K = 10
+MIN_SIMILARITY = 0.1
+
+
+def char_ngrams(text, size=NGRAM_SIZE):
+    """Count the character n-grams of a text, padded with a space on each side."""
+    padded = f' {text} '
+    if len(padded) <= size:
+        return Counter([padded])
+    return Counter(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+class CandidateIndex:
+    """
+    Blocked TF-IDF trigram index for finding likely matches.
+
+    Args:
+        entries: Iterable of (entry_id, text) or (entry_id, text, block).
+            Text should already be normalized (see school_resolver.match_key).
+    """
+
+    def __init__(self, entries):
+        ngrams = {}    # entry id -> trigram counts
+        self._blocks = {}  # entry id -> block
+        document_frequency = Counter()
+        for entry in entries:
+            entry_id, text = entry[0], entry[1]
+            if entry_id in ngrams:
+                continue
+            ngrams[entry_id] = char_ngrams(text)
+            self._blocks[entry_id] = entry[2] if len(entry) > 2 else None
+            document_frequency.update(ngrams[entry_id].keys())
+
+        total = len(ngrams)
+        self._idf = {
+            gram: math.log((1 + total) / (1 + count)) + 1
+            for gram, count in document_frequency.items()
+        }
+
+        self._postings = {}        # trigram -> [(entry id, weight), ...]
+        self._block_postings = {}  # block -> trigram -> [(entry id, weight), ...]
+        for entry_id, grams in ngrams.items():
+            block_postings = self._block_postings.setdefault(self._blocks[entry_id], {})
+            for gram, weight in self._vector(grams).items():
+                self._postings.setdefault(gram, []).append((entry_id, weight))
+                block_postings.setdefault(gram, []).append((entry_id, weight))
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def _vector(self, grams):
+        """L2-normalized TF-IDF weights of trigrams seen in the index."""
+        vector = {gram: count * self._idf[gram] for gram, count in grams.items() if gram in self._idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            return {}
+        return {gram: weight / norm for gram, weight in vector.items()}
+
+    def candidates(self, text, block=None, k=DEFAULT_TOP_K, min_similarity=MIN_SIMILARITY,
+                   exclude=()):
+        """
+        Find the entries most similar to a text.
+
+        Args:
+            text: Normalized name to match
+            block: Only search entries in this block (None searches all)
+            k: Maximum number of candidates
+            min_similarity: Minimum cosine similarity (0-1)
+            exclude: Entry IDs to skip (e.g. already matched)
+
+        Returns:
+            List of (entry_id, similarity), most similar first
+        """
+        postings = self._postings if block is None else self._block_postings.get(block, {})
+        scores = {}
+        for gram, weight in self._vector(char_ngrams(text)).items():
+            for entry_id, entry_weight in postings.get(gram, ()):
+                scores[entry_id] = scores.get(entry_id, 0.0) + weight * entry_weight
+        hits = (
+            (entry_id, similarity) for entry_id, similarity in scores.items()
+            if similarity >= min_similarity and entry_id not in exclude
+        )
+        return heapq.nlargest(k, hits, key=lambda hit: hit[1])
+
+
+def assign(edges, min_score=None):
+    """
+    Maximum-weight one-to-one matching of scored pairs.
+
+    Unlike greedy matching, the result doesn't depend on the order of the
+    pairs: a name never takes a candidate that another name needs more.
+    Names may stay unmatched when that gives a higher total. Solved as a
+    min-cost assignment (successive shortest paths with Dijkstra and node
+    potentials), touching only the given pairs, so sparse graphs with
+    thousands of names solve quickly.
+
+    Args:
+        edges: Iterable of (left_id, right_id, score); higher scores are better
+        min_score: Pairs scoring below this are never matched
+
+    Returns:
+        Dictionary mapping left_id to (right_id, score)
+    """
+    left_index, right_ids = {}, {}
+    adjacency = []  # left index -> {right index: score}
+    for left_id, right_id, score in edges:
+        if min_score is not None and score < min_score:
+            continue
+        row = left_index.setdefault(left_id, len(left_index))
+        if row == len(adjacency):
+            adjacency.append({})
+        col = right_ids.setdefault(right_id, len(right_ids))
+        if score > adjacency[row].get(col, float('-inf')):
+            adjacency[row][col] = score
+    if not adjacency:
+        return {}
+
+    # Minimize (top - score); leaving row i unmatched goes to its own dummy
+    # column (num_cols + i) at cost top, i.e. a score of zero
+    top = max(max(scores.values()) for scores in adjacency)
+    num_cols = len(right_ids)
+    row_potential = [0.0] * len(adjacency)
+    col_potential = {}
+    col_match = {}  # column -> row
+    row_match = [None] * len(adjacency)
+
+    for start in range(len(adjacency)):
+        dist = {}     # finalized column distances
+        best = {}     # tentative column distances
+        way = {}      # column -> row it was reached from
+        row_dist = {start: 0.0}
+        heap = []
+        counter = itertools.count()
+
+        def relax(row, base):
+            arcs = itertools.chain(adjacency[row].items(), ((num_cols + row, None),))
+            for col, score in arcs:
+                if col in dist:
+                    continue
+                cost = top if score is None else top - score
+                reduced = base + cost - row_potential[row] - col_potential.get(col, 0.0)
+                if reduced < best.get(col, float('inf')):
+                    best[col] = reduced
+                    way[col] = row
+                    heapq.heappush(heap, (reduced, next(counter), col))
+
+        relax(start, 0.0)
+        while True:
+            distance, _, col = heapq.heappop(heap)
+            if col in dist or distance > best[col]:
+                continue
+            dist[col] = distance
+            row = col_match.get(col)
+            if row is None:
+                sink = col
+                break
+            row_dist[row] = distance
+            relax(row, distance)
+
+        # Update potentials so reduced costs stay non-negative
+        total = dist[sink]
+        for col, distance in dist.items():
+            col_potential[col] = col_potential.get(col, 0.0) - (total - distance)
+        for row, distance in row_dist.items():
+            row_potential[row] += total - distance
+
+        # Flip the matching along the shortest path
+        col = sink
+        while True:
+            row = way[col]
+            previous = row_match[row]
+            row_match[row] = col
+            col_match[col] = row
+            if row == start:
+                break
+            col = previous
+
+    left_ids = list(left_index)
+    right_list = list(right_ids)
+    matches = {}
+    for row, col in enumerate(row_match):
+        if col < num_cols:
+            matches[left_ids[row]] = (right_list[col], adjacency[row][col])
+    return matches
+
+
+def match_names(schools, entries, score, cache=None, national=False, min_score=None):
+    """
+    Match another source's school entries to our schools, one-to-one.
+
+    Stored cache decisions are applied first, then exact name, match key and
+    alias lookups (SchoolResolver.lookup); each claims its school and needs
+    no scoring. The remaining schools are fuzzy-scored against their
+    CandidateIndex candidates and assigned with assign(). Decisions that were
+    actually applied are recorded in the cache.
+
+    An entry that resolves to a school another entry has already claimed is
+    a duplicate listing: it is neither matched nor recorded.
+
+    Args:
+        schools: Iterable of (school_id, name, state), our schools
+        entries: Iterable of (entry_id, name, state) from the other source
+        score: Function (school key, school state, entry key, entry state)
+            returning a pair's score, or None to reject the pair. Keys are
+            school_resolver.match_key() names.
+        cache: Optional MatchCache; re-runs only score names it hasn't seen
+        national: Also score the closest names from other states (default:
+            only the school's own state)
+        min_score: Pairs scoring below this are never matched
+
+    Returns:
+        Dictionary mapping school_id to (entry_id, score)
+    """
+    from school_resolver import SchoolResolver, match_key
+
+    schools = list(schools)
+    entry_names = {}
+    entry_states = {}
+    for entry_id, name, state in entries:
+        entry_names[entry_id] = name
+        entry_states[entry_id] = state
+
+    school_ids = {}  # school name -> school id
+    for school_id, name, _ in schools:
+        school_ids.setdefault(name, school_id)
+    decided = cache.applicable(school_ids) if cache is not None else {}
+    matches = {}        # school id -> (entry id, score)
+    new_decisions = []  # (entry name, school name, score, method)
+
+    resolver = SchoolResolver(schools)
+    undecided = {}  # entry id -> match key
+    for entry_id, name in entry_names.items():
+        decision = decided.get(name)
+        if decision is not None:
+            if decision.school_name is not None:
+                score_value = 100 if decision.score is None else decision.score
+                matches.setdefault(school_ids[decision.school_name], (entry_id, score_value))
+            continue
+        resolution = resolver.lookup(name)
+        if resolution is not None:
+            if resolution.school_id not in matches:
+                matches[resolution.school_id] = (entry_id, 100)
+                new_decisions.append((name, resolver.name(resolution.school_id), 100, resolution.method))
+            continue
+        undecided[entry_id] = match_key(name)
+
+    candidates = CandidateIndex(
+        (entry_id, key, entry_states[entry_id]) for entry_id, key in undecided.items()
+    )
+    scored_pairs = []
+    for school_id, name, state in schools:
+        if school_id in matches:
+            continue
+        key = match_key(name)
+        nearest = dict(candidates.candidates(key)) if national else {}
+        nearest.update(candidates.candidates(key, block=state))
+        for entry_id in sorted(nearest):
+            pair_score = score(key, state, undecided[entry_id], entry_states[entry_id])
+            if pair_score is not None:
+                scored_pairs.append((school_id, entry_id, pair_score))
+
+    for school_id, (entry_id, pair_score) in assign(scored_pairs, min_score=min_score).items():
+        matches[school_id] = (entry_id, pair_score)
+        new_decisions.append((entry_names[entry_id], resolver.name(school_id), pair_score, 'fuzzy'))
+
+    if cache is not None and new_decisions:
+        cache.record(new_decisions)
+    return matches
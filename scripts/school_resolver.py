@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Shared school-name resolution for the data scripts.
+
+Every data source spells school names its own way ("UCLA", "University of
+California Los Angeles David Geffen School of Medicine", "UC Los Angeles").
+SchoolResolver maps names from any source to one canonical ID per school:
+
+1. exact name (whitespace-normalized)
+2. match key - the name lowercased, without punctuation and without generic
+   parts such as "University of" and "School of Medicine"
+3. the repo's alias tables (see school_aliases.py), indexed by name and key
+4. containment of one match key in another (when only one school
+   qualifies), as a last resort
+
+Steps 1-3 are dictionary lookups. Match keys are computed once per name with
+precompiled patterns, and cached, so scripts never re-clean a name inside a
+matching loop.
+
+Usage:
+    python3 scripts/school_resolver.py "UT Southwestern" "Temple-Katz"
+"""
+
+import csv
+import re
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+from dataset_snapshot import DEFAULT_CSV_PATH
+from school_aliases import load_alias_pairs
+
+_WHITESPACE = re.compile(r'\s+')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+# Generic name parts, stripped in this order (each one at most once)
+_PREFIXES = [re.compile(pattern) for pattern in (
+    r'^the\s+',
+    r'^university of ',
+    r'^college of ',
+)]
+_SUFFIXES = [re.compile(pattern) for pattern in (
+    r' college of medicine$',
+    r' school of medicine$',
+    r' medical college$',
+    r' medical school$',
+    r' school of medicine and science$',
+    r' of medicine$',
+    r'\s+school$',
+    r'\s+college$',
+)]
+_ABBREVIATIONS = [
+    (re.compile(r'\bmed\b'), 'medicine'),
+    (re.compile(r'\buniv\b'), 'university'),
+]
+
+# How a name was resolved, most to least certain
+EXACT, KEY, ALIAS, CONTAINS = 'exact', 'key', 'alias', 'contains'
+
+Resolution = namedtuple('Resolution', ['school_id', 'method'])
+
+# Marks a match key shared by several schools (e.g. campuses of one college)
+_AMBIGUOUS = object()
+
+
+def normalize_whitespace(name):
+    """Collapse runs of whitespace and trim the name."""
+    return _WHITESPACE.sub(' ', str(name)).strip()
+
+
+@lru_cache(maxsize=65536)
+def match_key(name):
+    """
+    Reduce a school name to the key names are compared by.
+
+    "University of Washington School of Medicine" and "Washington" both
+    become "washington".
+    """
+    key = _WHITESPACE.sub(' ', _PUNCTUATION.sub(' ', str(name).lower())).strip()
+    for pattern in _PREFIXES:
+        key = pattern.sub('', key)
+    for pattern in _SUFFIXES:
+        key = pattern.sub('', key)
+    for pattern, replacement in _ABBREVIATIONS:
+        key = pattern.sub(replacement, key)
+    return key.strip()
+
+
+class SchoolResolver:
+    """
+    Index of canonical schools by name, match key and alias.
+
+    Args:
+        entries: Iterable of (school_id, name) or (school_id, name, state)
+        alias_pairs: Pairs of names that refer to the same school (defaults
+            to every alias table in the repo). Pairs that can't be tied to
+            an entry are ignored.
+    """
+
+    def __init__(self, entries, alias_pairs=None):
+        self._names = {}   # school id -> name
+        self._states = {}  # school id -> state (None if unknown)
+        self._keys = {}    # school id -> match key
+        self._by_name = {}
+        self._by_key = {}
+        self._by_alias = {}
+
+        for entry in entries:
+            school_id, name = entry[0], entry[1]
+            state = entry[2] if len(entry) > 2 else None
+            if school_id in self._names:
+                continue
+            key = match_key(name)
+            self._names[school_id] = name
+            self._states[school_id] = state
+            self._keys[school_id] = key
+            self._by_name.setdefault(normalize_whitespace(name), school_id)
+            if key:
+                existing = self._by_key.get(key)
+                if existing is None:
+                    self._by_key[key] = school_id
+                elif existing != school_id:
+                    self._by_key[key] = _AMBIGUOUS
+
+        if alias_pairs is None:
+            alias_pairs = load_alias_pairs()
+        self._add_aliases(alias_pairs)
+
+    @classmethod
+    def from_csv(cls, csv_path=DEFAULT_CSV_PATH, alias_pairs=None):
+        """
+        Index the schools in a dataset CSV.
+
+        School IDs are row numbers from 1, the same IDs the API uses.
+        """
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            entries = [
+                (school_id, row['Medical School Name'], row.get('State'))
+                for school_id, row in enumerate(csv.DictReader(f), 1)
+            ]
+        return cls(entries, alias_pairs)
+
+    @classmethod
+    def from_names(cls, names, alias_pairs=None):
+        """Index a list of names (or the keys of a dict), using each name as its own ID."""
+        return cls(((name, name) for name in names), alias_pairs)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, school_id):
+        return school_id in self._names
+
+    def ids(self):
+        """School IDs in the order they were added."""
+        return list(self._names)
+
+    def name(self, school_id):
+        return self._names[school_id]
+
+    def state(self, school_id):
+        return self._states[school_id]
+
+    def key(self, school_id):
+        """Precomputed match key of a school's canonical name."""
+        return self._keys[school_id]
+
+    def _exact(self, name):
+        """Resolve a name through the name and key indexes only."""
+        school_id = self._by_name.get(normalize_whitespace(name))
+        if school_id is not None:
+            return Resolution(school_id, EXACT)
+        school_id = self._by_key.get(match_key(name))
+        if school_id is not None and school_id is not _AMBIGUOUS:
+            return Resolution(school_id, KEY)
+        return None
+
+    def _add_aliases(self, alias_pairs):
+        # Alias tables chain through each other (short name -> other source's
+        # name -> CSV name), so repeat until nothing new resolves
+        pending = list(alias_pairs)
+        while pending:
+            unresolved = []
+            for name, other in pending:
+                school_id = self._lookup_id(name)
+                if school_id is None:
+                    school_id = self._lookup_id(other)
+                if school_id is None:
+                    unresolved.append((name, other))
+                    continue
+                for alias in (name, other):
+                    self._by_alias.setdefault(normalize_whitespace(alias), school_id)
+                    self._by_alias.setdefault(match_key(alias), school_id)
+            if len(unresolved) == len(pending):
+                break
+            pending = unresolved
+
+    def _lookup_id(self, name):
+        resolution = self.lookup(name)
+        return None if resolution is None else resolution.school_id
+
+    def lookup(self, name):
+        """
+        Resolve a name with dictionary lookups only (exact name, match key, alias).
+
+        Returns:
+            Resolution(school_id, method), or None
+        """
+        resolution = self._exact(name)
+        if resolution is not None:
+            return resolution
+        school_id = self._by_alias.get(normalize_whitespace(name))
+        if school_id is None:
+            school_id = self._by_alias.get(match_key(name))
+        if school_id is not None:
+            return Resolution(school_id, ALIAS)
+        return None
+
+    def resolve(self, name, state=None):
+        """
+        Resolve a name, falling back to match-key containment.
+
+        Args:
+            name: School name as spelled by some source
+            state: Only consider schools in this state for the containment
+                fallback (schools without a known state always qualify)
+
+        Returns:
+            Resolution(school_id, method), or None. Containment only counts
+            whole words, and only resolves when exactly one school qualifies.
+        """
+        resolution = self.lookup(name)
+        if resolution is not None:
+            return resolution
+
+        key = match_key(name)
+        if not key:
+            return None
+        padded = f' {key} '
+        found = None
+        for school_id, school_key in self._keys.items():
+            if not school_key or (state and self._states[school_id] not in (None, state)):
+                continue
+            school_padded = f' {school_key} '
+            if padded in school_padded or school_padded in padded:
+                if found is not None:
+                    return None
+                found = school_id
+        return None if found is None else Resolution(found, CONTAINS)
+
+
+if __name__ == '__main__':
+    resolver = SchoolResolver.from_csv()
+    print(f"Indexed {len(resolver)} schools")
+    for query in sys.argv[1:]:
+        resolution = resolver.resolve(query)
+        if resolution is None:
+            print(f"  {query!r}: no match")
+        else:
+            print(f"  {query!r}: #{resolution.school_id} {resolver.name(resolution.school_id)} "
+                  f"({resolution.method})")
@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 """
 Medical School Data Scraper
-Scrapes medical school admission statistics and organizes them into a structured CSV format.
+Scrapes medical school admission statistics (and website links) and organizes them into a structured CSV format.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import csv
 import re
 from typing import Dict, List, Optional
 
+from shemmassian_table import SHEMMASSIAN_URL, scrape_school_records
+
 
 def scrape_medical_schools(url: str) -> List[Dict[str, str]]:
     """
@@ -21,61 +21,8 @@ def scrape_medical_schools(url: str) -> List[Dict[str, str]]:
     Returns:
         List of dictionaries containing medical school data
     """
-    # Fetch the webpage
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-
-    # Parse HTML
-    soup = BeautifulSoup(response.content, 'html.parser')
-
-    # Find the data table
-    table = soup.find('table')
-    if not table:
-        raise ValueError("Could not find data table on the page")
-
-    schools_data = []
-
-    # Process each row in the table (skip header row)
-    rows = table.find_all('tr')[1:]  # Skip header
-
-    for row in rows:
-        cells = row.find_all('td')
-        if len(cells) < 5:  # Ensure we have enough columns
-            continue
-
-        # Extract raw data and clean up whitespace/newlines
-        school_name_raw = ' '.join(cells[0].get_text(strip=True).split())
-        state = ' '.join(cells[1].get_text(strip=True).split())
-        degree_type = ' '.join(cells[2].get_text(strip=True).split())
-        avg_gpa = ' '.join(cells[3].get_text(strip=True).split())
-        avg_mcat = ' '.join(cells[4].get_text(strip=True).split())
-        min_mcat = ' '.join(cells[5].get_text(strip=True).split()) if len(cells) > 5 else "NR"
-
-        # Parse school name and check for asterisk (public school indicator)
-        is_public = False
-        school_name = school_name_raw
-
-        if '*' in school_name_raw:
-            is_public = True
-            school_name = school_name_raw.replace('*', '').strip()
-
-        # Create the data dictionary
-        school_dict = {
-            'Medical School Name': school_name,
-            'State': state,
-            'Degree Type': degree_type,
-            'Average GPA': avg_gpa,
-            'Average MCAT': avg_mcat,
-            'Minimum MCAT Notes': min_mcat,
-            'Public School Status': 'Public' if is_public else 'Private'
-        }
-
-        schools_data.append(school_dict)
-
-    return schools_data
+    # One fetch (cached, shared with scrape_school_urls.py) and one pass over the table
+    return [record.as_row() for record in scrape_school_records(url)]
 
 
 def save_to_csv(data: List[Dict[str, str]], filename: str) -> None:
@@ -97,7 +44,8 @@ def save_to_csv(data: List[Dict[str, str]], filename: str) -> None:
         'Average GPA',
         'Average MCAT',
         'Minimum MCAT Notes',
-        'Public School Status'
+        'Public School Status',
+        'Website URL'
     ]
 
     with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -110,7 +58,7 @@ def save_to_csv(data: List[Dict[str, str]], filename: str) -> None:
 
 def main():
     """Main execution function."""
-    url = "https://www.shemmassianconsulting.com/blog/average-gpa-and-mcat-score-for-every-medical-school"
+    url = SHEMMASSIAN_URL
     output_file = "medical_schools_data.csv"
 
     print("Starting medical school data scraper...")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Single-pass extraction of the Shemmassian Consulting schools table.
+
+The GPA/MCAT page has one table with a row per school: name (with a link to
+the school's website, and an asterisk for public schools), state, degree
+type, average GPA, average MCAT and minimum MCAT notes. ShemmassianTableParser
+walks the HTML once with the standard library's incremental HTMLParser and
+emits a SchoolRecord per row as soon as the row is closed, with every field
+(including the public flag and website URL) taken from the same row. No
+document tree is built, and nothing needs to be matched up afterwards by
+school name.
+
+Cell text is cleaned the same way the BeautifulSoup scrapers did it
+(get_text(strip=True), then whitespace collapsed), once per cell.
+
+Usage:
+    from shemmassian_table import SHEMMASSIAN_URL, scrape_school_records
+
+    for record in scrape_school_records(SHEMMASSIAN_URL):
+        record.name, record.is_public, record.url, record.as_row()
+
+    python3 scripts/shemmassian_table.py      # print what the page yields
+"""
+
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from http_fetch import fetch
+
+SHEMMASSIAN_URL = "https://www.shemmassianconsulting.com/blog/average-gpa-and-mcat-score-for-every-medical-school"
+
+# Characters of HTML fed to the parser at a time
+FEED_SIZE = 64 * 1024
+
+# Rows with fewer cells aren't school rows
+MIN_CELLS = 5
+
+
+class SchoolRecord(namedtuple('SchoolRecord', [
+        'name', 'state', 'degree_type', 'avg_gpa', 'avg_mcat', 'min_mcat_notes', 'is_public', 'url'])):
+    """
+    One school row of the table.
+
+    Fields:
+        name: School name without the public-school asterisk
+        state, degree_type, avg_gpa, avg_mcat, min_mcat_notes: Cell text
+            (min_mcat_notes is 'NR' when the row has no such cell)
+        is_public: Whether the name was marked with an asterisk
+        url: href of the first link in the name cell ('' if none)
+    """
+
+    __slots__ = ()
+
+    def as_row(self):
+        """The record as a dataset CSV row."""
+        return {
+            'Medical School Name': self.name,
+            'State': self.state,
+            'Degree Type': self.degree_type,
+            'Average GPA': self.avg_gpa,
+            'Average MCAT': self.avg_mcat,
+            'Minimum MCAT Notes': self.min_mcat_notes,
+            'Public School Status': 'Public' if self.is_public else 'Private',
+            'Website URL': self.url,
+        }
+
+
+def make_record(cells, url=''):
+    """
+    Build a SchoolRecord from the cleaned cell texts of a row.
+
+    Returns:
+        SchoolRecord, or None if the row has fewer than MIN_CELLS cells
+    """
+    if len(cells) < MIN_CELLS:
+        return None
+    name = cells[0]
+    is_public = '*' in name
+    if is_public:
+        name = name.replace('*', '').strip()
+    min_mcat = cells[5] if len(cells) > 5 else 'NR'
+    return SchoolRecord(name, cells[1], cells[2], cells[3], cells[4], min_mcat, is_public, url)
+
+
+class ShemmassianTableParser(HTMLParser):
+    """
+    Incremental parser for the first <table> of the page.
+
+    Feed it HTML in any number of pieces; completed records collect in
+    self.records (take them with pop_records()). The table's first row is
+    the header and is skipped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.records = []
+        self.rows_seen = 0
+        self.found_table = False
+        self._table_depth = 0   # >0 while inside the first table
+        self._done = False      # first table closed
+        self._cells = None      # cleaned texts of the current row's <td>s
+        self._cell_strings = None  # stripped text nodes of the current cell
+        self._text = []         # pieces of the current text node
+        self._url = None        # href of the first link in the row's first cell
+
+    def _end_text_node(self):
+        # A text node ends at any tag; keep it the way get_text(strip=True) does
+        if self._text:
+            text = ''.join(self._text).strip()
+            self._text = []
+            if text and self._cell_strings is not None:
+                self._cell_strings.append(text)
+
+    def _end_cell(self):
+        if self._cell_strings is not None:
+            self._cells.append(' '.join(''.join(self._cell_strings).split()))
+            self._cell_strings = None
+
+    def _end_row(self):
+        self._end_cell()
+        if self._cells is not None:
+            self.rows_seen += 1
+            if self.rows_seen > 1:  # skip the header row
+                record = make_record(self._cells, self._url or '')
+                if record is not None:
+                    self.records.append(record)
+        self._cells = None
+        self._url = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        self._end_text_node()
+        if tag == 'table':
+            if self._table_depth or not self.found_table:
+                self.found_table = True
+                self._table_depth += 1
+            return
+        if self._table_depth != 1:
+            return
+        if tag == 'tr':
+            self._end_row()
+            self._cells = []
+        elif tag == 'td' and self._cells is not None:
+            self._end_cell()
+            self._cell_strings = []
+        elif tag == 'th' and self._cells is not None:
+            self._end_cell()
+        elif tag == 'a' and self._cell_strings is not None and len(self._cells) == 0 and self._url is None:
+            # Only the first link counts, even if it has no href
+            self._url = dict(attrs).get('href') or ''
+
+    def handle_endtag(self, tag):
+        if self._done:
+            return
+        self._end_text_node()
+        if tag == 'table' and self._table_depth:
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._end_row()
+                self._done = True
+        elif self._table_depth != 1:
+            return
+        elif tag == 'tr':
+            self._end_row()
+        elif tag == 'td':
+            self._end_cell()
+
+    def handle_comment(self, data):
+        self._end_text_node()
+
+    def handle_data(self, data):
+        if self._cell_strings is not None and self._table_depth == 1:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._end_text_node()
+        if not self._done:
+            self._end_row()
+
+    def pop_records(self):
+        records, self.records = self.records, []
+        return records
+
+
+def iter_school_records(html):
+    """
+    Parse the schools table, yielding records as rows complete.
+
+    Args:
+        html: Page HTML as a string, or an iterable of string pieces
+
+    Yields:
+        SchoolRecord for each school row
+
+    Raises:
+        ValueError if the page has no table
+    """
+    parser = ShemmassianTableParser()
+    pieces = html
+    if isinstance(html, str):
+        pieces = (html[start:start + FEED_SIZE] for start in range(0, len(html), FEED_SIZE))
+    for piece in pieces:
+        parser.feed(piece)
+        yield from parser.pop_records()
+    parser.close()
+    yield from parser.pop_records()
+    if not parser.found_table:
+        raise ValueError("Could not find data table on the page")
+
+
+def scrape_school_records(url=SHEMMASSIAN_URL, max_age=None):
+    """
+    Fetch the page once (through the HTTP cache) and yield its SchoolRecords.
+
+    Args:
+        url: Page URL
+        max_age: Seconds a cached copy is used without revalidating (default:
+            the fetcher's; 0 always checks with the server)
+    """
+    return iter_school_records(fetch(url, max_age=max_age).text)
+
+
+if __name__ == '__main__':
+    records = list(scrape_school_records())
+    public = sum(1 for record in records if record.is_public)
+    with_url = sum(1 for record in records if record.url)
+    print(f"{len(records)} schools ({public} public, {with_url} with a website link)")
+    for record in records[:5]:
+        print(f"  {record.name} ({record.state}, {record.degree_type}): "
+              f"GPA {record.avg_gpa}, MCAT {record.avg_mcat}  {record.url}")
@@ -4,7 +4,9 @@ Update Medical Schools CSV with Application System Designations
 Adds AMCAS, AACOMAS, or TMDSAS designation to each school.
 """
 
-import csv
+from dataset_snapshot import DEFAULT_CSV_PATH
+from enrichment import enrich_csv
+from keyword_matcher import KeywordMatcher
 
 # Texas schools that use TMDSAS (updated from Shemmassian Consulting - February 2025)
 # Using school names as they appear in our CSV database
@@ -33,6 +35,13 @@ TEXAS_AACOMAS_SCHOOLS = [
     "University of the Incarnate Word School of Osteopathic Medicine"
 ]
 
+# Every list in one automaton, each name tagged with its application system
+APPLICATION_SYSTEM_MATCHER = KeywordMatcher(
+    [(name, "TMDSAS") for name in sorted(TMDSAS_SCHOOLS)]
+    + [(name, "AMCAS") for name in TEXAS_AMCAS_SCHOOLS]
+    + [(name, "AACOMAS") for name in TEXAS_AACOMAS_SCHOOLS]
+)
+
 
 def determine_application_system(school_name, degree_type, state):
     """
@@ -46,16 +55,17 @@ def determine_application_system(school_name, degree_type, state):
     Returns:
         Application system: TMDSAS, AMCAS, or AACOMAS
     """
+    systems = {system for _, system in APPLICATION_SYSTEM_MATCHER.find(school_name)}
+
     # Check if it's a TMDSAS school
-    for tmdsas_school in TMDSAS_SCHOOLS:
-        if tmdsas_school.lower() in school_name.lower():
-            return "TMDSAS"
+    if "TMDSAS" in systems:
+        return "TMDSAS"
 
     # Texas exceptions
     if state == "TX":
-        if any(amcas_school.lower() in school_name.lower() for amcas_school in TEXAS_AMCAS_SCHOOLS):
+        if "AMCAS" in systems:
             return "AMCAS"
-        if any(aacomas_school.lower() in school_name.lower() for aacomas_school in TEXAS_AACOMAS_SCHOOLS):
+        if "AACOMAS" in systems:
             return "AACOMAS"
 
     # General rules
@@ -65,6 +75,16 @@ def determine_application_system(school_name, degree_type, state):
         return "AMCAS"
 
 
+def application_system_columns(table):
+    """Application System column for an enrichment Table."""
+    return {'Application System': [
+        determine_application_system(school_name, degree_type, state)
+        for school_name, degree_type, state in zip(
+            table['Medical School Name'], table['Degree Type'], table['State']
+        )
+    ]}
+
+
 def update_csv_with_application_systems(input_file, output_file):
     """
     Read the existing CSV and add application system column.
@@ -73,33 +93,8 @@ def update_csv_with_application_systems(input_file, output_file):
         input_file: Path to input CSV
         output_file: Path to output CSV
     """
-    schools_data = []
-
-    # Read existing CSV
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
-        for row in reader:
-            school_name = row['Medical School Name']
-            degree_type = row['Degree Type']
-            state = row['State']
-
-            # Determine application system
-            app_system = determine_application_system(school_name, degree_type, state)
-            row['Application System'] = app_system
-
-            schools_data.append(row)
-
-    # Write updated CSV
-    new_fieldnames = list(fieldnames) + ['Application System']
-
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=new_fieldnames)
-        writer.writeheader()
-        writer.writerows(schools_data)
-
-    return schools_data
+    table, _ = enrich_csv(input_file, output_file, [('application_systems', application_system_columns)])
+    return table.rows()
 
 
 def print_summary(schools_data):
@@ -121,8 +116,8 @@ def print_summary(schools_data):
 
 
 def main():
-    input_file = "../public/medical_schools_data.csv"
-    output_file = "../public/medical_schools_data.csv"  # Overwrite the original
+    input_file = DEFAULT_CSV_PATH
+    output_file = DEFAULT_CSV_PATH  # Overwrite the original
 
     print("Updating medical schools CSV with application system designations...")
 
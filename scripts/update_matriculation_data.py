@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 """
 Update medical school CSV with in-state/out-of-state matriculation data from AAMC FACTS.
+
+Usage:
+    python3 scripts/update_matriculation_data.py ~/Downloads/2025_FACTS_Table_A-1.xlsx
 """
 
+import argparse
+
 import pandas as pd
-import os
+
+from dataset_snapshot import DEFAULT_CSV_PATH
 
 # Manual mapping from FACTS school names to CSV school names
 SCHOOL_MAPPING = {
@@ -253,9 +259,16 @@ SCHOOL_MAPPING = {
 }
 
 
-def main():
-    # Load FACTS data
-    facts_path = '/Users/itaysolomon/Downloads/2025_FACTS_Table_A-1.xlsx'
+def load_facts_matriculation(facts_path):
+    """
+    Read in-state/out-of-state matriculant percentages from AAMC FACTS Table A-1.
+
+    Args:
+        facts_path: Path to the FACTS Table A-1 spreadsheet
+
+    Returns:
+        Dictionary mapping FACTS school name to {'in_state', 'out_state'}
+    """
     facts_df = pd.read_excel(facts_path, header=None)
     
     # Extract FACTS school data
@@ -278,11 +291,51 @@ def main():
             'out_state': out_state
         }
     
-    print(f"Loaded {len(facts_data)} schools from FACTS data")
-    
-    # Load CSV
-    csv_path = '/Users/itaysolomon/coding_projects/school-list-generator/public/medical_schools_data.csv'
-    df = pd.read_csv(csv_path)
+    return facts_data
+
+
+def matriculation_columns(table, facts_data):
+    """
+    Matriculant percentage columns for an enrichment Table.
+
+    Schools without FACTS data get '' so their current values are kept.
+
+    Args:
+        table: enrichment.Table of the CSV
+        facts_data: Output of load_facts_matriculation()
+    """
+    by_school = {
+        csv_name: facts_data[facts_name]
+        for facts_name, csv_name in SCHOOL_MAPPING.items()
+        if facts_name in facts_data
+    }
+
+    def value(school_name, key):
+        facts = by_school.get(school_name)
+        if facts is None or pd.isna(facts[key]):
+            return ''
+        return str(facts[key])
+
+    names = table['Medical School Name']
+    return {
+        'In-State Matriculants %': [value(name, 'in_state') for name in names],
+        'Out-of-State Matriculants %': [value(name, 'out_state') for name in names],
+    }
+
+
+def update_csv_with_matriculation(input_file, output_file, facts_data):
+    """
+    Fill in matriculation percentages for every mapped school and drop stale columns.
+
+    Args:
+        input_file: Path to input CSV
+        output_file: Path to output CSV
+        facts_data: Output of load_facts_matriculation()
+
+    Returns:
+        The updated DataFrame
+    """
+    df = pd.read_csv(input_file)
     
     print(f"Loaded {len(df)} schools from CSV")
     
@@ -329,9 +382,23 @@ def main():
         df = df.drop(columns=['Match Score'])
         print("Removed 'Match Score' column")
     
-    # Save updated CSV
-    df.to_csv(csv_path, index=False)
-    print(f"\nSaved updated CSV to {csv_path}")
+    df.to_csv(output_file, index=False)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update matriculation data from AAMC FACTS Table A-1')
+    parser.add_argument('facts_path', help='FACTS Table A-1 spreadsheet (e.g. 2025_FACTS_Table_A-1.xlsx)')
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='CSV to update in place')
+    args = parser.parse_args()
+
+    # Load FACTS data
+    facts_data = load_facts_matriculation(args.facts_path)
+    print(f"Loaded {len(facts_data)} schools from FACTS data")
+    
+    # Update and save the CSV
+    df = update_csv_with_matriculation(args.csv, args.csv, facts_data)
+    print(f"\nSaved updated CSV to {args.csv}")
     
     # Print sample of updated data
     print("\nSample updated data:")